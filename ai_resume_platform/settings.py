@@ -48,9 +48,11 @@ INSTALLED_APPS = [
     'apps.career_path',
     'apps.user_profile',
     'apps.settings_app',
+    'apps.tasks',
 ]
 
 MIDDLEWARE = [
+    'ai_resume_platform.utils.metrics.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +91,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a write waits for another connection's lock before "database is locked"
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
@@ -152,6 +158,197 @@ OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
 # JSearch API configuration
 JSEARCH_API_KEY = os.getenv('JSEARCH_API_KEY', '')
 
+# Pooled upstream HTTP clients; values override DEFAULT_UPSTREAMS in
+# ai_resume_platform/utils/http_client.py. Timeouts are read timeouts in seconds per endpoint.
+UPSTREAM_HTTP = {
+    'openrouter': {'POOL_MAXSIZE': 20, 'RETRIES': 2, 'TIMEOUTS': {'chat': 30}},
+    'jsearch': {'POOL_MAXSIZE': 10, 'RETRIES': 2, 'TIMEOUTS': {'search': 15, 'estimated-salary': 3}},
+    'cloudinary': {'POOL_MAXSIZE': 10, 'RETRIES': 2, 'TIMEOUTS': {'download': 15, 'upload': 60}},
+}
+
+# Local stand-in for OpenRouter, JSearch and Cloudinary (`manage.py run_upstream_simulator`).
+# When set, e.g. http://127.0.0.1:8001, every upstream call and resume upload goes there instead.
+UPSTREAM_SIMULATOR_URL = os.getenv('UPSTREAM_SIMULATOR_URL', '').rstrip('/')
+CLOUDINARY_UPLOAD_PREFIX = None
+if UPSTREAM_SIMULATOR_URL:
+    UPSTREAM_HTTP['openrouter']['BASE_URL'] = f"{UPSTREAM_SIMULATOR_URL}/openrouter/api/v1"
+    UPSTREAM_HTTP['jsearch']['BASE_URL'] = f"{UPSTREAM_SIMULATOR_URL}/jsearch"
+    UPSTREAM_HTTP['cloudinary']['BASE_URL'] = f"{UPSTREAM_SIMULATOR_URL}/cloudinary"
+    CLOUDINARY_UPLOAD_PREFIX = f"{UPSTREAM_SIMULATOR_URL}/cloudinary"
+
+# Threads available to AsyncAIService for in-flight upstream calls (per worker process)
+AI_ASYNC_MAX_WORKERS = int(os.getenv('AI_ASYNC_MAX_WORKERS', 200))
+
+# Batch job matching: parallel upstream calls per batch, and packing of short jobs into one prompt
+AI_BATCH_MATCH_CONCURRENCY = int(os.getenv('AI_BATCH_MATCH_CONCURRENCY', 4))
+AI_BATCH_MATCH_MAX_JOBS = 20
+AI_BATCH_PACK_JOB_TOKENS = 350
+AI_BATCH_PACK_BUDGET = 1200
+AI_BATCH_PACK_MAX_JOBS = 4
+
+# Jobs are pre-ranked locally (BM25 against the resume); only the top K are offered for AI matching
+JOB_DEEP_MATCH_TOP_K = int(os.getenv('JOB_DEEP_MATCH_TOP_K', 5))
+
+# AI response cache: 'memory' (per process), 'sqlite' (shared by all workers on the host)
+# or 'django' (uses CACHES[ALIAS])
+AI_RESPONSE_CACHE = {
+    'BACKEND': os.getenv('AI_CACHE_BACKEND', 'sqlite'),
+    'TTL': int(os.getenv('AI_CACHE_TTL', 60 * 60 * 24)),
+    'MAX_ENTRIES': 2000,
+    'PATH': BASE_DIR / 'cache.sqlite3',
+    'ALIAS': 'default',
+}
+
+# OpenRouter resilience: a circuit breaker shared by all workers through the cache store,
+# read timeouts of p95 latency x TIMEOUT_MULTIPLIER (capped by the 'chat' timeout above),
+# and optional hedged requests, on FALLBACK_MODEL when set, for calls slower than p90
+AI_RESILIENCE = {
+    'BREAKER_FAILURE_THRESHOLD': 5,
+    'BREAKER_WINDOW': 60,
+    'BREAKER_RECOVERY_TIMEOUT': 30,
+    'TIMEOUT_PERCENTILE': 95,
+    'TIMEOUT_MULTIPLIER': 2.0,
+    'TIMEOUT_FLOOR': 8,
+    'TIMEOUT_MIN_SAMPLES': 20,
+    'HEDGE_ENABLED': os.getenv('AI_HEDGE_ENABLED', 'False') == 'True',
+    'HEDGE_AFTER': 10,
+    'HEDGE_PERCENTILE': 90,
+    'FALLBACK_MODEL': os.getenv('AI_FALLBACK_MODEL', ''),
+}
+
+# Prometheus metrics at /metrics, aggregated across worker processes in a SQLite file.
+# Readable by staff users, or by scrapers sending `Authorization: Bearer <TOKEN>`.
+METRICS = {
+    'PATH': BASE_DIR / 'metrics.sqlite3',
+    'FLUSH_INTERVAL': 5,
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
+
+# Model tiers (OpenRouter model, sampling temperature, optional MAX_TOKENS cap and prices in
+# USD per million tokens) and the ordered tiers each AI task tries. Tasks are the prompt
+# template names; later tiers are fallbacks when a model errors or times out. Latency and
+# cost per route are shown at /status/model-routes/.
+AI_MODEL_TIERS = {
+    'fast': {
+        'MODEL': os.getenv('AI_FAST_MODEL', 'openai/gpt-4o-mini'),
+        'TEMPERATURE': 0.2,
+        'INPUT_COST': 0.15,
+        'OUTPUT_COST': 0.60,
+    },
+    'standard': {
+        'MODEL': os.getenv('AI_STANDARD_MODEL', 'openai/gpt-3.5-turbo'),
+        'TEMPERATURE': 0.7,
+        'INPUT_COST': 0.50,
+        'OUTPUT_COST': 1.50,
+    },
+}
+AI_TASK_ROUTES = {
+    'default': ['standard', 'fast'],
+    'analyze_resume': ['fast', 'standard'],
+    'analyze_resume_delta': ['fast', 'standard'],
+    'match_job': ['fast', 'standard'],
+    'match_jobs_packed': ['fast', 'standard'],
+}
+
+# Token buckets per upstream, shared by all workers through the cache store. RATE/BURST is the
+# global budget (requests per second / bucket size), USER_RATE/USER_BURST each user's share.
+# Requests over budget queue fairly (round-robin across users) for up to MAX_WAIT seconds.
+# Background calls (prefetch, refresh, salary enrichment) use the global bucket only and leave
+# BACKGROUND_RESERVE tokens for user requests.
+RATE_LIMITS = {
+    'openrouter': {'RATE': 2.0, 'BURST': 20, 'USER_RATE': 0.2, 'USER_BURST': 10, 'MAX_WAIT': 30},
+    'jsearch': {'RATE': 1.0, 'BURST': 5, 'USER_RATE': 0.5, 'USER_BURST': 5, 'MAX_WAIT': 10, 'BACKGROUND_RESERVE': 2},
+}
+
+# A revised resume is re-analyzed from its changed sections and the previous analysis, unless
+# more than this share of its text changed (then the full analysis is cheaper and better)
+AI_DELTA_MAX_CHANGED_SHARE = 0.5
+
+# AI responses are checked against a schema per task (ai_resume_platform/utils/response_schema.py);
+# malformed JSON is repaired locally and, when this is True, only missing fields are asked for again
+AI_REASK_MISSING_FIELDS = os.getenv('AI_REASK_MISSING_FIELDS', 'True') == 'True'
+
+# Per-template overrides of the prompt field budgets and completion max_tokens
+# (see ai_resume_platform/utils/prompts.py; `manage.py prompt_token_report` lists them)
+AI_PROMPT_BUDGETS = {}
+
+# Identical in-flight AI calls share one upstream request. LOCK_TTL bounds how long a
+# crashed worker can hold the cross-process lock; WAIT_TIMEOUT caps how long followers wait.
+AI_SINGLEFLIGHT = {
+    'LOCK_TTL': 120,
+    'POLL_INTERVAL': 0.25,
+    'WAIT_TIMEOUT': 120,
+}
+
+# Responses stored for client Idempotency-Key headers on the AI POST endpoints
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_WAIT_TIMEOUT = 120
+
+# Extracted resume text keyed by PDF content hash (and resume URL -> content hash)
+RESUME_TEXT_CACHE = {
+    'BACKEND': os.getenv('AI_CACHE_BACKEND', 'sqlite'),
+    'TTL': 60 * 60 * 24 * 30,
+    'MAX_ENTRIES': 5000,
+    'PATH': BASE_DIR / 'cache.sqlite3',
+    'ALIAS': 'default',
+}
+
+# JSearch results by canonical query (keywords, location, employment type), shared by all
+# workers. Entries younger than FRESH_TTL are served as is; older ones are served until TTL
+# while a single background refresh replaces them.
+JOB_SEARCH_CACHE = {
+    'BACKEND': os.getenv('AI_CACHE_BACKEND', 'sqlite'),
+    'TTL': int(os.getenv('JOB_SEARCH_CACHE_TTL', 60 * 60 * 6)),
+    'FRESH_TTL': int(os.getenv('JOB_SEARCH_FRESH_TTL', 60 * 30)),
+    'REFRESH_TIMEOUT': 60,
+    'REFRESH_WORKERS': 2,
+    'MAX_ENTRIES': 2000,
+    'PATH': BASE_DIR / 'cache.sqlite3',
+    'ALIAS': 'default',
+}
+
+# Job search pages reachable by infinite scroll (JSearch pages of ~10 results); the page after
+# the one being shown is always prefetched into JOB_SEARCH_CACHE
+JOB_SEARCH_MAX_PAGES = 10
+
+# Every fetched posting is kept in the jobs_job table (FTS5-indexed on SQLite). A search with at
+# least MIN_LOCAL_RESULTS stored matches seen in the last MAX_AGE_DAYS is answered locally;
+# otherwise JSearch results are topped up with the stored ones, up to MAX_RESULTS.
+JOB_STORE = {
+    'MIN_LOCAL_RESULTS': 10,
+    'MAX_RESULTS': 20,
+    'MAX_AGE_DAYS': 14,
+}
+
+# Salary estimates for listings without a salary range: distinct (title, city) pairs are
+# looked up concurrently on MAX_WORKERS threads and cached for TTL. Listings still waiting
+# after DEADLINE seconds are returned without one and filled in from the cache later.
+SALARY_ENRICHMENT = {
+    'BACKEND': os.getenv('AI_CACHE_BACKEND', 'sqlite'),
+    'TTL': 60 * 60 * 24 * 7,
+    'MAX_WORKERS': 8,
+    'DEADLINE': float(os.getenv('SALARY_ENRICHMENT_DEADLINE', 4.0)),
+    # How long a lookup that gave no estimate (budget exhausted, upstream error) is remembered
+    'UNAVAILABLE_TTL': 60 * 5,
+    'MAX_ENTRIES': 5000,
+    'PATH': BASE_DIR / 'cache.sqlite3',
+    'ALIAS': 'default',
+}
+
+# The featured jobs on the jobs page, precomputed by `manage.py refresh_featured_jobs` every
+# REFRESH_INTERVAL. The snapshot has no TTL so a failed refresh keeps the last good one; when it
+# is older than STALE_AFTER (no refresher running) the next page view queues one refresh itself.
+FEATURED_JOBS = {
+    'BACKEND': os.getenv('AI_CACHE_BACKEND', 'sqlite'),
+    'TTL': None,
+    'REFRESH_INTERVAL': int(os.getenv('FEATURED_JOBS_REFRESH_INTERVAL', 60 * 15)),
+    'STALE_AFTER': 60 * 30,
+    'REFRESH_TIMEOUT': 120,
+    'MAX_ENTRIES': 16,
+    'PATH': BASE_DIR / 'cache.sqlite3',
+    'ALIAS': 'default',
+}
+
 # Authentication settings
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
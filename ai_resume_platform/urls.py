@@ -32,6 +32,7 @@ urlpatterns = [
     path('career/', include('apps.career_path.urls')),
     path('profile/', include('apps.user_profile.urls')),
     path('settings/', include('apps.settings_app.urls')),
+    path('tasks/', include('apps.tasks.urls')),
 ]
 
 if settings.DEBUG:
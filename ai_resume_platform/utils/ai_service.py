@@ -1,234 +1,408 @@
+import asyncio
+import functools
+import threading
 import requests
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
+from .cache import get_cache
+from .http_client import get_client
+from .json_stream import IncrementalJSONParser
+from .singleflight import SingleFlight
+from .resilience import CIRCUIT_OPEN_MESSAGE, CircuitOpenError, StreamError, get_chat_client
+from .rate_limit import RateLimitExceeded, get_rate_limiter
+from .model_router import get_model_router
+from .metrics import get_metrics, timed
+from .response_schema import get_schema, repair_json
+from . import prompts
+from .prompts import SYSTEM_PROMPT, clean_job_description, estimate_tokens
+from apps.analyzer.utils.ats_scorer import score_resume
+from apps.analyzer.utils.pdf_extractor import ResumeTextError, get_resume_text
+from apps.analyzer.utils.sections import changed_share, diff_sections, section_fingerprints, segment_resume
+from apps.analyzer.utils.skills import job_skills, resume_skill_profile, skill_gap
+
+def rank_match_results(results):
+    """
+    Sort batch match results by match percentage, best first; failed matches go last
+    """
+    def score(result):
+        try:
+            return float(result.get('match', {}).get('match_percentage', -1))
+        except (TypeError, ValueError):
+            return -1
+    
+    ranked = sorted(results, key=lambda result: ('error' in result, -score(result), result['index']))
+    for rank, result in enumerate(ranked, start=1):
+        result['rank'] = rank
+    return ranked
+
+
+def get_response_cache():
+    """
+    Process-wide cache of parsed AI responses, configured by settings.AI_RESPONSE_CACHE
+    """
+    return get_cache('AI_RESPONSE_CACHE', table='ai_responses')
+
+
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight():
+    """
+    Process-wide coalescer for identical AI calls, tuned by settings.AI_SINGLEFLIGHT.
+    Its cross-process locks live in the same store as the response cache.
+    """
+    global _singleflight
+    with _singleflight_lock:
+        if _singleflight is None:
+            config = getattr(settings, 'AI_SINGLEFLIGHT', {}) or {}
+            _singleflight = SingleFlight(
+                store=get_cache('AI_RESPONSE_CACHE', table='ai_locks'),
+                lookup=get_response_cache().peek,
+                lock_ttl=config.get('LOCK_TTL', 120),
+                poll_interval=config.get('POLL_INTERVAL', 0.25),
+                wait_timeout=config.get('WAIT_TIMEOUT', 120),
+            )
+        return _singleflight
+
+
+class InvalidAIResponse(ValueError):
+    """
+    The model answered, but not with valid JSON
+    """
+
+    def __init__(self, content):
+        super().__init__("AI response was not valid JSON")
+        self.content = content
+
 
 class AIService:
     """
     Service class to handle AI API calls
     """
     
-    def __init__(self):
+    def __init__(self, user_id=None):
+        self.user_id = user_id
         self.api_key = getattr(settings, 'OPENROUTER_API_KEY', '')
-        self.base_url = 'https://openrouter.ai/api/v1/chat/completions'
+        self.http = get_client('openrouter')
+        self.base_url = self.http.url_for('/chat/completions')
+        self.chat = get_chat_client(self.http)
+        self.cache = get_response_cache()
+        self.flight = get_singleflight()
+        self.limiter = get_rate_limiter()
+        self.router = get_model_router()
         
-    def analyze_resume_from_url(self, resume_url):
-        """
-        Analyze a resume from a Cloudinary URL and provide comprehensive feedback
-        """
-        prompt = f"""
-Analyze the resume available at this public URL:
-
-RESUME_URL: {resume_url}
-
-IMPORTANT:
-- The resume is a PDF.
-- You must analyze content ONLY from this resume.
-- Do NOT assume missing information.
-- Be precise and professional.
-
-Follow these definitions strictly:
-
-STRENGTHS:
-- Skills, technologies, or keywords repeated multiple times
-- Clear achievements and impact
-- Strong formatting, structure, grammar
-- Role-relevant experience
-
-WEAKNESSES:
-- Content that exists but is:
-  • Generic
-  • Weakly worded
-  • Outdated
-  • Irrelevant to modern roles
-  • Overused without impact
-
-MISSING / IMPROVEMENTS:
-- Important things NOT present:
-  • Missing skills
-  • Missing metrics
-  • Missing industry keywords
-  • Missing action verbs
-  • Missing clarity or structure
-
-Return your response in STRICT JSON format:
-
-{{
-  "ats_score": number (0-100),
-  "summary": "short professional summary of the resume's overall impression",
-  "strengths": [ "point 1", "point 2", "point 3", "point 4", "point 5" ],
-  "weaknesses": [ "point 1", "point 2", "point 3", "point 4", "point 5" ],
-  "missing_elements": [ "point 1", "point 2", "point 3", "point 4", "point 5" ],
-  "best_programming_languages": [ "language 1", "language 2", "language 3" ],
-  "industry_scores": {{
-    "Software Development": number,
-    "Data Science": number,
-    "AI / ML": number,
-    "IT / Support": number,
-    "Management": number
-  }},
-  "suggestions": [ "suggestion 1", "suggestion 2", "suggestion 3" ]
-}}
-
-Do NOT include explanations.
-Do NOT include markdown.
-Return ONLY valid JSON.
+    def _error_stream(self, message):
+        yield ('error', message)
+    
+    def get_resume_text(self, resume_url):
+        """
+        Return the cached, normalized text of a resume, or an error dict
         """
+        try:
+            return get_resume_text(resume_url)
+        except ResumeTextError as e:
+            return {"error": str(e)}
+    
+    def analyze_resume(self, resume_text, stream=False, base=None):
+        """
+        Analyze resume text and provide comprehensive feedback.
+        The ATS and industry scores come from the local scorer; the model writes the narrative.
+        With ``base`` (a Resume.base_analysis) only the sections changed since then are sent.
+        """
+        scores = self._local_analysis(resume_text)
+        reanalysis = self._plan_reanalysis(resume_text, base) if base else None
+        if reanalysis is not None:
+            return self._reanalyze(scores, *reanalysis, stream=stream)
+        prompt = prompts.ANALYZE_RESUME.render(resume_text=resume_text)
         
-        return self._call_ai_api(prompt)
+        if stream:
+            return self._stream_with_scores(scores, self._call_ai_api(prompt, stream=True))
+        analysis = self._call_ai_api(prompt)
+        if 'error' in analysis:
+            return analysis
+        return dict(analysis, **scores)
     
-    def match_job_from_url(self, resume_url, job_details):
+    @staticmethod
+    def _local_analysis(resume_text):
         """
-        Match a resume from a Cloudinary URL against job details
+        Everything computed without the model: ATS and industry scores, skills and top languages
         """
-        # Format job information
+        return dict(score_resume(resume_text), **resume_skill_profile(resume_text))
+    
+    def _plan_reanalysis(self, resume_text, base):
+        """
+        Return (previous analysis, delta prompt, or None when no section changed) for a
+        revised resume, or None when so much changed that a full analysis is the better deal
+        """
+        previous = base.get('analysis')
+        if not isinstance(previous, dict) or 'error' in previous:
+            return None
+        changed, removed = diff_sections(base.get('sections') or {}, section_fingerprints(resume_text))
+        if not changed and not removed:
+            return previous, None
+        if changed_share(resume_text, changed) > getattr(settings, 'AI_DELTA_MAX_CHANGED_SHARE', 0.5):
+            return None
+        sections = dict(segment_resume(resume_text))
+        analysis = get_schema(prompts.ANALYZE_RESUME.name).validate(previous)[0]
+        prompt = prompts.ANALYZE_RESUME_DELTA.render(
+            changed_text="\n\n".join(f"[{name}]\n{sections[name]}" for name in changed),
+            removed_sections=', '.join(removed) or 'none',
+            previous_analysis=json.dumps(analysis)
+        )
+        return previous, prompt
+    
+    def _reanalyze(self, scores, previous, prompt, stream=False):
+        """
+        Merge the model's answer for the changed sections into the previous analysis
+        """
+        if stream:
+            return self._stream_reanalysis(scores, previous, prompt)
+        if prompt is None:
+            return dict(self._merge_analysis(previous, {}), **scores)
+        delta = self._call_ai_api(prompt)
+        if 'error' in delta:
+            return delta
+        return dict(self._merge_analysis(previous, delta), **scores)
+    
+    def _stream_reanalysis(self, scores, previous, prompt):
+        """
+        Emit the scores and the previous analysis straight away, then the sections the model rewrites
+        """
+        merged = self._merge_analysis(previous, {})
+        for key, value in dict(merged, **scores).items():
+            yield ('section', key, value)
+        if prompt is None:
+            yield ('done', dict(merged, **scores))
+            return
+        for event in self._call_ai_api(prompt, stream=True):
+            if event[0] == 'done':
+                yield ('done', dict(self._merge_analysis(previous, event[1]), **scores))
+            else:
+                yield event
+    
+    @staticmethod
+    def _merge_analysis(previous, delta):
+        schema = get_schema(prompts.ANALYZE_RESUME.name)
+        changes = {key: value for key, value in delta.items() if key in schema.fields}
+        return schema.validate(dict(previous, **changes))[0]
+    
+    def _stream_with_scores(self, scores, events):
+        """
+        Emit the local scores as sections straight away, then the model's narrative
+        """
+        for key, value in scores.items():
+            yield ('section', key, value)
+        for event in events:
+            if event[0] == 'done':
+                yield ('done', dict(event[1], **scores))
+            else:
+                yield event
+    
+    @timed('ai_call_duration_seconds', method='score_resume_from_url')
+    def score_resume_from_url(self, resume_url):
+        """
+        Local ATS score and skills for the resume at a Cloudinary URL; no model call
+        """
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            return resume_text
+        return self._local_analysis(resume_text)
+    
+    @timed('ai_call_duration_seconds', method='analyze_resume_from_url')
+    def analyze_resume_from_url(self, resume_url, stream=False, base=None):
+        """
+        Analyze a resume from a Cloudinary URL using its locally extracted text
+        """
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            return self._error_stream(resume_text['error']) if stream else resume_text
+        return self.analyze_resume(resume_text, stream=stream, base=base)
+    
+    def match_job(self, resume_text, job_details):
+        """
+        Match resume text against job details (a dict, or a plain job description string)
+        """
+        if isinstance(job_details, str):
+            job_details = {'description': job_details}
+        
         job_title = job_details.get('title', '')
         company = job_details.get('company', 'Not specified')
         job_level = job_details.get('level', 'Not specified')
         salary = job_details.get('salary', 'Not specified')
         job_description = job_details.get('description', '')
         
-        prompt = f"""
-You are an ATS Job Matching Engine.
-
-Analyze the resume at this URL:
-
-RESUME_URL: {resume_url}
-
-Compare it with the following job:
-
-Job Title: {job_title}
-Company: {company}
-Experience Level: {job_level}
-Salary (if provided): {salary}
-Job Description:
-{job_description}
-
-Rules:
-- Do NOT rewrite the resume
-- Do NOT assume skills not mentioned
-- Match strictly based on resume content
-
-Return STRICT JSON:
-
-{{
-  "match_percentage": number (0-100),
-  "summary_overview": "short match summary",
-  "strength_alignment": [ "point 1", "point 2", "point 3" ],
-  "missing_skills": [ "skill 1", "skill 2", "skill 3", "skill 4" ],
-  "final_verdict": "one-line hiring recommendation"
-}}
-
-Return ONLY JSON.
-No markdown.
-No explanations.
-        """
+        prompt = prompts.MATCH_JOB.render(
+            resume_text=resume_text,
+            job_title=job_title,
+            company=company,
+            job_level=job_level,
+            salary=salary,
+            job_description=job_description
+        )
         
-        return self._call_ai_api(prompt)
+        return self._with_skill_gap(resume_text, job_details, self._call_ai_api(prompt))
     
-    def analyze_resume(self, resume_text):
+    @staticmethod
+    def _with_skill_gap(resume_text, job_details, match):
         """
-        Analyze a resume and provide feedback
+        Add the locally computed matched and missing skills to a model's match
         """
-        prompt = f"""
-        Please analyze the following resume and provide detailed feedback:
-        
-        Resume Content:
-        {resume_text}
+        if 'error' in match:
+            return match
+        wanted = job_skills(job_details.get('description', ''), job_details.get('required_skills'))
+        gap = skill_gap(resume_text, wanted)
+        return dict(match, matched_skills=gap['matched'], missing_skills=gap['missing'])
+    
+    @timed('ai_call_duration_seconds', method='match_job_from_url')
+    def match_job_from_url(self, resume_url, job_details):
+        """
+        Match a resume from a Cloudinary URL against job details
+        """
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            return resume_text
+        return self.match_job(resume_text, job_details)
+    
+    @timed('ai_call_duration_seconds', method='match_jobs_batch')
+    def match_jobs_batch(self, resume_url, jobs, concurrency=None, pack=True):
+        """
+        Match one resume against many jobs and return the results ranked by match percentage
+        """
+        return rank_match_results(list(self.iter_match_jobs_batch(resume_url, jobs, concurrency, pack)))
+    
+    @timed('ai_call_duration_seconds', method='iter_match_jobs_batch')
+    def iter_match_jobs_batch(self, resume_url, jobs, concurrency=None, pack=True):
+        """
+        Match one resume against many jobs, yielding {'index', 'job_id', 'match' | 'error'}
+        for each job as soon as its match completes.
+
+        At most ``concurrency`` upstream calls run at once; short jobs are packed
+        several to a prompt when pack=True.
+        """
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            for index, job in enumerate(jobs):
+                yield {'index': index, 'job_id': job.get('job_id'), 'error': resume_text['error']}
+            return
         
-        Please provide:
-        1. An ATS compatibility score (0-100)
-        2. Key strengths of the resume
-        3. Areas for improvement
-        4. Specific suggestions for enhancement
+        if concurrency is None:
+            concurrency = getattr(settings, 'AI_BATCH_MATCH_CONCURRENCY', 4)
+        groups = self._pack_jobs(jobs) if pack else [[index] for index in range(len(jobs))]
         
-        Format your response as JSON with the following structure:
-        {{
-            "ats_score": 85,
-            "strengths": ["strength1", "strength2"],
-            "weaknesses": ["weakness1", "weakness2"],
-            "suggestions": ["suggestion1", "suggestion2"]
-        }}
+        pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='ai-batch-match')
+        try:
+            futures = [pool.submit(self._match_job_group, resume_text, jobs, group) for group in groups]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _pack_jobs(self, jobs):
         """
+        Group job indexes into prompts: long jobs alone, short jobs packed up to the token budget
+        """
+        job_tokens = getattr(settings, 'AI_BATCH_PACK_JOB_TOKENS', 350)
+        budget = getattr(settings, 'AI_BATCH_PACK_BUDGET', 1200)
+        max_jobs = getattr(settings, 'AI_BATCH_PACK_MAX_JOBS', 4)
         
-        return self._call_ai_api(prompt)
+        groups = []
+        pack, pack_tokens = [], 0
+        for index, job in enumerate(jobs):
+            tokens = estimate_tokens(clean_job_description(job.get('description', '')))
+            if tokens > job_tokens:
+                groups.append([index])
+                continue
+            if pack and (pack_tokens + tokens > budget or len(pack) >= max_jobs):
+                groups.append(pack)
+                pack, pack_tokens = [], 0
+            pack.append(index)
+            pack_tokens += tokens
+        if pack:
+            groups.append(pack)
+        return groups
     
-    def match_job(self, resume_text, job_description):
+    def _match_job_group(self, resume_text, jobs, group):
         """
-        Match a resume against a job description
+        Match one group of jobs; packed groups fall back to single matches for any job the model skipped
         """
-        prompt = f"""
-        Please match the following resume against the job description and provide detailed feedback:
-        
-        Resume Content:
-        {resume_text}
+        if len(group) == 1:
+            return [self._match_result(group[0], jobs[group[0]], self.match_job(resume_text, jobs[group[0]]))]
         
-        Job Description:
-        {job_description}
+        response = self.match_jobs_packed(resume_text, [jobs[index] for index in group])
+        matches = {}
+        if 'error' not in response:
+            for match in response.get('matches', []):
+                try:
+                    matches[int(match.pop('job_number')) - 1] = match
+                except (KeyError, TypeError, ValueError):
+                    continue
         
-        Please provide:
-        1. A match score (0-100)
-        2. Skills that match
-        3. Skills that are missing
-        4. Recommendations for improvement
-        
-        Format your response as JSON with the following structure:
-        {{
-            "match_score": 78,
-            "matched_skills": ["skill1", "skill2"],
-            "missing_skills": ["skill3", "skill4"],
-            "recommendations": ["recommendation1", "recommendation2"]
-        }}
+        results = []
+        for position, index in enumerate(group):
+            match = matches.get(position)
+            if match is None:
+                match = self.match_job(resume_text, jobs[index])
+            else:
+                match = self._with_skill_gap(resume_text, jobs[index], match)
+            results.append(self._match_result(index, jobs[index], match))
+        return results
+    
+    def _match_result(self, index, job, match):
+        result = {'index': index, 'job_id': job.get('job_id')}
+        if 'error' in match:
+            result['error'] = match['error']
+        else:
+            result['match'] = match
+        return result
+    
+    def match_jobs_packed(self, resume_text, jobs):
         """
+        Match resume text against several short jobs in a single prompt
+        """
+        job_blocks = []
+        for number, job in enumerate(jobs, start=1):
+            job_blocks.append(prompts.PACKED_JOB.render(
+                number=number,
+                title=job.get('title', ''),
+                company=job.get('company', 'Not specified'),
+                level=job.get('level', 'Not specified'),
+                salary=job.get('salary', 'Not specified'),
+                description=job.get('description', '')
+            ).text)
+        jobs_text = "\n\n".join(job_blocks)
+        
+        prompt = prompts.MATCH_JOBS_PACKED.render(
+            items=len(jobs),
+            resume_text=resume_text,
+            job_count=len(jobs),
+            jobs_text=jobs_text
+        )
         
         return self._call_ai_api(prompt)
     
+    @timed('ai_call_duration_seconds', method='generate_resume')
     def generate_resume(self, user_info, target_job, industry, experience_level):
         """
         Generate a resume based on user information and target job
         """
-        prompt = f"""
-        Please generate a professional resume based on the following information:
-        
-        User Information:
-        Name: {user_info.get('name', '')}
-        Email: {user_info.get('email', '')}
-        Phone: {user_info.get('phone', '')}
-        
-        Target Job: {target_job}
-        Industry: {industry}
-        Experience Level: {experience_level}
-        
-        Please provide a complete resume in JSON format with the following structure:
-        {{
-            "name": "John Doe",
-            "email": "john.doe@example.com",
-            "phone": "+1 (555) 123-4567",
-            "summary": "Professional summary...",
-            "experience": [
-                {{
-                    "title": "Job Title",
-                    "company": "Company Name",
-                    "duration": "2020 - Present",
-                    "description": "Job description..."
-                }}
-            ],
-            "education": [
-                {{
-                    "degree": "Degree Name",
-                    "school": "School Name",
-                    "year": "2020"
-                }}
-            ],
-            "skills": ["skill1", "skill2", "skill3"]
-        }}
-        """
+        prompt = prompts.GENERATE_RESUME.render(
+            name=user_info.get('name', ''),
+            email=user_info.get('email', ''),
+            phone=user_info.get('phone', ''),
+            target_job=target_job,
+            industry=industry,
+            experience_level=experience_level
+        )
         
         return self._call_ai_api(prompt)
     
-    def plan_career_from_url(self, resume_url, user_inputs):
+    def plan_career(self, resume_text, user_inputs, stream=False):
         """
-        Provide skill development and learning plan based on resume and user inputs
+        Provide skill development and learning plan based on resume text and user inputs
         """
         career_goal = user_inputs.get('career_goal', '')
         timeframe = user_inputs.get('timeframe', '')
@@ -237,150 +411,32 @@ No explanations.
         learning_commitment = user_inputs.get('learning_commitment', '')
         target_outcome = user_inputs.get('target_outcome', '')
         
-        prompt = f"""
-You are a Career Mentor, Skill Strategist, and Personal Growth Coach.
-
-Analyze the resume available at this URL:
-
-RESUME_URL: {resume_url}
-
-User Goal Details:
-- Career Aim / Goal: {career_goal}
-- Target Timeframe: {timeframe}
-- Preferred Industry or Domain: {preferred_industry}
-- Current Skill Level (Beginner / Intermediate / Advanced): {current_skill_level}
-- Learning Commitment (hours per week): {learning_commitment}
-- Target Outcome (role, skill mastery, startup, freelancing, higher studies, etc.): {target_outcome}
-
-IMPORTANT RULES:
-- ❌ Do NOT suggest job titles
-- ❌ Do NOT suggest companies
-- ❌ Do NOT suggest job switching
-- ❌ Do NOT generate career roles
-
-You must ONLY:
-- Focus on **what the user should DO**
-- Provide **skills, learning steps, habits, projects, certifications**
-- Base everything strictly on resume content + user inputs
-- Be realistic with timeframe
-- Do NOT exaggerate abilities
-
----
-
-OUTPUT FORMAT (STRICT JSON ONLY)
-
-{{
-  "goal_clarity": "Short explanation of how realistic the goal is based on resume",
-  
-  "skill_gap_analysis": [
-    "Missing or weak skill 1",
-    "Missing or weak skill 2",
-    "Missing or weak skill 3"
-  ],
-
-  "learning_roadmap": [
-    {{
-      "phase": "Phase 1 (0–X months)",
-      "focus": "Main focus area",
-      "actions": [
-        "Action 1",
-        "Action 2",
-        "Action 3"
-      ]
-    }},
-    {{
-      "phase": "Phase 2 (X–Y months)",
-      "focus": "Main focus area",
-      "actions": [
-        "Action 1",
-        "Action 2",
-        "Action 3"
-      ]
-    }}
-  ],
-
-  "projects_to_build": [
-    "Project idea 1",
-    "Project idea 2",
-    "Project idea 3"
-  ],
-
-  "daily_weekly_habits": [
-    "Daily habit 1",
-    "Weekly habit 2",
-    "Practice routine"
-  ],
-
-  "recommended_certifications": [
-    "Certification 1 (if useful)",
-    "Certification 2 (optional)"
-  ],
-
-  "final_guidance": "Encouraging but practical closing advice"
-}}
-
----
-
-RESPONSE RULES
-- Return ONLY valid JSON
-- No markdown
-- No explanations
-- No job titles
-- No company names
-- No extra text
-        """
+        prompt = prompts.PLAN_CAREER.render(
+            resume_text=resume_text,
+            career_goal=career_goal,
+            timeframe=timeframe,
+            preferred_industry=preferred_industry,
+            current_skill_level=current_skill_level,
+            learning_commitment=learning_commitment,
+            target_outcome=target_outcome
+        )
         
-        return self._call_ai_api(prompt)
+        return self._call_ai_api(prompt, stream=stream)
     
-    def match_job_from_url(self, resume_url, job_details):
-        """
-        Match a resume against a job description using URLs
+    @timed('ai_call_duration_seconds', method='plan_career_from_url')
+    def plan_career_from_url(self, resume_url, user_inputs, stream=False):
         """
-        job_title = job_details.get('title', '')
-        company = job_details.get('company', 'Not specified')
-        job_level = job_details.get('level', 'Not specified')
-        salary = job_details.get('salary', 'Not specified')
-        job_description = job_details.get('description', '')
-        
-        prompt = f"""
-You are an ATS Job Matching Engine.
-
-Analyze the resume at this URL:
-RESUME_URL: {resume_url}
-
-Compare it with the following job:
-Job Title: {job_title}
-Company: {company}
-Experience Level: {job_level}
-Salary (if provided): {salary}
-Job Description: {job_description}
-
-Rules:
-- Do NOT rewrite the resume
-- Do NOT assume skills not mentioned
-- Match strictly based on resume content
-
-Return STRICT JSON:
-{{
-  "match_percentage": number (0-100),
-  "summary_overview": "short match summary",
-  "strength_alignment": [ "point 1", "point 2", "point 3" ],
-  "missing_skills": [ "skill 1", "skill 2", "skill 3", "skill 4" ],
-  "final_verdict": "one-line hiring recommendation"
-}}
-
-Return ONLY JSON. No markdown. No explanations.
+        Provide a learning plan for the resume at a Cloudinary URL
         """
-        
-        return self._call_ai_api(prompt)
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            return self._error_stream(resume_text['error']) if stream else resume_text
+        return self.plan_career(resume_text, user_inputs, stream=stream)
     
-    def _call_ai_api(self, prompt):
+    def _build_request(self, prompt, route):
         """
-        Internal method to call the AI API
+        Build the OpenRouter headers, payload and response cache key for a rendered prompt on a model route
         """
-        if not self.api_key or self.api_key == 'your-openrouter-api-key':
-            return {"error": "API key not configured. Please update your .env file with a valid OpenRouter API key."}
-        
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -389,44 +445,351 @@ Return ONLY JSON. No markdown. No explanations.
         }
         
         data = {
-            "model": "openai/gpt-3.5-turbo",
+            "model": route.model,
             "messages": [
-                {"role": "system", "content": "You are an expert career advisor and resume consultant. Always respond with valid JSON only, no markdown, no explanations."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt.text}
             ],
-            "temperature": 0.7,
-            "max_tokens": 2000,
+            "temperature": route.temperature,
+            "max_tokens": route.max_tokens_for(prompt),
             "response_format": { "type": "json_object" }
         }
         
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
+        return headers, data, self._request_key(data)
+    
+    def _request_key(self, data):
+        """
+        Response cache key: identical model + prompts + sampling parameters return the stored response
+        """
+        return self.cache.make_key(
+            model=data['model'],
+            messages=data['messages'],
+            temperature=data['temperature'],
+            max_tokens=data['max_tokens'],
+            response_format=data['response_format']
+        )
+    
+    def _call_ai_api(self, prompt, stream=False):
+        """
+        Internal method to call the AI API.
+        With stream=True a generator of parser events is returned instead (see _stream_ai_api).
+        """
+        if stream:
+            return self._stream_ai_api(prompt)
+        
+        if not self.api_key or self.api_key == 'your-openrouter-api-key':
+            return {"error": "API key not configured. Please update your .env file with a valid OpenRouter API key."}
+        
+        # The task's model tiers, primary first (see model_router.py)
+        routes = self.router.routes_for(prompt.name)
+        cache_key = self._build_request(prompt, routes[0])[2]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Concurrent identical prompts (double-clicks, several tabs) share one upstream call
+        return self.flight.do(cache_key, lambda: self._fetch_ai_response(prompt, routes, cache_key))
+    
+    def _fetch_ai_response(self, prompt, routes, cache_key):
+        """
+        Call each route in turn until one answers, and cache the parsed JSON.
+        A fallback's answer is stored under the primary route's key too, so repeats and waiters find it;
+        so is a hedge's answer, which is otherwise keyed and recorded under the model that gave it.
+        """
+        for index, route in enumerate(routes):
+            headers, data, route_key = self._build_request(prompt, route)
+            try:
+                # Waits in this user's fair-share queue when the upstream budget is spent
+                self.limiter.acquire('openrouter', self.user_id)
+            except RateLimitExceeded as e:
+                return {"error": str(e)}
             
-            # Extract the content from the response
-            content = result['choices'][0]['message']['content']
+            started = time.monotonic()
+            try:
+                content, usage, model = self._complete(headers, data)
+                if model != data['model']:
+                    # The hedged request on the fallback model answered first
+                    data = dict(data, model=model)
+                    route_key = self._request_key(data)
+                    served = self.router.route_for_model(route, model)
+                else:
+                    served = route
+                parsed_data, usage = self._validate_response(prompt, headers, data, content, usage)
+            except CircuitOpenError as e:
+                return {"error": str(e)}
+            except Exception as e:
+                self.router.record(route, time.monotonic() - started, ok=False, fallback=index > 0)
+                if index + 1 < len(routes) and self._should_fall_back(e):
+                    print(f"{prompt.name}: {route.model} failed ({str(e)[:100]}), falling back to {routes[index + 1].model}")
+                    continue
+                return {"error": self._error_message(e)}
             
-            # Try to parse as JSON
+            self.router.record(
+                served,
+                time.monotonic() - started,
+                prompt_tokens=usage.get('prompt_tokens') or prompt.input_tokens,
+                completion_tokens=usage.get('completion_tokens') or estimate_tokens(json.dumps(parsed_data)),
+                fallback=index > 0 or served is not route,
+            )
+            self.cache.set(route_key, parsed_data)
+            if route_key != cache_key:
+                self.cache.set(cache_key, parsed_data)
+            return parsed_data
+    
+    def _complete(self, headers, data):
+        """
+        Make one upstream call and return (message content, token usage, model that answered);
+        raises on any failure
+        """
+        # Circuit breaker, adaptive timeout and optional hedging (see resilience.py)
+        response, model = self.chat.post(self.base_url, data, headers)
+        response.raise_for_status()
+        result = response.json()
+        
+        # Extract the content from the response
+        return result['choices'][0]['message']['content'], result.get('usage') or {}, model
+    
+    def _validate_response(self, prompt, headers, data, content, usage):
+        """
+        Parse a response against the task's schema (see response_schema.py) and return (data, usage).
+        Malformed JSON is repaired locally; fields still missing are asked for once, in a short
+        follow-up, and defaulted if the model leaves them out again. Raises InvalidAIResponse
+        when nothing can be recovered.
+        """
+        try:
+            parsed_data, repaired = repair_json(content)
+        except ValueError:
+            self._record_outcome(prompt, 'invalid')
+            raise InvalidAIResponse(content)
+        outcome = 'repaired' if repaired else 'valid'
+        
+        schema = get_schema(prompt.name)
+        if schema is not None:
+            parsed_data, missing = schema.validate(parsed_data)
+            if missing and getattr(settings, 'AI_REASK_MISSING_FIELDS', True):
+                answer, extra_usage = self._ask_for_missing(schema, headers, data, parsed_data, missing)
+                usage = {
+                    key: (usage.get(key) or 0) + (extra_usage.get(key) or 0)
+                    for key in ('prompt_tokens', 'completion_tokens')
+                }
+                parsed_data, missing = schema.validate(dict(parsed_data, **{
+                    key: answer[key] for key in missing if key in answer
+                }))
+                outcome = 'reasked'
+            if missing:
+                print(f"{prompt.name}: response missing {', '.join(missing)}, using defaults")
+                outcome = 'defaulted'
+        
+        self._record_outcome(prompt, outcome)
+        return parsed_data, usage
+    
+    def _ask_for_missing(self, schema, headers, data, partial, missing):
+        """
+        Ask the same model for just the missing members; returns (answer, usage), empty on failure
+        """
+        follow_up = prompts.REASK_MISSING.render(
+            fields=', '.join(missing),
+            shape=json.dumps(schema.example(missing))
+        )
+        messages = data['messages'] + [
+            {"role": "assistant", "content": json.dumps(partial)},
+            {"role": "user", "content": follow_up.text},
+        ]
+        try:
+            self.limiter.acquire('openrouter', self.user_id)
+            content, usage, _ = self._complete(headers, dict(data, messages=messages))
+            answer, _ = repair_json(content)
+        except Exception as e:
+            print(f"Asking for missing fields failed: {str(e)[:100]}")
+            return {}, {}
+        return answer, usage
+    
+    @staticmethod
+    def _record_outcome(prompt, outcome):
+        get_metrics().inc('ai_responses_total', task=prompt.name, outcome=outcome)
+    
+    @staticmethod
+    def _should_fall_back(error):
+        """
+        Whether another model might succeed where this one failed
+        """
+        if isinstance(error, requests.exceptions.HTTPError):
+            # A bad key or an exhausted account fails on every model
+            return error.response is None or error.response.status_code not in (401, 403)
+        return isinstance(error, (requests.exceptions.RequestException, InvalidAIResponse, KeyError, IndexError))
+    
+    @staticmethod
+    def _error_message(error):
+        if isinstance(error, requests.exceptions.Timeout):
+            return "Request timed out. The AI service took too long to respond."
+        if isinstance(error, requests.exceptions.RequestException):
+            return f"API request failed: {str(error)}"
+        if isinstance(error, InvalidAIResponse):
+            return f"AI response was not valid JSON. Response preview: {error.content[:200]}..."
+        if isinstance(error, (KeyError, IndexError)):
+            return f"Unexpected API response format: {str(error)}"
+        return f"An error occurred: {str(error)}"
+    
+    def _stream_ai_api(self, prompt):
+        """
+        Stream the AI response, yielding events as each JSON section completes:
+        ('item', key, index, value), ('section', key, value), then ('done', result) or ('error', message)
+        """
+        if not self.api_key or self.api_key == 'your-openrouter-api-key':
+            yield ('error', "API key not configured. Please update your .env file with a valid OpenRouter API key.")
+            return
+        
+        routes = self.router.routes_for(prompt.name)
+        cache_key = self._build_request(prompt, routes[0])[2]
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield from self._replay_events(IncrementalJSONParser(), cached)
+            return
+        
+        call, leader = self.flight.begin(cache_key)
+        if not leader:
+            # The same prompt is already in flight in this process; replay its result
+            result = self.flight.wait(call)
+            if result is not None:
+                yield from self._replay_events(IncrementalJSONParser(), result)
+                return
+            # The leader gave up (e.g. its client went away), so stream on our own
+            yield from self._stream_routes(prompt, routes, cache_key)
+            return
+        
+        result = None
+        try:
+            token = self.flight.acquire_shared(cache_key)
+            if token is None:
+                # Another worker process is making this call; wait for its cached result
+                result = self.flight.wait_shared(cache_key, time.monotonic() + self.flight.wait_timeout)
+                if result is not None:
+                    yield from self._replay_events(IncrementalJSONParser(), result)
+                    return
+                token = self.flight.acquire_shared(cache_key)
             try:
-                parsed_data = json.loads(content)
-                return parsed_data
-            except json.JSONDecodeError:
-                # If not JSON, return error with response preview
-                return {"error": f"AI response was not valid JSON. Response preview: {content[:200]}..."}
-                
+                for event in self._stream_routes(prompt, routes, cache_key):
+                    if event[0] == 'done':
+                        result = event[1]
+                    elif event[0] == 'error':
+                        result = {"error": event[1]}
+                    yield event
+            finally:
+                if token is not None:
+                    self.flight.release_shared(cache_key, token)
+        finally:
+            self.flight.end(cache_key, call, result)
+    
+    def _replay_events(self, parser, result):
+        """
+        Emit the stream events for a response that is already complete
+        """
+        if 'error' in result:
+            yield ('error', result['error'])
+            return
+        yield from parser.feed(json.dumps(result))
+        yield ('done', result)
+    
+    def _stream_routes(self, prompt, routes, cache_key):
+        """
+        Stream from each route in turn; a failed model is only replaced before anything reached the client
+        """
+        for index, route in enumerate(routes):
+            headers, data, route_key = self._build_request(prompt, route)
+            try:
+                self.limiter.acquire('openrouter', self.user_id)
+            except RateLimitExceeded as e:
+                yield ('error', str(e))
+                return
+            
+            started = time.monotonic()
+            emitted = False
+            for event in self._stream_upstream(prompt, headers, data, route_key, IncrementalJSONParser()):
+                if event[0] == 'error':
+                    if event[1] == CIRCUIT_OPEN_MESSAGE:
+                        yield event
+                        return
+                    self.router.record(route, time.monotonic() - started, ok=False, fallback=index > 0)
+                    if not emitted and index + 1 < len(routes):
+                        print(f"{prompt.name}: {route.model} failed ({event[1][:100]}), falling back to {routes[index + 1].model}")
+                        break
+                    yield event
+                    return
+                if event[0] == 'done':
+                    self.router.record(
+                        route,
+                        time.monotonic() - started,
+                        prompt_tokens=prompt.input_tokens,
+                        completion_tokens=estimate_tokens(json.dumps(event[1])),
+                        fallback=index > 0,
+                    )
+                    if route_key != cache_key:
+                        self.cache.set(cache_key, event[1])
+                emitted = True
+                yield event
+            else:
+                return
+    
+    def _stream_upstream(self, prompt, headers, data, cache_key, parser):
+        """
+        Stream one upstream call through the parser and cache the validated JSON.
+        Sections the stream did not deliver, or delivered with a value validation then changed
+        (repaired, re-asked, coerced or defaulted), are sent again before 'done'.
+        """
+        content = ''
+        sent = {}
+        try:
+            # Breaker, adaptive timeout and latency tracking (see resilience.py)
+            with self.chat.stream(self.base_url, data, headers) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    # Server-sent events; lines starting with ':' are keep-alive comments
+                    if not line or not line.startswith('data:'):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == '[DONE]':
+                        break
+                    chunk = json.loads(payload)
+                    if chunk.get('error'):
+                        raise StreamError(f"API request failed: {chunk['error'].get('message', chunk['error'])}")
+                    delta = chunk['choices'][0].get('delta', {}).get('content') or ''
+                    if delta:
+                        content += delta
+                        for event in parser.feed(delta):
+                            if event[0] == 'section':
+                                sent[event[1]] = event[2]
+                            yield event
+        except CircuitOpenError:
+            yield ('error', CIRCUIT_OPEN_MESSAGE)
+            return
+        except StreamError as e:
+            yield ('error', str(e))
+            return
         except requests.exceptions.Timeout:
-            return {"error": "Request timed out. The AI service took too long to respond."}
+            yield ('error', "Request timed out. The AI service took too long to respond.")
+            return
         except requests.exceptions.RequestException as e:
-            return {"error": f"API request failed: {str(e)}"}
-        except KeyError as e:
-            return {"error": f"Unexpected API response format: {str(e)}"}
-        except Exception as e:
-            return {"error": f"An error occurred: {str(e)}"}
+            yield ('error', f"API request failed: {str(e)}")
+            return
+        except (KeyError, IndexError, ValueError) as e:
+            yield ('error', f"Unexpected API response format: {str(e)}")
+            return
+        
+        try:
+            parsed_data, _ = self._validate_response(prompt, headers, data, content, {})
+        except InvalidAIResponse as e:
+            yield ('error', self._error_message(e))
+            return
+        for key, value in parsed_data.items():
+            if key not in sent or sent[key] != value:
+                yield ('section', key, value)
+        self.cache.set(cache_key, parsed_data)
+        yield ('done', parsed_data)
     
-    def generate_optimized_resume(self, resume_url, user_inputs):
+    def generate_optimized_resume_from_text(self, resume_text, user_inputs):
         """
-        Generate an optimized resume based on existing resume and user inputs
+        Generate an optimized resume based on existing resume text and user inputs
         """
         template_type = user_inputs.get('template_type', '')
         target_company = user_inputs.get('target_company', '')
@@ -438,206 +801,131 @@ Return ONLY JSON. No markdown. No explanations.
         experience_level = user_inputs.get('experience_level', '')
         additional_notes = user_inputs.get('additional_notes', '')
         
-        prompt = f"""
-You are given an EXISTING resume available at this public URL:
-
-RESUME_URL: {resume_url}
-
-Your task is to:
-
-1. Analyze the existing resume
-2. Improve and rewrite it
-3. Align it strictly with the provided Job Description
-4. Structure it for a FINAL PDF resume using a named design template
-
---------------------------------------------------
-
-USER INPUTS
-
---------------------------------------------------
-
-Resume Design Template:
-{template_type}
-
-(Available templates:
-Cosmic, Nebula, Lunar, Eclipse, Eon, Orion, Nova, Stellar, Quantum)
-
-Target Company:
-{target_company}
-
-Target Job Role:
-{target_job_role}
-
-Job Description:
-{job_description}
-
-Skills to Emphasize:
-{skills_to_highlight}
-
-Projects:
-{projects}
-
-Achievements:
-{achievements}
-
-Experience Level:
-{experience_level}
-
-Additional Notes:
-{additional_notes}
-
---------------------------------------------------
-
-TEMPLATE DESIGN BEHAVIOR (IMPORTANT)
-
---------------------------------------------------
-
-Each template affects ONLY visual structure, NOT content truth:
-
-Cosmic → Modern, bold section headers, strong hierarchy  
-Nebula → Creative but ATS-safe, soft emphasis, balanced spacing  
-Lunar → Minimal, clean, recruiter-first  
-Eclipse → Executive, sharp impact bullets  
-Eon → Timeline-focused, growth-oriented  
-Orion → Technical-heavy, skill-forward  
-Nova → Fresh graduate / early career  
-Stellar → Leadership & achievement-driven  
-Quantum → Data & metrics-oriented  
-
-You must:
-- Keep content ATS-compliant
-- Avoid tables or graphics that break ATS parsing
-- Structure content so it can be rendered into PDF cleanly
-
---------------------------------------------------
-
-STRICT CONTENT RULES (MANDATORY)
-
---------------------------------------------------
-
-1. Use ONLY information from:
-   - Existing resume
-   - User-provided inputs
-2. You MAY:
-   - Rewrite bullets
-   - Improve clarity
-   - Add strong action verbs
-   - Align wording with job description keywords
-3. You MUST NOT:
-   - Add fake companies or roles
-   - Add fake experience
-   - Add fake certifications
-   - Invent metrics
-4. Do NOT hallucinate achievements.
-5. Ensure the resume is truthful, professional, and realistic.
-
---------------------------------------------------
-
-WHAT YOU MUST DELIVER
-
---------------------------------------------------
-
-- A fully updated resume aligned to the job description
-- ATS-optimized wording and structure
-- Template-aware organization
-- Content that can be directly converted into a PDF
-- FINAL output represents the completed resume
-
---------------------------------------------------
+        prompt = prompts.OPTIMIZE_RESUME.render(
+            resume_text=resume_text,
+            template_type=template_type,
+            target_company=target_company,
+            target_job_role=target_job_role,
+            job_description=job_description,
+            skills_to_highlight=skills_to_highlight,
+            projects=projects,
+            achievements=achievements,
+            experience_level=experience_level,
+            additional_notes=additional_notes
+        )
+        
+        return self._call_ai_api(prompt)
+    
+    @timed('ai_call_duration_seconds', method='generate_optimized_resume')
+    def generate_optimized_resume(self, resume_url, user_inputs):
+        """
+        Generate an optimized resume from the resume at a Cloudinary URL and user inputs
+        """
+        resume_text = self.get_resume_text(resume_url)
+        if isinstance(resume_text, dict):
+            return resume_text
+        return self.generate_optimized_resume_from_text(resume_text, user_inputs)
 
-OUTPUT FORMAT (STRICT JSON ONLY)
 
---------------------------------------------------
+_async_executor = None
+_async_executor_lock = threading.Lock()
 
-{{
-  "pdf_resume": {{
-    "template_used": "{template_type}",
 
-    "header": {{
-      "name": "Use name from existing resume",
-      "title": "Optimized professional title aligned with job role",
-      "summary": "3–4 line ATS-optimized professional summary tailored to the job"
-    }},
+def get_async_executor():
+    """
+    Thread pool that runs blocking upstream calls for AsyncAIService.
+    Sized by settings.AI_ASYNC_MAX_WORKERS so one worker can hold that many LLM calls in flight.
+    """
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'AI_ASYNC_MAX_WORKERS', 200),
+                thread_name_prefix='ai-service'
+            )
+        return _async_executor
 
-    "skills": [
-      "Skill 1",
-      "Skill 2",
-      "Skill 3"
-    ],
 
-    "experience": [
-      {{
-        "company": "",
-        "role": "",
-        "duration": "",
-        "bullets": [
-          "Impact-focused bullet aligned with job description",
-          "Action-oriented achievement",
-          "Keyword-optimized responsibility"
-        ]
-      }}
-    ],
+class AsyncAIService:
+    """
+    Awaitable variant of AIService for async views.
 
-    "projects": [
-      {{
-        "name": "",
-        "description": "Result-oriented project description aligned to job needs"
-      }}
-    ],
+    Each call runs the regular AIService code path (cache, pooled client) on a
+    dedicated thread pool, so the event loop is never blocked by the upstream request.
+    """
 
-    "education": [
-      {{
-        "degree": "",
-        "institution": "",
-        "year": ""
-      }}
-    ],
+    def __init__(self, user_id=None):
+        self._service = AIService(user_id=user_id)
 
-    "certifications": [
-      "Only include if already present in original resume"
-    ]
-  }}
-}}
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_async_executor(), functools.partial(method, *args, **kwargs))
 
---------------------------------------------------
+    async def _iterate(self, method, *args, **kwargs):
+        """
+        Drive a blocking event generator from the thread pool, yielding each event.
+        When the consumer goes away (the SSE client disconnected) the blocking generator is
+        closed too, so its cleanup (batch thread pools, the upstream stream) runs right away
+        instead of at garbage collection.
+        """
+        loop = asyncio.get_running_loop()
+        executor = get_async_executor()
+        events = await loop.run_in_executor(executor, functools.partial(method, *args, **kwargs))
+        done = object()
+        step = None
+        try:
+            while True:
+                step = executor.submit(next, events, done)
+                event = await asyncio.wrap_future(step)
+                if event is done:
+                    break
+                yield event
+        finally:
+            close = functools.partial(executor.submit, events.close)
+            if step is not None and not step.done():
+                # Cancelled while next() runs in its thread: close once that step returns
+                step.add_done_callback(lambda _: close())
+            else:
+                close()
 
-FINAL CONSTRAINTS
+    def stream_analysis(self, resume_url, base=None):
+        return self._iterate(self._service.analyze_resume_from_url, resume_url, stream=True, base=base)
 
---------------------------------------------------
+    def stream_career_plan(self, resume_url, user_inputs):
+        return self._iterate(self._service.plan_career_from_url, resume_url, user_inputs, stream=True)
 
-- Return ONLY valid JSON
-- No markdown
-- No explanations
-- No commentary
-- No extra keys
-- This output will be converted into a FINAL PDF resume
+    async def match_jobs_batch(self, resume_url, jobs, concurrency=None, pack=True):
+        return await self._run(self._service.match_jobs_batch, resume_url, jobs, concurrency, pack)
 
-🔥 WHAT THIS ENABLES IN YOUR APP
+    def stream_job_matches(self, resume_url, jobs, concurrency=None, pack=True):
+        return self._iterate(self._service.iter_match_jobs_batch, resume_url, jobs, concurrency, pack)
 
-✔ Resume is checked & improved automatically
-✔ Resume is tailored per job description
-✔ User selects Cosmic / Nebula / Lunar / Eclipse / Eon etc.
-✔ Resume becomes PDF-only final output
-✔ ATS-safe + visually distinctive
-✔ Zero hallucination risk
+    async def analyze_resume_from_url(self, resume_url, base=None):
+        return await self._run(self._service.analyze_resume_from_url, resume_url, base=base)
 
-🔧 FRONTEND → BACKEND FLOW
+    async def score_resume_from_url(self, resume_url):
+        return await self._run(self._service.score_resume_from_url, resume_url)
 
-User selects template
+    async def match_job_from_url(self, resume_url, job_details):
+        return await self._run(self._service.match_job_from_url, resume_url, job_details)
 
-User fills job details
+    async def analyze_resume(self, resume_text):
+        return await self._run(self._service.analyze_resume, resume_text)
 
-Backend fetches resume URL
+    async def match_job(self, resume_text, job_details):
+        return await self._run(self._service.match_job, resume_text, job_details)
 
-Prompt sent to AI
+    async def generate_resume(self, user_info, target_job, industry, experience_level):
+        return await self._run(self._service.generate_resume, user_info, target_job, industry, experience_level)
 
-JSON parsed
+    async def plan_career(self, resume_text, user_inputs):
+        return await self._run(self._service.plan_career, resume_text, user_inputs)
 
-Tailwind template renders layout
+    async def plan_career_from_url(self, resume_url, user_inputs):
+        return await self._run(self._service.plan_career_from_url, resume_url, user_inputs)
 
-HTML → PDF
+    async def generate_optimized_resume_from_text(self, resume_text, user_inputs):
+        return await self._run(self._service.generate_optimized_resume_from_text, resume_text, user_inputs)
 
-User downloads PDF
-        """
-        
-        return self._call_ai_api(prompt)
\ No newline at end of file
+    async def generate_optimized_resume(self, resume_url, user_inputs):
+        return await self._run(self._service.generate_optimized_resume, resume_url, user_inputs)
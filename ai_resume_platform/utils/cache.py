@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from .metrics import get_metrics
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry expiry. Not shared between workers.
+    """
+
+    def __init__(self, max_entries=512, **kwargs):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """
+        Set the key only if it is absent (or expired); return True when it was set
+        """
+        # Check and write under one lock hold, or two callers could both take the key
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key, value, ttl):
+        """
+        Write an entry and evict the least recently used ones; the caller holds the lock
+        """
+        expires_at = time.time() + ttl if ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    LRU cache stored in a SQLite file so every worker process on the host shares it.
+    """
+
+    def __init__(self, path, table='cache', max_entries=5000, **kwargs):
+        self.path = str(path)
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._ensure_table()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_table(self):
+        conn = self._connect()
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.table}" ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)'
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.table}_accessed" ON "{self.table}" (accessed_at)')
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute(f'SELECT value, expires_at FROM "{self.table}" WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute(f'DELETE FROM "{self.table}" WHERE key = ?', (key,))
+            return None
+        conn.execute(f'UPDATE "{self.table}" SET accessed_at = ? WHERE key = ?', (now, key))
+        return value
+
+    def set(self, key, value, ttl=None):
+        conn = self._connect()
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn.execute(
+            f'INSERT OR REPLACE INTO "{self.table}" (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, value, expires_at, now)
+        )
+        self._evict(conn, now)
+
+    def add(self, key, value, ttl=None):
+        """
+        Atomically set the key only if it is absent (or expired); return True when it was set
+        """
+        conn = self._connect()
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        cursor = conn.execute(
+            f'INSERT INTO "{self.table}" (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, '
+            'accessed_at = excluded.accessed_at '
+            f'WHERE "{self.table}".expires_at IS NOT NULL AND "{self.table}".expires_at <= ?',
+            (key, value, expires_at, now, now)
+        )
+        return cursor.rowcount == 1
+
+    def _evict(self, conn, now):
+        conn.execute(f'DELETE FROM "{self.table}" WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+        count = conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f'DELETE FROM "{self.table}" WHERE key IN '
+                f'(SELECT key FROM "{self.table}" ORDER BY accessed_at LIMIT ?)',
+                (overflow,)
+            )
+
+    def delete(self, key):
+        self._connect().execute(f'DELETE FROM "{self.table}" WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute(f'DELETE FROM "{self.table}"')
+
+    def __len__(self):
+        return self._connect().execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+
+class DjangoCacheBackend:
+    """
+    Delegates to one of the configured Django CACHES; eviction is left to that backend.
+    """
+
+    def __init__(self, alias='default', table='cache', **kwargs):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+        self.prefix = f"{table}:"
+
+    def get(self, key):
+        return self._cache.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(self.prefix + key, value, timeout=ttl)
+
+    def add(self, key, value, ttl=None):
+        return self._cache.add(self.prefix + key, value, timeout=ttl)
+
+    def delete(self, key):
+        self._cache.delete(self.prefix + key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return 0
+
+
+BACKENDS = {
+    'memory': MemoryCacheBackend,
+    'sqlite': SQLiteCacheBackend,
+    'django': DjangoCacheBackend,
+}
+
+
+class ResponseCache:
+    """
+    Content-addressed JSON cache with hit/miss counters on top of a pluggable backend
+    """
+
+    def __init__(self, backend, ttl=None, name='cache'):
+        self.backend = backend
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts):
+        """
+        Hash the given parts into a stable key; order and whitespace of the dict do not matter
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"Cache read failed: {str(e)}")
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        get_metrics().inc('cache_requests_total', cache=self.name, result='miss' if raw is None else 'hit')
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def peek(self, key):
+        """
+        Read a value without touching the hit/miss counters
+        """
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"Cache read failed: {str(e)}")
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.backend.set(key, json.dumps(value), ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            print(f"Cache write failed: {str(e)}")
+
+    def add(self, key, value, ttl=None):
+        """
+        Store the value only if the key is free; the atomic primitive behind shared locks
+        """
+        return self.backend.add(key, json.dumps(value), ttl if ttl is not None else self.ttl)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(setting_name, table=None):
+    """
+    Return the process-wide ResponseCache configured by ``settings.<setting_name>``.
+
+    The setting is a dict with BACKEND ('memory', 'sqlite' or 'django'), TTL,
+    MAX_ENTRIES, PATH (sqlite) and ALIAS (django).
+    """
+    table = table or setting_name.lower()
+    with _caches_lock:
+        cache = _caches.get((setting_name, table))
+        if cache is not None:
+            return cache
+        config = getattr(settings, setting_name, {}) or {}
+        backend_class = BACKENDS[config.get('BACKEND', 'memory')]
+        backend = backend_class(
+            path=config.get('PATH', settings.BASE_DIR / 'cache.sqlite3'),
+            table=table,
+            max_entries=config.get('MAX_ENTRIES', 512),
+            alias=config.get('ALIAS', 'default'),
+        )
+        cache = ResponseCache(backend, ttl=config.get('TTL'), name=table)
+        _caches[(setting_name, table)] = cache
+        return cache
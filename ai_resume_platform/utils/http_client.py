@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from .metrics import get_metrics
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_UPSTREAMS = {
+    'openrouter': {
+        'BASE_URL': 'https://openrouter.ai/api/v1',
+        'POOL_MAXSIZE': 20,
+        'CONNECT_TIMEOUT': 5,
+        'TIMEOUTS': {'chat': 30},
+        'RETRIES': 2,
+    },
+    'jsearch': {
+        'BASE_URL': 'https://jsearch.p.rapidapi.com',
+        'POOL_MAXSIZE': 10,
+        'CONNECT_TIMEOUT': 5,
+        'TIMEOUTS': {'search': 15, 'estimated-salary': 3},
+        'RETRIES': 2,
+    },
+    'cloudinary': {
+        'BASE_URL': 'https://res.cloudinary.com',
+        'POOL_MAXSIZE': 10,
+        'CONNECT_TIMEOUT': 5,
+        'TIMEOUTS': {'download': 15, 'upload': 60},
+        'RETRIES': 2,
+    },
+}
+
+
+class UpstreamClient:
+    """
+    Keep-alive HTTP client for one upstream host with per-endpoint timeouts
+    and jittered retries for idempotent calls
+    """
+
+    def __init__(self, name, base_url, pool_maxsize=10, connect_timeout=5, timeouts=None,
+                 default_timeout=10, retries=2, backoff_base=0.25, backoff_max=4.0):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # One pool per worker process; pool_block keeps us under pool_maxsize sockets
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def timeout_for(self, endpoint):
+        """
+        Return the read timeout in seconds configured for an endpoint
+        """
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def url_for(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _backoff(self, attempt, response=None):
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter: uniform over [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, path, endpoint=None, timeout=None, idempotent=None, retries=None, **kwargs):
+        """
+        Send a request and return the final response. Connection errors, timeouts and
+        429/5xx responses are retried only when the call is idempotent.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retries if retries is None else retries) if idempotent else 1
+        read_timeout = timeout if timeout is not None else self.timeout_for(endpoint)
+        url = self.url_for(path)
+        started = time.monotonic()
+        try:
+            response = self._send(method, url, attempts, read_timeout, **kwargs)
+        except Exception:
+            self._observe(endpoint, 'error', started)
+            raise
+        self._observe(endpoint, response.status_code, started)
+        return response
+
+    def _observe(self, endpoint, status, started):
+        # Whole call including retries; streamed bodies are timed to the response headers
+        get_metrics().observe(
+            'upstream_request_duration_seconds', time.monotonic() - started,
+            upstream=self.name, endpoint=endpoint or 'other', status=status,
+        )
+
+    def _send(self, method, url, attempts, read_timeout, **kwargs):
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = self.session.request(method, url, timeout=(self.connect_timeout, read_timeout), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                response.close()
+                time.sleep(self._backoff(attempt, response))
+                continue
+            return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_upstream_config(name):
+    """
+    Merge settings.UPSTREAM_HTTP[name] over the built-in defaults
+    """
+    config = dict(DEFAULT_UPSTREAMS.get(name, {}))
+    overrides = getattr(settings, 'UPSTREAM_HTTP', {}).get(name, {})
+    timeouts = dict(config.get('TIMEOUTS', {}))
+    timeouts.update(overrides.get('TIMEOUTS', {}))
+    config.update(overrides)
+    config['TIMEOUTS'] = timeouts
+    return config
+
+
+def get_client(name):
+    """
+    Return the process-wide UpstreamClient for 'openrouter', 'jsearch' or 'cloudinary'
+    """
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            config = get_upstream_config(name)
+            client = UpstreamClient(
+                name,
+                config['BASE_URL'],
+                pool_maxsize=config.get('POOL_MAXSIZE', 10),
+                connect_timeout=config.get('CONNECT_TIMEOUT', 5),
+                timeouts=config.get('TIMEOUTS'),
+                default_timeout=config.get('DEFAULT_TIMEOUT', 10),
+                retries=config.get('RETRIES', 2),
+            )
+            _clients[name] = client
+        return client
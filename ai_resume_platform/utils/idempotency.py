@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import hashlib
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from .cache import get_cache
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+PENDING = 'pending'
+
+
+def get_idempotency_store():
+    """
+    Stored responses for client idempotency keys, kept next to the AI response cache
+    """
+    return get_cache('AI_RESPONSE_CACHE', table='idempotency')
+
+
+def request_fingerprint(request):
+    """
+    Hash of the POST fields and uploaded files, so a reused key with a different payload is caught
+    """
+    digest = hashlib.sha256()
+    for key in sorted(request.POST):
+        if key in ('csrfmiddlewaretoken', 'idempotency_key'):
+            continue
+        for value in request.POST.getlist(key):
+            digest.update(f"{key}={value}\n".encode('utf-8'))
+    for key in sorted(request.FILES):
+        for upload in request.FILES.getlist(key):
+            digest.update(f"{key}@{upload.name}:{upload.size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def idempotent(view):
+    """
+    Let clients retry an async POST view safely by sending an Idempotency-Key header
+    (or an ``idempotency_key`` form field).
+
+    The first request with a key runs the view and its response is stored for
+    settings.IDEMPOTENCY_TTL seconds; repeats get the stored response instead of
+    another AI call. A repeat that arrives while the first is still running waits
+    for it. Streaming responses and server errors are not stored.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        client_key = request.headers.get(IDEMPOTENCY_HEADER) or request.POST.get('idempotency_key')
+        if request.method != 'POST' or not client_key:
+            return await view(request, *args, **kwargs)
+
+        user = await request.auser()
+        store = get_idempotency_store()
+        # The store is SQLite (or another blocking backend): keep its calls off the event loop
+        add = sync_to_async(store.add, thread_sensitive=False)
+        peek = sync_to_async(store.peek, thread_sensitive=False)
+        delete = sync_to_async(store.delete, thread_sensitive=False)
+        key = store.make_key(user=user.pk, path=request.path, key=client_key)
+        fingerprint = request_fingerprint(request)
+        ttl = getattr(settings, 'IDEMPOTENCY_TTL', 24 * 60 * 60)
+        wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 120)
+
+        try:
+            acquired = await add(key, {'state': PENDING, 'fingerprint': fingerprint}, ttl=wait_timeout)
+        except Exception as e:
+            print(f"Idempotency store failed: {str(e)}")
+            return await view(request, *args, **kwargs)
+
+        if not acquired:
+            deadline = time.monotonic() + wait_timeout
+            record = await peek(key)
+            # A different payload is rejected at once, without waiting for the first request
+            if record is not None and record.get('fingerprint') != fingerprint:
+                return JsonResponse({'error': 'Idempotency-Key was already used with a different request'}, status=422)
+            while record is not None and record.get('state') == PENDING and time.monotonic() < deadline:
+                await asyncio.sleep(0.25)
+                record = await peek(key)
+            if record is None:
+                # The first request failed and released the key; run this one instead
+                return await wrapper(request, *args, **kwargs)
+            if record.get('fingerprint') != fingerprint:
+                return JsonResponse({'error': 'Idempotency-Key was already used with a different request'}, status=422)
+            if record.get('state') == PENDING:
+                return JsonResponse({'error': 'A request with this Idempotency-Key is still in progress'}, status=409)
+            response = HttpResponse(record['body'], status=record['status'], content_type=record['content_type'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = await view(request, *args, **kwargs)
+        except Exception:
+            await delete(key)
+            raise
+
+        if response.streaming or response.status_code >= 500:
+            await delete(key)
+        else:
+            await sync_to_async(store.set, thread_sensitive=False)(key, {
+                'state': 'complete',
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'content_type': response.get('Content-Type', 'application/json'),
+                'body': response.content.decode(response.charset or 'utf-8'),
+            }, ttl=ttl)
+        return response
+
+    return wrapper
@@ -0,0 +1,122 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a streamed JSON object.
+
+    Feed it text chunks as they arrive; it returns events for each top-level
+    member as soon as its value is complete, and for each element of a top-level
+    array as soon as that element closes:
+
+        ('item', key, index, value)
+        ('section', key, value)
+
+    Text before the opening brace (e.g. a stray code fence) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.started = False
+        self.finished = False
+        self.in_string = False
+        self.escape = False
+        self.expecting_key = True
+        self.key_start = None
+        self.current_key = None
+        self.value_start = None
+        self.array_value = False
+        self.item_start = None
+        self.item_index = 0
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of text and return the list of events it completed
+        """
+        self.buffer += chunk
+        events = []
+        buffer = self.buffer
+        i = self.pos
+        while i < len(buffer) and not self.finished:
+            ch = buffer[i]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key_start is not None and self.current_key is None:
+                        self.current_key = json.loads(buffer[self.key_start:i + 1])
+                i += 1
+                continue
+
+            if not self.started:
+                if ch == '{':
+                    self.started = True
+                    self.depth = 1
+                i += 1
+                continue
+
+            if ch.isspace():
+                i += 1
+                continue
+
+            if self.depth == 1 and self.current_key is not None and self.value_start is None and ch != ':':
+                self.value_start = i
+                self.array_value = ch == '['
+                self.item_start = None
+                self.item_index = 0
+            if self.depth == 2 and self.array_value and self.item_start is None and ch not in ',]':
+                self.item_start = i
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expecting_key:
+                    self.key_start = i
+                    self.current_key = None
+                    self.expecting_key = False
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                if self.depth == 2 and self.array_value and ch == ']':
+                    self._emit_item(buffer, i, events)
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit_section(buffer, i, events)
+                    self.finished = True
+            elif ch == ',':
+                if self.depth == 1:
+                    self._emit_section(buffer, i, events)
+                elif self.depth == 2 and self.array_value:
+                    self._emit_item(buffer, i, events)
+            i += 1
+        self.pos = i
+        return events
+
+    def _emit_item(self, buffer, end, events):
+        if self.item_start is None:
+            return
+        try:
+            value = json.loads(buffer[self.item_start:end])
+        except ValueError:
+            value = None
+        if value is not None:
+            events.append(('item', self.current_key, self.item_index, value))
+        self.item_index += 1
+        self.item_start = None
+
+    def _emit_section(self, buffer, end, events):
+        if self.current_key is not None and self.value_start is not None:
+            try:
+                events.append(('section', self.current_key, json.loads(buffer[self.value_start:end])))
+            except ValueError:
+                pass
+        self.expecting_key = True
+        self.key_start = None
+        self.current_key = None
+        self.value_start = None
+        self.array_value = False
@@ -0,0 +1,275 @@
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Django view latency by URL name, method and status', LATENCY_BUCKETS),
+    'upstream_request_duration_seconds': ('histogram', 'Upstream HTTP call latency by upstream, endpoint and status', LATENCY_BUCKETS),
+    'ai_call_duration_seconds': ('histogram', 'AIService method latency, including cache lookups and waits', LATENCY_BUCKETS),
+    'jobs_salary_lookups_per_search': ('histogram', 'JSearch salary lookups fanned out by one job search', COUNT_BUCKETS),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit or miss)', None),
+    'ai_tokens_total': ('counter', 'OpenRouter tokens by task, model and type (prompt or completion)', None),
+    'ai_responses_total': ('counter', 'Parsed AI responses by task and outcome (valid, repaired, reasked, defaulted, invalid)', None),
+    'jobs_search_cache_total': ('counter', 'Job search cache lookups by outcome (fresh, stale or miss)', None),
+    'jobs_featured_reads_total': ('counter', 'Featured jobs snapshot reads by result (hit or miss)', None),
+    'jobs_featured_refresh_total': ('counter', 'Featured jobs refreshes by outcome (ok or failed)', None),
+    'jobs_salary_enrichment_total': ('counter', 'Salary estimates per distinct title and city by result (cached, fetched or pending)', None),
+    'jobs_store_searches_total': ('counter', 'Job searches answered from the local store by result (local or topped_up)', None),
+}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms aggregated across worker processes.
+
+    Each process accumulates deltas in memory and adds them to a shared SQLite
+    table every ``flush_interval`` seconds (and before every scrape) with an
+    atomic upsert, so no sample is lost between workers. The table holds one row
+    per Prometheus series, which keeps the /metrics render a single SELECT.
+    """
+
+    def __init__(self, path, flush_interval=5):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._flusher = None
+        self._ensure_table()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_table(self):
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS metrics ('
+            'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (name, labels))'
+        )
+
+    def _add(self, name, labels, value):
+        key = (name, json.dumps(labels, sort_keys=True))
+        with self._lock:
+            self.pending[key] = self.pending.get(key, 0) + value
+        self._start_flusher()
+
+    def inc(self, name, value=1, **labels):
+        """
+        Add to a counter
+        """
+        self._add(name, {key: str(label) for key, label in labels.items()}, value)
+
+    def observe(self, name, value, **labels):
+        """
+        Record one histogram observation
+        """
+        labels = {key: str(label) for key, label in labels.items()}
+        buckets = METRICS.get(name, (None, None, LATENCY_BUCKETS))[2] or LATENCY_BUCKETS
+        with self._lock:
+            # Every bucket gets a row, even at zero, so histogram_quantile sees the full range
+            for bound in buckets:
+                key = (f"{name}_bucket", json.dumps(dict(labels, le=str(bound)), sort_keys=True))
+                self.pending[key] = self.pending.get(key, 0) + (1 if value <= bound else 0)
+            for suffix, amount in (('_bucket', 1), ('_sum', value), ('_count', 1)):
+                series = dict(labels, le='+Inf') if suffix == '_bucket' else labels
+                key = (f"{name}{suffix}", json.dumps(series, sort_keys=True))
+                self.pending[key] = self.pending.get(key, 0) + amount
+        self._start_flusher()
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def flush(self):
+        """
+        Add this process's pending deltas to the shared table
+        """
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO metrics (name, labels, value) VALUES (?, ?, ?) '
+                'ON CONFLICT(name, labels) DO UPDATE SET value = value + excluded.value',
+                [(name, labels, value) for (name, labels), value in pending.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception as e:
+            print(f"Metrics flush failed: {str(e)}")
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            # Keep the deltas for the next flush
+            with self._lock:
+                for key, value in pending.items():
+                    self.pending[key] = self.pending.get(key, 0) + value
+
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def render(self):
+        """
+        All series in the Prometheus text exposition format
+        """
+        self.flush()
+        rows = self._connect().execute('SELECT name, labels, value FROM metrics ORDER BY name, labels').fetchall()
+        by_metric = {}
+        for name, labels, value in rows:
+            base = name
+            for suffix in ('_bucket', '_sum', '_count'):
+                if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                    base = name[:-len(suffix)]
+            by_metric.setdefault(base, []).append((name, json.loads(labels), value))
+
+        lines = []
+        for base in sorted(by_metric):
+            kind, help_text, _ = METRICS.get(base, ('untyped', '', None))
+            lines.append(f"# HELP {base} {help_text}")
+            lines.append(f"# TYPE {base} {kind}")
+            series = by_metric[base]
+            # Buckets in ascending order of their bound, +Inf last, as Prometheus expects
+            series.sort(key=lambda row: (row[0], _series_sort_key(row[1])))
+            for name, labels, value in series:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.labels.setdefault('status', 'error' if exc_type is not None else 'ok')
+        self.registry.observe(self.name, time.monotonic() - self.started, **self.labels)
+
+
+def _series_sort_key(labels):
+    other = sorted((key, value) for key, value in labels.items() if key != 'le')
+    bound = labels.get('le')
+    return other, float('inf') if bound == '+Inf' else float(bound) if bound is not None else 0.0
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in sorted(labels.items(), key=lambda item: (item[0] == 'le', item[0])):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Process-wide registry configured by settings.METRICS
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            config = getattr(settings, 'METRICS', {}) or {}
+            _registry = MetricsRegistry(
+                config.get('PATH', settings.BASE_DIR / 'metrics.sqlite3'),
+                flush_interval=config.get('FLUSH_INTERVAL', 5),
+            )
+        return _registry
+
+
+def timed(name, **labels):
+    """
+    Decorator recording a function's latency in histogram ``name``. Returned
+    generators (streaming AIService calls) are timed until they are exhausted.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            result = function(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return _timed_generator(result, name, labels, started)
+            get_metrics().observe(name, time.monotonic() - started, **labels)
+            return result
+        return wrapper
+    return decorator
+
+
+def _observe_request(request, response, started):
+    match = getattr(request, 'resolver_match', None)
+    # URL names, not paths, keep the label set small (404s for random paths share one series)
+    view = match.view_name if match is not None else 'unmatched'
+    get_metrics().observe(
+        'http_request_duration_seconds', time.monotonic() - started,
+        view=view, method=request.method, status=response.status_code,
+    )
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Record every request's latency by view; streaming responses are timed until their headers are ready
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.monotonic()
+            response = await get_response(request)
+            _observe_request(request, response, started)
+            return response
+    else:
+        def middleware(request):
+            started = time.monotonic()
+            response = get_response(request)
+            _observe_request(request, response, started)
+            return response
+    return middleware
+
+
+def _timed_generator(generator, name, labels, started):
+    try:
+        yield from generator
+    finally:
+        get_metrics().observe(name, time.monotonic() - started, **dict(labels, stream='true'))
@@ -0,0 +1,176 @@
+import threading
+from django.conf import settings
+from .cache import get_cache
+from .metrics import get_metrics
+from .prompts import TEMPLATES
+
+# Used when settings define no tiers: the single model every task used before routing
+DEFAULT_TIERS = {
+    'standard': {'MODEL': 'openai/gpt-3.5-turbo', 'TEMPERATURE': 0.7},
+}
+DEFAULT_ROUTE = ['standard']
+
+
+class ModelRoute:
+    """
+    One step of a task's route: a tier's model, sampling parameters and prices
+    """
+
+    def __init__(self, task, tier, model, temperature=0.7, max_tokens=None, input_cost=0.0, output_cost=0.0):
+        self.task = task
+        self.tier = tier
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        # USD per million tokens
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+
+    @property
+    def name(self):
+        return f"{self.task}:{self.tier}"
+
+    def max_tokens_for(self, prompt):
+        """
+        The prompt's completion budget, capped by the tier's MAX_TOKENS when set
+        """
+        if self.max_tokens:
+            return min(prompt.max_tokens, self.max_tokens)
+        return prompt.max_tokens
+
+    def cost(self, prompt_tokens, completion_tokens):
+        return (prompt_tokens * self.input_cost + completion_tokens * self.output_cost) / 1000000
+
+
+class ModelRouter:
+    """
+    Maps each AIService task (the prompt template name) to an ordered list of
+    model tiers. The first tier serves the call; the others are fallbacks tried
+    in order when a model errors or times out.
+
+    Latency, tokens and cost are recorded per route in the shared store, so the
+    figures cover every worker. Updates are read-modify-write without a lock,
+    which can drop a sample under heavy concurrency; that is fine for reporting.
+    """
+
+    def __init__(self, tiers, routes, store):
+        self.tiers = tiers or DEFAULT_TIERS
+        self.routes = routes or {}
+        self.store = store
+
+    def tier_names_for(self, task):
+        names = self.routes.get(task) or self.routes.get('default') or DEFAULT_ROUTE
+        known = [name for name in names if name in self.tiers]
+        return known or [next(iter(self.tiers))]
+
+    def routes_for(self, task):
+        """
+        The ModelRoutes to try for a task, in order
+        """
+        routes = []
+        for tier in self.tier_names_for(task):
+            config = self.tiers[tier]
+            routes.append(ModelRoute(
+                task,
+                tier,
+                config['MODEL'],
+                temperature=config.get('TEMPERATURE', 0.7),
+                max_tokens=config.get('MAX_TOKENS'),
+                input_cost=config.get('INPUT_COST', 0.0),
+                output_cost=config.get('OUTPUT_COST', 0.0),
+            ))
+        return routes
+
+    def route_for_model(self, route, model):
+        """
+        The route that actually served a call answered by ``model`` instead of route's own model
+        (a hedged request on the fallback model): the task's tier for that model, else an
+        unpriced 'hedge' tier with the route's sampling parameters
+        """
+        if model == route.model:
+            return route
+        for tier in self.tier_names_for(route.task) + list(self.tiers):
+            config = self.tiers[tier]
+            if config['MODEL'] == model:
+                return ModelRoute(
+                    route.task,
+                    tier,
+                    model,
+                    temperature=route.temperature,
+                    max_tokens=route.max_tokens,
+                    input_cost=config.get('INPUT_COST', 0.0),
+                    output_cost=config.get('OUTPUT_COST', 0.0),
+                )
+        return ModelRoute(route.task, 'hedge', model, temperature=route.temperature, max_tokens=route.max_tokens)
+
+    def record(self, route, latency, prompt_tokens=0, completion_tokens=0, ok=True, fallback=False):
+        """
+        Add one call to the route's running totals
+        """
+        key = f"route:{route.name}"
+        try:
+            stats = self.store.peek(key) or {
+                'calls': 0, 'errors': 0, 'fallbacks': 0, 'latency_total': 0.0, 'latency_max': 0.0,
+                'prompt_tokens': 0, 'completion_tokens': 0, 'cost': 0.0,
+            }
+            stats['calls'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['fallbacks'] += 1 if fallback else 0
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            stats['prompt_tokens'] += prompt_tokens
+            stats['completion_tokens'] += completion_tokens
+            stats['cost'] += route.cost(prompt_tokens, completion_tokens)
+            stats['model'] = route.model
+            self.store.set(key, stats, ttl=30 * 24 * 60 * 60)
+            metrics = get_metrics()
+            metrics.inc('ai_tokens_total', prompt_tokens, task=route.task, model=route.model, type='prompt')
+            metrics.inc('ai_tokens_total', completion_tokens, task=route.task, model=route.model, type='completion')
+        except Exception as e:
+            print(f"Could not record model route stats for {route.name}: {str(e)}")
+
+    def stats(self):
+        """
+        Totals for every route that has served a call
+        """
+        report = []
+        tasks = ({template.name for template in TEMPLATES} | set(self.routes)) - {'default'}
+        for task in sorted(tasks):
+            for route in self.routes_for(task):
+                stats = self.store.peek(f"route:{route.name}")
+                if not stats:
+                    continue
+                calls = stats['calls']
+                report.append({
+                    'route': route.name,
+                    'model': stats.get('model', route.model),
+                    'calls': calls,
+                    'errors': stats['errors'],
+                    'fallbacks': stats['fallbacks'],
+                    'average_latency': round(stats['latency_total'] / calls, 3),
+                    'max_latency': round(stats['latency_max'], 3),
+                    'prompt_tokens': stats['prompt_tokens'],
+                    'completion_tokens': stats['completion_tokens'],
+                    'cost_usd': round(stats['cost'], 6),
+                    'cost_per_call_usd': round(stats['cost'] / calls, 6),
+                })
+        return report
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """
+    Process-wide router configured by settings.AI_MODEL_TIERS and settings.AI_TASK_ROUTES
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                getattr(settings, 'AI_MODEL_TIERS', {}),
+                getattr(settings, 'AI_TASK_ROUTES', {}),
+                get_cache('AI_RESPONSE_CACHE', table='model_routes'),
+            )
+        return _router
@@ -0,0 +1,365 @@
+import html
+import re
+import string
+import textwrap
+from django.conf import settings
+
+SYSTEM_PROMPT = "You are an expert career advisor and resume consultant. Always respond with valid JSON only, no markdown, no explanations."
+
+# Words, digit groups and single punctuation marks are roughly what BPE tokenizers emit
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_SENTENCE_END = re.compile(r"[.!?;\n]")
+_formatter = string.Formatter()
+
+# Sentences that carry no matching signal: EEO statements, application boilerplate
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"equal (employment )?opportunity",
+        r"without regard to (race|age|gender|sex|religion)",
+        r"reasonable accommodation",
+        r"e-?verify",
+        r"(click|press) (here|apply)",
+        r"to apply,? (please )?(send|submit|email)",
+        r"(we are|is) an? (affirmative action|equal)",
+    )
+]
+
+
+def estimate_tokens(text):
+    """
+    Local token estimate for GPT-style tokenizers, without calling a tokenizer.
+
+    Short words are one token and long ones are split roughly every eight letters;
+    digits go in groups of three and every punctuation mark counts. It slightly
+    overestimates English prose, which is the safe side for budgets.
+    """
+    if not text:
+        return 1
+    return max(1, sum(_piece_tokens(piece) for piece in _TOKEN_PATTERN.findall(text)))
+
+
+def _piece_tokens(piece):
+    if piece[0].isalpha():
+        return 1 + len(piece) // 8
+    if piece[0].isdigit():
+        return (len(piece) + 2) // 3
+    return 1
+
+
+def truncate_to_tokens(text, budget):
+    """
+    Cut text to about ``budget`` tokens, preferring to end on a sentence boundary
+    """
+    if not text or estimate_tokens(text) <= budget:
+        return text
+    # Find the character offset where the budget runs out
+    used = 0
+    end = len(text)
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > budget:
+            end = match.start()
+            break
+    cut = text[:end]
+    boundary = max((m.end() for m in _SENTENCE_END.finditer(cut)), default=0)
+    if boundary > len(cut) * 0.6:
+        cut = cut[:boundary]
+    return cut.rstrip() + " [...]"
+
+
+def clean_text(text):
+    """
+    Strip markup, control characters and excess whitespace from user-supplied text
+    """
+    if not text:
+        return ''
+    text = html.unescape(_TAG_PATTERN.sub(' ', str(text)))
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # Tabs, non-breaking and other odd spaces become plain spaces; other control characters go
+    text = ''.join(
+        ch if ch == '\n' or ch.isprintable() else ' ' if ch.isspace() else ''
+        for ch in text
+    )
+    lines = [re.sub(r"[ \t]+", ' ', line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", '\n'.join(lines)).strip()
+
+
+def clean_job_description(text):
+    """
+    Clean a job description and drop boilerplate and repeated sentences
+    """
+    text = clean_text(text)
+    seen = set()
+    kept = []
+    for line in text.split('\n'):
+        sentences = []
+        for sentence in re.split(r"(?<=[.!?])\s+", line):
+            key = sentence.lower()
+            if key in seen or any(pattern.search(sentence) for pattern in BOILERPLATE_PATTERNS):
+                continue
+            seen.add(key)
+            sentences.append(sentence)
+        kept.append(' '.join(sentences).strip())
+    return re.sub(r"\n{3,}", "\n\n", '\n'.join(kept)).strip()
+
+
+class RenderedPrompt:
+    """
+    A prompt ready to send: its text plus the template it came from and its output budget
+    """
+
+    def __init__(self, template, text, max_tokens):
+        self.template = template
+        self.text = text
+        self.max_tokens = max_tokens
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def version(self):
+        return self.template.version
+
+    @property
+    def input_tokens(self):
+        return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(self.text)
+
+
+class PromptTemplate:
+    """
+    Versioned prompt template, compacted once at import.
+
+    ``budgets`` caps each field in tokens (job descriptions are also cleaned);
+    ``max_tokens`` is the completion budget, plus ``max_tokens_per_item`` for each
+    item of a batched prompt. Both can be overridden per template through
+    settings.AI_PROMPT_BUDGETS, e.g. {'match_job': {'job_description': 500, 'max_tokens': 400}}.
+    """
+
+    def __init__(self, name, version, text, max_tokens, budgets=None, max_tokens_per_item=0):
+        self.name = name
+        self.version = version
+        self.text = self.compact(text)
+        self.default_max_tokens = max_tokens
+        self.default_budgets = budgets or {}
+        self.max_tokens_per_item = max_tokens_per_item
+        self.fields = sorted({name for _, name, _, _ in _formatter.parse(self.text) if name})
+        # Tokens spent on instructions alone, before any field is filled in
+        self.overhead_tokens = estimate_tokens(self.text.format(**{field: '' for field in self.fields}))
+
+    @staticmethod
+    def compact(text):
+        """
+        Dedent, strip trailing spaces and collapse blank-line runs
+        """
+        lines = [line.rstrip() for line in textwrap.dedent(text).strip().splitlines()]
+        return re.sub(r"\n{3,}", "\n\n", '\n'.join(lines))
+
+    def _overrides(self):
+        return (getattr(settings, 'AI_PROMPT_BUDGETS', {}) or {}).get(self.name, {})
+
+    @property
+    def budgets(self):
+        overrides = self._overrides()
+        return {field: overrides.get(field, budget) for field, budget in self.default_budgets.items()}
+
+    @property
+    def max_tokens(self):
+        return self._overrides().get('max_tokens', self.default_max_tokens)
+
+    def fit(self, field, value):
+        """
+        Clean a field value and truncate it to the field's budget
+        """
+        if field in ('job_description', 'description'):
+            value = clean_job_description(value)
+        elif isinstance(value, str):
+            value = clean_text(value)
+        budget = self.budgets.get(field)
+        if budget and isinstance(value, str):
+            value = truncate_to_tokens(value, budget)
+        return value
+
+    def render(self, items=1, **fields):
+        """
+        Fill the template; ``items`` scales the completion budget for batched prompts
+        """
+        values = {field: self.fit(field, fields.get(field, '')) for field in self.fields}
+        max_tokens = self.max_tokens + self.max_tokens_per_item * max(0, items - 1)
+        return RenderedPrompt(self, self.text.format(**values), max_tokens)
+
+
+# ats_score, industry_scores and best_programming_languages are computed locally
+# (apps/analyzer/utils/ats_scorer.py and skills.py)
+ANALYZE_RESUME = PromptTemplate('analyze_resume', 4, """
+    Analyze this resume, extracted from a PDF. Use ONLY its content; do not assume missing information.
+
+    RESUME:
+    {resume_text}
+
+    Definitions:
+    - strengths: repeated skills/keywords, clear achievements and impact, strong structure and grammar, role-relevant experience
+    - weaknesses: content that is generic, weakly worded, outdated, irrelevant or overused without impact
+    - missing_elements: absent skills, metrics, industry keywords, action verbs, clarity or structure
+
+    Return JSON:
+    {{"summary": "overall impression",
+    "strengths": [5 points], "weaknesses": [5 points], "missing_elements": [5 points],
+    "suggestions": [3 suggestions]}}
+""", max_tokens=800, budgets={'resume_text': 3500})
+
+# Re-analysis of a revised resume: only the changed sections plus the previous answer (see AIService.analyze_resume)
+ANALYZE_RESUME_DELTA = PromptTemplate('analyze_resume_delta', 2, """
+    This resume was revised after the analysis below. Update the analysis using ONLY the resume content.
+
+    CHANGED SECTIONS (new text):
+    {changed_text}
+
+    REMOVED SECTIONS: {removed_sections}
+
+    EARLIER ANALYSIS:
+    {previous_analysis}
+
+    Keep every point that still holds. Return JSON with ONLY the keys whose content changes, each in full,
+    in the same format as the earlier analysis (summary, strengths, weaknesses, missing_elements, suggestions).
+""", max_tokens=800, budgets={'changed_text': 2500, 'previous_analysis': 1200})
+
+# Matched and missing skills come from the local skill taxonomy (apps/analyzer/utils/skills.py)
+MATCH_JOB = PromptTemplate('match_job', 3, """
+    You are an ATS job matching engine. Match strictly on the resume content; do not rewrite it or assume unlisted skills.
+
+    RESUME:
+    {resume_text}
+
+    JOB:
+    Title: {job_title}
+    Company: {company}
+    Level: {job_level}
+    Salary: {salary}
+    Description: {job_description}
+
+    Return JSON:
+    {{"match_percentage": 0-100, "summary_overview": "short match summary",
+    "strength_alignment": [3 points],
+    "final_verdict": "one-line hiring recommendation"}}
+""", max_tokens=450, budgets={'resume_text': 3500, 'job_description': 700})
+
+MATCH_JOBS_PACKED = PromptTemplate('match_jobs_packed', 3, """
+    You are an ATS job matching engine. Match strictly on the resume content; do not rewrite it or assume unlisted skills.
+
+    RESUME:
+    {resume_text}
+
+    Compare the resume with EACH of these {job_count} jobs independently:
+
+    {jobs_text}
+
+    Return JSON with exactly one entry per job, using its JOB number:
+    {{"matches": [{{"job_number": n, "match_percentage": 0-100, "summary_overview": "short match summary",
+    "strength_alignment": [3 points],
+    "final_verdict": "one-line hiring recommendation"}}]}}
+""", max_tokens=450, max_tokens_per_item=400, budgets={'resume_text': 3500})
+
+# One job inside MATCH_JOBS_PACKED; its description budget matches the packing threshold
+PACKED_JOB = PromptTemplate('packed_job', 2, """
+    JOB {number}
+    Title: {title}
+    Company: {company}
+    Level: {level}
+    Salary: {salary}
+    Description: {description}
+""", max_tokens=0, budgets={'description': 350})
+
+GENERATE_RESUME = PromptTemplate('generate_resume', 2, """
+    Write a professional resume for:
+    Name: {name}
+    Email: {email}
+    Phone: {phone}
+    Target job: {target_job}
+    Industry: {industry}
+    Experience level: {experience_level}
+
+    Return JSON:
+    {{"name": "", "email": "", "phone": "", "summary": "",
+    "experience": [{{"title": "", "company": "", "duration": "", "description": ""}}],
+    "education": [{{"degree": "", "school": "", "year": ""}}],
+    "skills": []}}
+""", max_tokens=1000, budgets={'target_job': 100})
+
+PLAN_CAREER = PromptTemplate('plan_career', 2, """
+    You are a career mentor and skill strategist. Base everything on this resume and the user's goal; be realistic about the timeframe.
+
+    RESUME:
+    {resume_text}
+
+    GOAL:
+    - Aim: {career_goal}
+    - Timeframe: {timeframe}
+    - Industry: {preferred_industry}
+    - Current skill level: {current_skill_level}
+    - Learning hours per week: {learning_commitment}
+    - Target outcome: {target_outcome}
+
+    Focus only on what the user should DO: skills, learning steps, habits, projects, certifications.
+    Do NOT suggest job titles, companies, job switches or career roles.
+
+    Return JSON:
+    {{"goal_clarity": "how realistic the goal is",
+    "skill_gap_analysis": [3 missing or weak skills],
+    "learning_roadmap": [{{"phase": "Phase 1 (0-X months)", "focus": "main focus", "actions": [3 actions]}}, ...],
+    "projects_to_build": [3 project ideas], "daily_weekly_habits": [3 habits],
+    "recommended_certifications": [certifications, if useful],
+    "final_guidance": "practical closing advice"}}
+""", max_tokens=1200, budgets={
+    'resume_text': 3500, 'career_goal': 150, 'target_outcome': 150, 'preferred_industry': 50,
+})
+
+OPTIMIZE_RESUME = PromptTemplate('optimize_resume', 2, """
+    Rewrite this EXISTING resume into a final, ATS-compliant PDF resume aligned with the job description.
+
+    RESUME:
+    {resume_text}
+
+    INPUTS:
+    Template: {template_type}
+    Target company: {target_company}
+    Target role: {target_job_role}
+    Job description: {job_description}
+    Skills to emphasize: {skills_to_highlight}
+    Projects: {projects}
+    Achievements: {achievements}
+    Experience level: {experience_level}
+    Notes: {additional_notes}
+
+    The template changes only visual structure, never content: Cosmic bold hierarchy; Nebula creative but ATS-safe;
+    Lunar minimal; Eclipse executive impact bullets; Eon timeline; Orion technical, skill-forward;
+    Nova early career; Stellar leadership and achievements; Quantum data and metrics. No tables or graphics.
+
+    Use ONLY the resume and inputs. You may rewrite bullets, improve clarity, add action verbs and align wording
+    with job description keywords. Do NOT invent companies, roles, experience, certifications, metrics or achievements.
+
+    Return JSON with no extra keys:
+    {{"pdf_resume": {{"template_used": "{template_type}",
+    "header": {{"name": "from the resume", "title": "title aligned with the role", "summary": "3-4 line tailored summary"}},
+    "skills": [],
+    "experience": [{{"company": "", "role": "", "duration": "", "bullets": [impact-focused, keyword-aligned bullets]}}],
+    "projects": [{{"name": "", "description": "result-oriented description"}}],
+    "education": [{{"degree": "", "institution": "", "year": ""}}],
+    "certifications": [only those in the original resume]}}}}
+""", max_tokens=1800, budgets={
+    'resume_text': 3500, 'job_description': 900, 'skills_to_highlight': 150, 'projects': 400,
+    'achievements': 300, 'additional_notes': 200, 'target_company': 30, 'target_job_role': 30,
+    'template_type': 10,
+})
+
+# Follow-up asking only for the members a response was missing (see response_schema.py)
+REASK_MISSING = PromptTemplate('reask_missing', 1, """
+    Your JSON answer was cut off or left out: {fields}.
+    Return JSON with ONLY these keys, filled in as the original request asked:
+    {shape}
+""", max_tokens=0)
+
+TEMPLATES = [
+    ANALYZE_RESUME, ANALYZE_RESUME_DELTA, MATCH_JOB, MATCH_JOBS_PACKED, GENERATE_RESUME, PLAN_CAREER, OPTIMIZE_RESUME,
+]
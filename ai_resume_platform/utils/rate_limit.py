@@ -0,0 +1,297 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from .cache import get_cache
+
+RATE_LIMIT_MESSAGE = "Too many requests right now. Please try again in a minute."
+
+DEFAULT_LIMITS = {
+    'RATE': 1.0,
+    'BURST': 10,
+    'USER_RATE': 0.2,
+    'USER_BURST': 5,
+    'MAX_WAIT': 30,
+    # Global tokens background calls (prefetch, refresh, enrichment) must leave for user requests
+    'BACKGROUND_RESERVE': 0,
+}
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a request waited MAX_WAIT seconds without getting a token
+    """
+
+
+class RateLimiter:
+    """
+    Token buckets per upstream (global) and per user, with fair queuing.
+
+    State for each upstream is one record in the shared store, updated under a
+    short lock taken with the store's atomic add, so every worker process sees
+    the same buckets. A request that finds no token does not fail: it takes a
+    ticket in its user's queue and waits. Tokens are handed out round-robin
+    across users with waiting tickets (and their own tokens left), so a user
+    who fires dozens of requests only delays their own queue. Requests give up
+    with RateLimitExceeded after MAX_WAIT seconds. Waiters sleep until a token
+    can next be theirs and re-read the state without the lock, taking it only
+    when they could be served, so a burst of waiters does not turn the lock
+    itself into the main source of store writes.
+
+    Background calls that no user is waiting on directly draw from the global
+    bucket only: they never queue, are served only while no user request is
+    waiting, and leave BACKGROUND_RESERVE tokens for user requests.
+    """
+
+    def __init__(self, store, limits=None, lock_ttl=2, poll_interval=0.1):
+        self.store = store
+        self.limits = limits or {}
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    def config(self, upstream):
+        return dict(DEFAULT_LIMITS, **self.limits.get(upstream, {}))
+
+    def acquire(self, upstream, user_key=None, background=False, max_wait=None):
+        """
+        Block until the upstream and the user both have a token; return the seconds waited.
+        With background=True only the global bucket is charged (see the class docstring).
+        max_wait shortens MAX_WAIT for callers with their own deadline; 0 never waits.
+        """
+        config = self.config(upstream)
+        if max_wait is not None:
+            config['MAX_WAIT'] = min(config['MAX_WAIT'], max(0.0, max_wait))
+        if background:
+            return self._acquire_background(upstream, config)
+        user_key = str(user_key or 'anonymous')
+        ticket = uuid.uuid4().hex
+        started = time.monotonic()
+        deadline = started + config['MAX_WAIT']
+        # The first attempt takes the lock: it is served at once or queues its ticket
+        granted, retry_in = self._try_acquire(upstream, config, user_key, ticket, deadline)
+        while True:
+            if granted:
+                waited = time.monotonic() - started
+                if waited >= 1:
+                    print(f"Rate limiter: {upstream} request for user {user_key} waited {waited:.1f}s")
+                return waited
+            if time.monotonic() >= deadline:
+                self._leave(upstream, config, user_key, ticket)
+                raise RateLimitExceeded(RATE_LIMIT_MESSAGE)
+            time.sleep(min(max(retry_in, 0.01), max(0.0, deadline - time.monotonic())))
+            servable, retry_in = self._turn(self._load(upstream, config), config, user_key, ticket)
+            if servable:
+                granted, retry_in = self._try_acquire(upstream, config, user_key, ticket, deadline)
+
+    def _acquire_background(self, upstream, config):
+        started = time.monotonic()
+        deadline = started + config['MAX_WAIT']
+        needed = 1 + config['BACKGROUND_RESERVE']
+        while True:
+            # Read without the lock; take it only when a token looks free for background work
+            state = self._load(upstream, config)
+            if not state['queues'] and state['tokens'] >= needed:
+                with self._locked(upstream):
+                    state = self._load(upstream, config)
+                    granted = not state['queues'] and state['tokens'] >= needed
+                    if granted:
+                        state['tokens'] -= 1
+                        state['waits']['background'] = state['waits'].get('background', 0) + 1
+                        self._save(upstream, state)
+                if granted:
+                    return time.monotonic() - started
+            if time.monotonic() >= deadline:
+                raise RateLimitExceeded(RATE_LIMIT_MESSAGE)
+            retry_in = (needed - state['tokens']) / config['RATE'] if state['tokens'] < needed else self.poll_interval
+            time.sleep(min(max(retry_in, 0.01), max(0.0, deadline - time.monotonic())))
+
+    def status(self, upstream):
+        """
+        Current tokens, queue depth per user and wait statistics for an upstream
+        """
+        config = self.config(upstream)
+        with self._locked(upstream):
+            state = self._load(upstream, config)
+        waits = state['waits']
+        return {
+            'upstream': upstream,
+            'tokens': round(state['tokens'], 2),
+            'capacity': config['BURST'],
+            'rate_per_second': config['RATE'],
+            'queue_depth': sum(len(tickets) for tickets in state['queues'].values()),
+            'queued_by_user': {user: len(tickets) for user, tickets in state['queues'].items() if tickets},
+            'served': waits['count'],
+            'background_served': waits.get('background', 0),
+            'queued': waits['queued'],
+            'average_wait': round(waits['total'] / waits['count'], 3) if waits['count'] else 0.0,
+            'max_wait': round(waits['max'], 3),
+        }
+
+    def _key(self, upstream):
+        return f"ratelimit:{upstream}"
+
+    def _locked(self, upstream):
+        return _StoreLock(self.store, f"lock:{self._key(upstream)}", self.lock_ttl)
+
+    def _load(self, upstream, config):
+        now = time.time()
+        state = self.store.peek(self._key(upstream)) or {
+            'tokens': config['BURST'], 'updated': now, 'users': {}, 'queues': {}, 'order': [],
+            'last_served': None, 'waits': {'count': 0, 'queued': 0, 'total': 0.0, 'max': 0.0},
+        }
+        # Refill the global bucket and every user bucket for the time since the last update
+        elapsed = max(0.0, now - state['updated'])
+        state['tokens'] = min(config['BURST'], state['tokens'] + elapsed * config['RATE'])
+        for bucket in state['users'].values():
+            bucket['tokens'] = min(config['USER_BURST'], bucket['tokens'] + elapsed * config['USER_RATE'])
+        state['updated'] = now
+        # Drop tickets of requests that gave up or died
+        for user, tickets in list(state['queues'].items()):
+            tickets[:] = [entry for entry in tickets if entry[1] > now]
+            if not tickets:
+                del state['queues'][user]
+        state['order'] = [user for user in state['order'] if user in state['queues']]
+        # Forget users whose bucket is full again and who have nothing queued
+        for user in list(state['users']):
+            if user not in state['queues'] and state['users'][user]['tokens'] >= config['USER_BURST']:
+                del state['users'][user]
+        return state
+
+    def _save(self, upstream, state):
+        self.store.set(self._key(upstream), state, ttl=24 * 60 * 60)
+
+    def _next_user(self, state):
+        """
+        The next user in round-robin order who has a waiting ticket and a token of their own
+        """
+        order = state['order']
+        if not order:
+            return None
+        start = order.index(state['last_served']) + 1 if state['last_served'] in order else 0
+        for offset in range(len(order)):
+            user = order[(start + offset) % len(order)]
+            if state['users'].get(user, {}).get('tokens', 0) >= 1:
+                return user
+        return None
+
+    def _try_acquire(self, upstream, config, user_key, ticket, deadline):
+        with self._locked(upstream):
+            state = self._load(upstream, config)
+            bucket = state['users'].setdefault(user_key, {'tokens': config['USER_BURST']})
+            queue = state['queues'].get(user_key)
+
+            # Fast path: nobody is waiting and both buckets have a token
+            if not state['queues'] and state['tokens'] >= 1 and bucket['tokens'] >= 1:
+                self._grant(state, user_key, bucket, waited_from=None)
+                self._save(upstream, state)
+                return True, 0
+
+            if queue is None or not any(entry[0] == ticket for entry in queue):
+                queue = state['queues'].setdefault(user_key, [])
+                # The ticket outlives the wait a little so a crashed worker's ticket expires
+                queue.append([ticket, time.time() + (deadline - time.monotonic()) + 5, time.time()])
+                if user_key not in state['order']:
+                    state['order'].append(user_key)
+                state['waits']['queued'] += 1
+
+            granted = False
+            if state['tokens'] >= 1 and self._next_user(state) == user_key and queue[0][0] == ticket:
+                entry = queue.pop(0)
+                if not queue:
+                    del state['queues'][user_key]
+                self._grant(state, user_key, bucket, waited_from=entry[2])
+                granted = True
+            self._save(upstream, state)
+
+        if granted:
+            return True, 0
+        return False, self._turn(state, config, user_key, ticket)[1]
+
+    def _turn(self, state, config, user_key, ticket):
+        """
+        (whether the ticket could be served now, seconds until that can change) for a
+        state read with or without the lock
+        """
+        bucket = state['users'].get(user_key, {'tokens': config['USER_BURST']})
+        if state['tokens'] < 1 or bucket['tokens'] < 1:
+            # Sleep until both this user's bucket and the global one have refilled a token
+            return False, max((1 - state['tokens']) / config['RATE'], (1 - bucket['tokens']) / config['USER_RATE'])
+        queue = state['queues'].get(user_key) or []
+        if not any(entry[0] == ticket for entry in queue):
+            # Served by the fast path, or the ticket was lost with the state: try (and re-queue)
+            return True, 0
+        if queue[0][0] == ticket and self._next_user(state) == user_key:
+            return True, 0
+        # Tokens are free but other tickets come first; they are served within a poll or two
+        return False, self.poll_interval
+
+    def _grant(self, state, user_key, bucket, waited_from):
+        state['tokens'] -= 1
+        bucket['tokens'] -= 1
+        state['last_served'] = user_key
+        waits = state['waits']
+        waits['count'] += 1
+        if waited_from is not None:
+            waited = max(0.0, time.time() - waited_from)
+            waits['total'] += waited
+            waits['max'] = max(waits['max'], waited)
+
+    def _leave(self, upstream, config, user_key, ticket):
+        with self._locked(upstream):
+            state = self._load(upstream, config)
+            queue = state['queues'].get(user_key, [])
+            queue[:] = [entry for entry in queue if entry[0] != ticket]
+            if not queue:
+                state['queues'].pop(user_key, None)
+            self._save(upstream, state)
+
+
+class _StoreLock:
+    """
+    Short mutual-exclusion lock on a store key, taken with its atomic add
+    """
+
+    def __init__(self, store, key, ttl):
+        self.store = store
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.ttl * 2
+        while True:
+            try:
+                if self.store.add(self.key, self.token, ttl=self.ttl):
+                    return self
+            except Exception as e:
+                print(f"Rate limiter lock failed: {str(e)}")
+                return self
+            if time.monotonic() >= deadline:
+                # The holder died mid-update; its lock expires on its own, so carry on
+                return self
+            time.sleep(0.005)
+
+    def __exit__(self, *exc_info):
+        try:
+            if self.store.peek(self.key) == self.token:
+                self.store.delete(self.key)
+        except Exception:
+            pass
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Process-wide limiter configured by settings.RATE_LIMITS, sharing state through the cache store
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                get_cache('AI_RESPONSE_CACHE', table='rate_limits'),
+                limits=getattr(settings, 'RATE_LIMITS', {}),
+            )
+        return _limiter
@@ -0,0 +1,315 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from django.conf import settings
+from .cache import get_cache
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+CIRCUIT_OPEN_MESSAGE = "The AI service is temporarily unavailable. Please try again shortly."
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit breaker is open
+    """
+
+
+class StreamError(Exception):
+    """
+    Raised by a stream reader for an error the upstream reported in the middle of a stream
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker whose state lives in a shared store, so every worker process
+    on the host trips and recovers together.
+
+    ``failure_threshold`` failures within ``window`` seconds open the circuit and
+    calls fail fast. After ``recovery_timeout`` seconds one caller (chosen with an
+    atomic add in the store) is let through as a probe; its success closes the
+    circuit, its failure opens it again. Failure counting is read-modify-write, so
+    under heavy concurrency the threshold is approximate, which is fine for tripping.
+    """
+
+    def __init__(self, name, store, failure_threshold=5, window=60, recovery_timeout=30):
+        self.name = name
+        self.store = store
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.recovery_timeout = recovery_timeout
+        self.key = f"breaker:{name}"
+        self.probe_key = f"breaker-probe:{name}"
+
+    def _load(self):
+        state = self.store.peek(self.key)
+        return state or {'state': CLOSED, 'failures': 0, 'window_start': time.time(), 'opened_at': None}
+
+    def _save(self, state):
+        self.store.set(self.key, state, ttl=max(self.window, self.recovery_timeout) * 10)
+
+    @property
+    def state(self):
+        state = self._load()
+        if state['state'] == OPEN and time.time() - state['opened_at'] >= self.recovery_timeout:
+            return HALF_OPEN
+        return state['state']
+
+    def allow(self):
+        """
+        True if a call may go ahead now
+        """
+        state = self._load()
+        if state['state'] == CLOSED:
+            return True
+        if time.time() - (state['opened_at'] or 0) < self.recovery_timeout:
+            return False
+        # Recovery time is up: exactly one caller gets to probe the upstream
+        try:
+            return self.store.add(self.probe_key, True, ttl=self.recovery_timeout)
+        except Exception:
+            return True
+
+    def record_success(self):
+        state = self._load()
+        if state['state'] != CLOSED or state['failures']:
+            self._save({'state': CLOSED, 'failures': 0, 'window_start': time.time(), 'opened_at': None})
+            self.store.delete(self.probe_key)
+
+    def record_failure(self):
+        now = time.time()
+        state = self._load()
+        if state['state'] != CLOSED:
+            # The probe failed: stay open for another recovery period
+            self._save(dict(state, state=OPEN, opened_at=now))
+            self.store.delete(self.probe_key)
+            return
+        if now - state['window_start'] > self.window:
+            state = {'state': CLOSED, 'failures': 0, 'window_start': now, 'opened_at': None}
+        state['failures'] += 1
+        if state['failures'] >= self.failure_threshold:
+            print(f"Circuit breaker '{self.name}' opened after {state['failures']} failures")
+            state.update(state=OPEN, opened_at=now)
+        self._save(state)
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies (per process) with percentile lookups
+    """
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, percent):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientChatClient:
+    """
+    Wraps the pooled OpenRouter client with a circuit breaker, timeouts derived
+    from observed p95 latency, and an optional hedged second request.
+
+    The read timeout is p95 x TIMEOUT_MULTIPLIER, clamped between TIMEOUT_FLOOR
+    and the configured chat timeout, so a slow upstream costs each worker bounded
+    time instead of the full ceiling. With hedging on, a request still running at
+    the HEDGE_PERCENTILE latency gets a second copy (on FALLBACK_MODEL if set) and
+    whichever succeeds first wins. Latencies are tracked per (model, max_tokens)
+    because completion budgets differ a lot between tasks.
+    """
+
+    def __init__(self, client, breaker, config):
+        self.client = client
+        self.breaker = breaker
+        self.ceiling = client.timeout_for('chat')
+        self.floor = config.get('TIMEOUT_FLOOR', 8)
+        self.percentile = config.get('TIMEOUT_PERCENTILE', 95)
+        self.multiplier = config.get('TIMEOUT_MULTIPLIER', 2.0)
+        self.min_samples = config.get('TIMEOUT_MIN_SAMPLES', 20)
+        self.hedge_enabled = config.get('HEDGE_ENABLED', False)
+        self.hedge_after = config.get('HEDGE_AFTER', 10)
+        self.hedge_percentile = config.get('HEDGE_PERCENTILE', 90)
+        self.fallback_model = config.get('FALLBACK_MODEL', '')
+        self.trackers = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def tracker_for(self, data):
+        key = (data.get('model'), data.get('max_tokens'))
+        with self._lock:
+            tracker = self.trackers.get(key)
+            if tracker is None:
+                tracker = self.trackers[key] = LatencyTracker()
+            return tracker
+
+    def timeout_for(self, data):
+        """
+        Read timeout for a request: adaptive once enough latencies have been seen
+        """
+        tracker = self.tracker_for(data)
+        if len(tracker) < self.min_samples:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, tracker.percentile(self.percentile) * self.multiplier))
+
+    def hedge_delay_for(self, data):
+        tracker = self.tracker_for(data)
+        if len(tracker) < self.min_samples:
+            return self.hedge_after
+        return tracker.percentile(self.hedge_percentile)
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'AI_ASYNC_MAX_WORKERS', 200),
+                    thread_name_prefix='ai-hedge'
+                )
+            return self._executor
+
+    @staticmethod
+    def is_failure(response):
+        return response.status_code >= 500 or response.status_code == 429
+
+    def post(self, url, data, headers):
+        """
+        POST a chat completion and return (response, model that answered), which is the
+        fallback model when a hedge won; raises CircuitOpenError when the breaker is open
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(CIRCUIT_OPEN_MESSAGE)
+        timeout = self.timeout_for(data)
+        try:
+            if self.hedge_enabled:
+                response, elapsed, winner = self._hedged_post(url, data, headers, timeout)
+            else:
+                response, elapsed = self._attempt(url, data, headers, timeout)
+                winner = data
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            self.breaker.record_failure()
+            raise
+        if self.is_failure(response):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.tracker_for(winner).observe(elapsed)
+        return response, winner.get('model')
+
+    @contextmanager
+    def stream(self, url, data, headers):
+        """
+        Open a streaming chat completion and yield the response, under the breaker and the
+        adaptive timeout (which for a stream bounds the wait for each chunk). Streams are not
+        hedged: once the client has seen part of one it cannot be swapped for another.
+
+        The breaker hears one outcome however the stream ends: a failure for 5xx/429,
+        timeouts, connection errors and StreamError; a success otherwise, including 4xx
+        answers and a reader that stops early. Completed streams feed the latency tracker.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(CIRCUIT_OPEN_MESSAGE)
+        started = time.monotonic()
+        response = None
+        failed = True
+        try:
+            response = self.client.post(
+                url, endpoint='chat', timeout=self.timeout_for(data), headers=headers,
+                json=dict(data, stream=True), stream=True
+            )
+            with response:
+                yield response
+            failed = self.is_failure(response)
+            if not failed:
+                self.tracker_for(data).observe(time.monotonic() - started)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, StreamError):
+            raise
+        except BaseException:
+            failed = response is not None and self.is_failure(response)
+            raise
+        finally:
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def _attempt(self, url, data, headers, timeout):
+        started = time.monotonic()
+        response = self.client.post(url, endpoint='chat', timeout=timeout, headers=headers, json=data)
+        return response, time.monotonic() - started
+
+    def _hedged_post(self, url, data, headers, timeout):
+        pool = self.executor()
+        pending = {pool.submit(self._attempt, url, data, headers, timeout): data}
+        done, _ = wait(pending, timeout=self.hedge_delay_for(data))
+        if not done:
+            hedge_data = dict(data, model=self.fallback_model) if self.fallback_model else data
+            pending[pool.submit(self._attempt, url, hedge_data, headers, timeout)] = hedge_data
+
+        failed_response, error = None, None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                request_data = pending.pop(future)
+                try:
+                    response, elapsed = future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    continue
+                if self.is_failure(response):
+                    failed_response = response
+                    continue
+                # Whichever request loses is closed when it finishes
+                for other in pending:
+                    other.add_done_callback(_close_response)
+                return response, elapsed, request_data
+        if failed_response is not None:
+            return failed_response, 0.0, data
+        raise error
+
+
+def _close_response(future):
+    try:
+        future.result()[0].close()
+    except Exception:
+        pass
+
+
+_chat_client = None
+_chat_client_lock = threading.Lock()
+
+
+def get_chat_client(client):
+    """
+    Process-wide resilient wrapper around the OpenRouter client, configured by settings.AI_RESILIENCE
+    """
+    global _chat_client
+    with _chat_client_lock:
+        if _chat_client is None:
+            config = getattr(settings, 'AI_RESILIENCE', {}) or {}
+            breaker = CircuitBreaker(
+                'openrouter',
+                get_cache('AI_RESPONSE_CACHE', table='circuit_breakers'),
+                failure_threshold=config.get('BREAKER_FAILURE_THRESHOLD', 5),
+                window=config.get('BREAKER_WINDOW', 60),
+                recovery_timeout=config.get('BREAKER_RECOVERY_TIMEOUT', 30),
+            )
+            _chat_client = ResilientChatClient(client, breaker, config)
+        return _chat_client
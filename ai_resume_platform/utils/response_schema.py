@@ -0,0 +1,243 @@
+import json
+import re
+from .json_stream import IncrementalJSONParser
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def repair_json(text):
+    """
+    Parse a model's JSON answer, fixing what commonly goes wrong: code fences or
+    prose around the object, trailing commas, and answers cut off at the token
+    limit (complete members and complete array items are kept).
+
+    Returns (object, repaired); raises ValueError when no object can be recovered.
+    """
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data, False
+    except (TypeError, ValueError):
+        pass
+
+    text = _FENCE.sub('', text or '')
+    start = text.find('{')
+    if start < 0:
+        raise ValueError("No JSON object in the response")
+    text = _strip_trailing_commas(text[start:])
+    end = text.rfind('}')
+    if end >= 0:
+        try:
+            data = json.loads(text[:end + 1])
+            if isinstance(data, dict):
+                return data, True
+        except ValueError:
+            pass
+
+    # Truncated: keep every member and top-level array item that closed before the cut
+    parser = IncrementalJSONParser()
+    events = parser.feed(text)
+    if parser.depth == 1 and not parser.in_string and text.rstrip()[-1:] in ('"', '}', ']'):
+        # Only the closing brace is missing; a trailing number might itself be cut short
+        events += parser.feed('}')
+    data = {}
+    items = {}
+    for event in events:
+        if event[0] == 'section':
+            data[event[1]] = event[2]
+        else:
+            items.setdefault(event[1], []).append(event[3])
+    for key, values in items.items():
+        data.setdefault(key, values)
+    if not data:
+        raise ValueError("No complete JSON member in the response")
+    return data, True
+
+
+def _strip_trailing_commas(text):
+    """
+    Drop commas directly before a closing bracket, outside strings
+    """
+    out = []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ',':
+            following = text[i + 1:].lstrip()
+            if following[:1] in ('}', ']'):
+                continue
+        out.append(ch)
+    return ''.join(out)
+
+
+class Text:
+    def default(self):
+        return ''
+
+    def example(self):
+        return ''
+
+    def coerce(self, value):
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if isinstance(value, dict):
+            # e.g. {"point": "..."} where a plain string was asked for
+            parts = [str(part).strip() for part in value.values() if isinstance(part, (str, int, float))]
+            return ' - '.join(part for part in parts if part) or None
+        return None
+
+
+class Number:
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def default(self):
+        return 0
+
+    def example(self):
+        return 0
+
+    def coerce(self, value):
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, str):
+            # "85%", "85/100"
+            match = _NUMBER.search(value)
+            if not match:
+                return None
+            value = float(match.group())
+        if not isinstance(value, (int, float)):
+            return None
+        if self.minimum is not None:
+            value = max(self.minimum, value)
+        if self.maximum is not None:
+            value = min(self.maximum, value)
+        return int(value) if float(value).is_integer() else value
+
+
+class List:
+    def __init__(self, item):
+        self.item = item
+
+    def default(self):
+        return []
+
+    def example(self):
+        return [self.item.example()]
+
+    def coerce(self, value):
+        if value is None:
+            return None
+        if not isinstance(value, list):
+            value = [value]
+        items = [self.item.coerce(item) for item in value]
+        return [item for item in items if item not in (None, '')]
+
+
+class Object:
+    """
+    A JSON object's expected members. Members the model left out, or sent in a
+    shape that cannot be coerced, are filled with defaults; ``validate`` also
+    reports which required top-level members were missing or empty.
+    """
+
+    def __init__(self, fields, optional=()):
+        self.fields = fields
+        self.optional = set(optional)
+
+    def default(self):
+        return {key: spec.default() for key, spec in self.fields.items()}
+
+    def example(self, keys=None):
+        return {key: spec.example() for key, spec in self.fields.items() if keys is None or key in keys}
+
+    def coerce(self, value):
+        if not isinstance(value, dict):
+            return None
+        return self.validate(value)[0]
+
+    def validate(self, data):
+        """
+        Return (data with every member coerced or defaulted, required keys that were missing)
+        """
+        result = {}
+        missing = []
+        for key, spec in self.fields.items():
+            value = spec.coerce(data.get(key))
+            if value is None or value == '' or value == []:
+                if key not in self.optional:
+                    missing.append(key)
+                value = spec.default() if value is None else value
+            result[key] = value
+        return result, missing
+
+
+MATCH_FIELDS = {
+    'match_percentage': Number(0, 100),
+    'summary_overview': Text(),
+    'strength_alignment': List(Text()),
+    'final_verdict': Text(),
+}
+
+# One schema per prompt template (see prompts.py), mirroring the JSON each prompt asks for
+SCHEMAS = {
+    'analyze_resume': Object({
+        'summary': Text(),
+        'strengths': List(Text()),
+        'weaknesses': List(Text()),
+        'missing_elements': List(Text()),
+        'suggestions': List(Text()),
+    }),
+    'match_job': Object(MATCH_FIELDS),
+    'match_jobs_packed': Object({
+        'matches': List(Object(dict({'job_number': Number()}, **MATCH_FIELDS))),
+    }),
+    'generate_resume': Object({
+        'name': Text(),
+        'email': Text(),
+        'phone': Text(),
+        'summary': Text(),
+        'experience': List(Object({'title': Text(), 'company': Text(), 'duration': Text(), 'description': Text()})),
+        'education': List(Object({'degree': Text(), 'school': Text(), 'year': Text()})),
+        'skills': List(Text()),
+    }, optional=['name', 'email', 'phone', 'education']),
+    'plan_career': Object({
+        'goal_clarity': Text(),
+        'skill_gap_analysis': List(Text()),
+        'learning_roadmap': List(Object({'phase': Text(), 'focus': Text(), 'actions': List(Text())})),
+        'projects_to_build': List(Text()),
+        'daily_weekly_habits': List(Text()),
+        'recommended_certifications': List(Text()),
+        'final_guidance': Text(),
+    }, optional=['recommended_certifications']),
+    'optimize_resume': Object({
+        'pdf_resume': Object({
+            'template_used': Text(),
+            'header': Object({'name': Text(), 'title': Text(), 'summary': Text()}),
+            'skills': List(Text()),
+            'experience': List(Object({'company': Text(), 'role': Text(), 'duration': Text(), 'bullets': List(Text())})),
+            'projects': List(Object({'name': Text(), 'description': Text()})),
+            'education': List(Object({'degree': Text(), 'institution': Text(), 'year': Text()})),
+            'certifications': List(Text()),
+        }),
+    }),
+}
+
+
+def get_schema(task):
+    """
+    The response schema for an AI task, or None for tasks without one
+    """
+    return SCHEMAS.get(task)
@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+
+
+class _Call:
+    """
+    One in-flight call; followers in the same process wait on its event
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key so only one of them does the work.
+
+    Within a process the first caller becomes the leader and the others block on
+    its event and receive the same result. Across processes the leader also takes
+    a lock in the shared store; leaders in other processes find the lock held and
+    poll ``lookup`` (normally the response cache) until the result appears, the
+    lock is released, or ``wait_timeout`` passes. If the lock holder dies or fails
+    without storing a result the waiters compete for the lock again.
+    """
+
+    def __init__(self, store, lookup, lock_ttl=120, poll_interval=0.25, wait_timeout=120):
+        self.store = store
+        self.lookup = lookup
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Return fn() for the key, sharing one execution between concurrent callers
+        """
+        call, leader = self.begin(key)
+        if not leader:
+            result = self.wait(call)
+            return result if result is not None else fn()
+
+        result = None
+        try:
+            result = self._run_shared(key, fn)
+            return result
+        finally:
+            self.end(key, call, result)
+
+    def begin(self, key):
+        """
+        Join the in-process call for the key; returns (call, is_leader)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def wait(self, call):
+        """
+        Block until the leader finishes; None if it took longer than wait_timeout
+        """
+        call.event.wait(self.wait_timeout)
+        return call.result
+
+    def end(self, key, call, result):
+        """
+        Hand the leader's result to every in-process follower
+        """
+        call.result = result
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.event.set()
+
+    def acquire_shared(self, key):
+        """
+        Take the cross-process lock for the key; returns the owner token or None if it is held
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.store.add(self._lock_key(key), token, ttl=self.lock_ttl)
+        except Exception as e:
+            # A broken shared store must not block the call itself
+            print(f"Singleflight lock failed: {str(e)}")
+            return token
+        return token if acquired else None
+
+    def release_shared(self, key, token):
+        try:
+            if self.store.peek(self._lock_key(key)) == token:
+                self.store.delete(self._lock_key(key))
+        except Exception as e:
+            print(f"Singleflight unlock failed: {str(e)}")
+
+    def wait_shared(self, key, deadline):
+        """
+        Poll for the lock holder's result until it appears, the lock goes away or the deadline passes
+        """
+        while time.monotonic() < deadline:
+            result = self.lookup(key)
+            if result is not None:
+                return result
+            try:
+                held = self.store.peek(self._lock_key(key)) is not None
+            except Exception:
+                held = False
+            if not held:
+                return self.lookup(key)
+            time.sleep(self.poll_interval)
+        return None
+
+    def _run_shared(self, key, fn):
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            token = self.acquire_shared(key)
+            if token is not None:
+                try:
+                    return fn()
+                finally:
+                    self.release_shared(key, token)
+            result = self.wait_shared(key, deadline)
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                return fn()
+
+    @staticmethod
+    def _lock_key(key):
+        return f"lock:{key}"
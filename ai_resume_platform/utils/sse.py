@@ -0,0 +1,37 @@
+import json
+from django.http import StreamingHttpResponse
+
+
+def format_sse(event, data):
+    """
+    Encode one server-sent event with a JSON payload
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def ai_events_to_sse(events):
+    """
+    Translate AIService stream events into server-sent events
+    """
+    # Flush the headers straight away so the browser can start rendering
+    yield ": stream open\n\n"
+    async for event in events:
+        kind = event[0]
+        if kind == 'item':
+            yield format_sse('item', {'key': event[1], 'index': event[2], 'value': event[3]})
+        elif kind == 'section':
+            yield format_sse('section', {'key': event[1], 'value': event[2]})
+        elif kind == 'done':
+            yield format_sse('done', {'result': event[1]})
+        elif kind == 'error':
+            yield format_sse('error', {'error': event[1]})
+
+
+def sse_response(stream):
+    """
+    Wrap an async iterator of encoded events in an uncached, unbuffered response
+    """
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,513 @@
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import requests
+from .http_client import DEFAULT_UPSTREAMS
+
+# Where each simulated upstream lives on the simulator, and the real host it stands in for
+PREFIXES = {
+    'openrouter': '/openrouter/api/v1',
+    'jsearch': '/jsearch',
+    'cloudinary': '/cloudinary',
+}
+REAL_URLS = {
+    'openrouter': DEFAULT_UPSTREAMS['openrouter']['BASE_URL'],
+    'jsearch': DEFAULT_UPSTREAMS['jsearch']['BASE_URL'],
+    'cloudinary': DEFAULT_UPSTREAMS['cloudinary']['BASE_URL'],
+}
+CLOUDINARY_API_URL = 'https://api.cloudinary.com'
+
+ERROR_STATUSES = (500, 502, 503)
+
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries', 'Wayne Tech', 'Cyberdyne']
+CITIES = [('Chicago', 'IL'), ('Austin', 'TX'), ('Seattle', 'WA'), ('New York', 'NY'), ('Denver', 'CO'), ('', '')]
+
+
+def parse_latency(spec):
+    """
+    Build a latency sampler (seconds) from a spec:
+    fixed:S, uniform:LOW:HIGH, normal:MEAN:STDDEV, lognormal:MEDIAN:SIGMA or exponential:MEAN
+    """
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(value) for value in args.split(':')] if args else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    samplers = {
+        'fixed': (1, lambda s: s),
+        'uniform': (2, lambda low, high: random.uniform(low, high)),
+        'normal': (2, lambda mean, stddev: random.gauss(mean, stddev)),
+        'lognormal': (2, lambda median, sigma: random.lognormvariate(math.log(median), sigma)),
+        'exponential': (1, lambda mean: random.expovariate(1 / mean)),
+    }
+    if kind not in samplers or len(values) != samplers[kind][0]:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    sample = samplers[kind][1]
+    return lambda: max(0.0, sample(*values))
+
+
+class UpstreamProfile:
+    """
+    Behaviour of one simulated upstream: latency distribution plus error and 429 injection rates
+    """
+
+    def __init__(self, latency='fixed:0', error_rate=0.0, throttle_rate=0.0, retry_after=1):
+        self.latency_spec = latency
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def injected_failure(self):
+        """
+        None, or (status, extra headers) for a failure to return instead of the real payload
+        """
+        roll = random.random()
+        if roll < self.throttle_rate:
+            return 429, {'Retry-After': str(self.retry_after)}
+        if roll < self.throttle_rate + self.error_rate:
+            return random.choice(ERROR_STATUSES), {}
+        return None
+
+
+class PayloadStore:
+    """
+    Recorded responses on disk, one JSON file per request fingerprint
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(upstream, method, path, query, body):
+        parts = [upstream, method, path, json.dumps(sorted(query.items())), hashlib.sha256(body or b'').hexdigest()]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self.path_for(key), encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key, status, content_type, body):
+        record = {'status': status, 'content_type': content_type, 'body': base64.b64encode(body).decode('ascii')}
+        with open(self.path_for(key), 'w', encoding='utf-8') as handle:
+            json.dump(record, handle)
+
+
+def detect_task(prompt):
+    """
+    Which AIService prompt template produced this text
+    """
+    if 'EACH of these' in prompt:
+        return 'match_jobs_packed'
+    for task, marker in [
+        ('analyze_resume', 'Analyze this resume'),
+        ('analyze_resume_delta', 'was revised after the analysis'),
+        ('match_job', 'job matching engine'),
+        ('generate_resume', 'Write a professional resume'),
+        ('plan_career', 'career mentor'),
+        ('optimize_resume', 'Rewrite this EXISTING resume'),
+    ]:
+        if marker in prompt:
+            return task
+    return 'unknown'
+
+
+def canned_match(seed):
+    return {
+        'match_percentage': 40 + seed % 55,
+        'summary_overview': 'Solid overlap on the core stack with a few gaps in tooling.',
+        'strength_alignment': ['Relevant backend experience', 'Python and SQL in production', 'Ships features end to end'],
+        'final_verdict': 'Worth an interview for the core skills.',
+    }
+
+
+def canned_completion(prompt):
+    """
+    Plausible JSON content for a prompt, shaped like the template asks; deterministic per prompt
+    """
+    seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+    task = detect_task(prompt)
+    if task == 'analyze_resume':
+        return {
+            'summary': 'A clear, well-structured resume with room for more quantified results.',
+            'strengths': ['Consistent Python experience', 'Clear project descriptions', 'Relevant education',
+                          'Good use of action verbs', 'Readable structure'],
+            'weaknesses': ['Few metrics', 'Generic summary', 'Long bullet points', 'Dated tools listed', 'No links'],
+            'missing_elements': ['Quantified impact', 'Cloud keywords', 'Testing practices', 'Leadership examples',
+                                 'Certifications'],
+            'suggestions': ['Add numbers to each role', 'Tailor the summary', 'Group skills by category'],
+        }
+    if task == 'analyze_resume_delta':
+        return {'strengths': ['Consistent Python experience', 'Broader infrastructure skills', 'Clear project descriptions',
+                              'Good use of action verbs', 'Readable structure']}
+    if task == 'match_job':
+        return canned_match(seed)
+    if task == 'match_jobs_packed':
+        numbers = sorted({int(number) for number in re.findall(r'^JOB (\d+)$', prompt, re.MULTILINE)}) or [1]
+        return {'matches': [dict(canned_match(seed + number), job_number=number) for number in numbers]}
+    if task == 'generate_resume':
+        return {
+            'name': 'Sample Candidate', 'email': 'candidate@example.com', 'phone': '555-0100',
+            'summary': 'Engineer focused on reliable backend services.',
+            'experience': [{'title': 'Software Engineer', 'company': 'Acme Corp', 'duration': '2021-2024',
+                            'description': 'Built and scaled internal APIs.'}],
+            'education': [{'degree': 'B.Sc. Computer Science', 'school': 'State University', 'year': '2021'}],
+            'skills': ['Python', 'Django', 'PostgreSQL'],
+        }
+    if task == 'plan_career':
+        return {
+            'goal_clarity': 'Achievable in the timeframe with steady weekly practice.',
+            'skill_gap_analysis': ['System design', 'Cloud deployment', 'Automated testing'],
+            'learning_roadmap': [
+                {'phase': 'Phase 1 (0-2 months)', 'focus': 'Foundations', 'actions': ['Course', 'Notes', 'Exercises']},
+                {'phase': 'Phase 2 (2-4 months)', 'focus': 'Projects', 'actions': ['Build', 'Deploy', 'Review']},
+            ],
+            'projects_to_build': ['REST API with tests', 'Data pipeline', 'Deployed side project'],
+            'daily_weekly_habits': ['Code daily', 'Read one article', 'Weekly retrospective'],
+            'recommended_certifications': ['AWS Cloud Practitioner'],
+            'final_guidance': 'Keep the scope small and ship every phase.',
+        }
+    if task == 'optimize_resume':
+        return {'pdf_resume': {
+            'template_used': 'Cosmic',
+            'header': {'name': 'Sample Candidate', 'title': 'Backend Engineer', 'summary': 'Engineer with four years of API work.'},
+            'skills': ['Python', 'Django', 'PostgreSQL'],
+            'experience': [{'company': 'Acme Corp', 'role': 'Software Engineer', 'duration': '2021-2024',
+                            'bullets': ['Cut API latency by 30%', 'Led migration to Django 5']}],
+            'projects': [{'name': 'Job tracker', 'description': 'Tracks 200+ applications with reminders.'}],
+            'education': [{'degree': 'B.Sc. Computer Science', 'institution': 'State University', 'year': '2021'}],
+            'certifications': [],
+        }}
+    return {'message': 'simulated response'}
+
+
+def canned_jobs(query, count=10):
+    """
+    A page of JSearch-style job listings for a query; about half carry salary data
+    """
+    seed = int(hashlib.sha256(query.encode('utf-8')).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    keywords = query.split(' in ')[0].strip() or 'Software'
+    jobs = []
+    for index in range(count):
+        city, state = rng.choice(CITIES)
+        with_salary = rng.random() < 0.5
+        low = rng.randrange(60, 140) * 1000
+        jobs.append({
+            'job_id': f"sim-{seed:x}-{index}",
+            'job_title': f"{keywords.title()} {rng.choice(['Engineer', 'Developer', 'Analyst', 'Specialist'])}",
+            'employer_name': rng.choice(COMPANIES),
+            'employer_logo': None,
+            'job_employment_type': rng.choice(['FULLTIME', 'CONTRACTOR', 'PARTTIME']),
+            'job_city': city,
+            'job_state': state,
+            'job_country': 'US',
+            'job_description': (
+                f"We are hiring a {keywords} professional to design, build and maintain services. "
+                "You will work with Python, SQL, REST APIs, Docker and cloud infrastructure, "
+                "collaborate with product teams and mentor junior engineers."
+            ),
+            'job_apply_link': f"https://example.com/jobs/{index}",
+            'job_posted_at_datetime_utc': '2026-01-01T00:00:00.000Z',
+            'job_min_salary': low if with_salary else None,
+            'job_max_salary': low + 30000 if with_salary else None,
+            'job_salary_period': 'YEAR' if with_salary else None,
+        })
+    return jobs
+
+
+def canned_salary(job_title, location):
+    seed = int(hashlib.sha256(f"{job_title}|{location}".encode('utf-8')).hexdigest()[:8], 16)
+    low = 60000 + seed % 60 * 1000
+    return [{
+        'job_title': job_title, 'location': location, 'publisher_name': 'Simulator',
+        'min_salary': low, 'max_salary': low + 40000, 'median_salary': low + 20000,
+        'salary_period': 'YEAR', 'salary_currency': 'USD',
+    }]
+
+
+def parse_multipart(content_type, body):
+    """
+    Form fields of a multipart/form-data body as {name: bytes}
+    """
+    if not content_type.startswith('multipart/'):
+        return {}
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if name:
+            fields[name] = part.get_payload(decode=True) or b''
+    return fields
+
+
+def sample_resume_pdf():
+    """
+    A one-page resume PDF, served for downloads of files the simulator never received
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    lines = [
+        'Sample Candidate', 'candidate@example.com | 555-0100', '', 'SUMMARY',
+        'Backend engineer with four years of Python and Django experience.', '', 'EXPERIENCE',
+        'Software Engineer, Acme Corp (2021-2024)', '- Built REST APIs serving 2M requests per day',
+        '- Reduced p95 latency by 30% with caching and query tuning', '- Led migration to Docker and CI/CD', '',
+        'EDUCATION', 'B.Sc. Computer Science, State University (2021)', '', 'SKILLS',
+        'Python, Django, PostgreSQL, Docker, Git, REST, SQL, AWS',
+    ]
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in lines:
+        pdf.drawString(72, y, line)
+        y -= 16
+    pdf.save()
+    return buffer.getvalue()
+
+
+class UpstreamSimulator:
+    """
+    Local stand-in for the OpenRouter, JSearch and Cloudinary APIs the app calls.
+
+    Each upstream has its own UpstreamProfile (latency, 5xx and 429 injection).
+    Payloads are canned by default; with ``record_dir`` requests are forwarded to
+    the real upstream and the responses saved, and with ``replay_dir`` saved
+    responses are served (falling back to canned ones for unseen requests).
+    """
+
+    def __init__(self, host='127.0.0.1', port=8001, profiles=None, record_dir=None, replay_dir=None,
+                 stream_chunks=20, verbose=False):
+        self.profiles = {name: UpstreamProfile() for name in PREFIXES}
+        self.profiles.update(profiles or {})
+        self.recorder = PayloadStore(record_dir) if record_dir else None
+        self.replayer = PayloadStore(replay_dir) if replay_dir else None
+        self.stream_chunks = stream_chunks
+        self.verbose = verbose
+        self.uploads = {}
+        self.uploads_lock = threading.Lock()
+        self.stats = {name: {'requests': 0, 'errors': 0, 'throttled': 0} for name in PREFIXES}
+        self.stats_lock = threading.Lock()
+        self._sample_pdf = None
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handler_class(self):
+        simulator = self
+
+        class Handler(SimulatorHandler):
+            pass
+
+        Handler.simulator = simulator
+        return Handler
+
+    def count(self, upstream, field):
+        with self.stats_lock:
+            self.stats[upstream][field] += 1
+
+    def sample_pdf(self):
+        if self._sample_pdf is None:
+            self._sample_pdf = sample_resume_pdf()
+        return self._sample_pdf
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self):
+        """
+        Serve on a background thread (for benchmarks and scripts); returns the thread
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    simulator = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.simulator.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        upstream, path = self.route(url.path)
+        if upstream is None:
+            self.send_json(404, {'error': f"Unknown path: {url.path}"})
+            return
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        simulator = self.simulator
+        simulator.count(upstream, 'requests')
+        profile = simulator.profiles[upstream]
+        failure = profile.injected_failure()
+        if failure is not None:
+            status, headers = failure
+            simulator.count(upstream, 'throttled' if status == 429 else 'errors')
+            time.sleep(min(profile.sample_latency(), 1.0))
+            self.send_json(status, {'error': {'message': f"Simulated {status}", 'code': status}}, headers)
+            return
+
+        key = PayloadStore.fingerprint(upstream, method, path, query, body)
+        if simulator.recorder is not None:
+            self.forward(upstream, method, path, url.query, body, key)
+            return
+        recorded = simulator.replayer.load(key) if simulator.replayer is not None else None
+        latency = profile.sample_latency()
+        if recorded is not None:
+            time.sleep(latency)
+            self.send_body(recorded['status'], base64.b64decode(recorded['body']), recorded['content_type'])
+            return
+
+        if upstream == 'openrouter' and path == '/chat/completions':
+            self.chat_completion(body, latency)
+        elif upstream == 'jsearch' and path == '/search':
+            time.sleep(latency)
+            self.send_json(200, {'status': 'OK', 'data': canned_jobs(query.get('query', ''))})
+        elif upstream == 'jsearch' and path == '/estimated-salary':
+            time.sleep(latency)
+            self.send_json(200, {'status': 'OK', 'data': canned_salary(query.get('job_title', ''), query.get('location', ''))})
+        elif upstream == 'cloudinary' and method == 'POST' and path.endswith('/upload'):
+            time.sleep(latency)
+            self.cloudinary_upload(path, body)
+        elif upstream == 'cloudinary' and method == 'GET':
+            time.sleep(latency)
+            with simulator.uploads_lock:
+                data = simulator.uploads.get(path)
+            self.send_body(200, data or simulator.sample_pdf(), 'application/pdf')
+        else:
+            self.send_json(404, {'error': f"Not simulated: {method} {path}"})
+
+    def route(self, full_path):
+        for upstream, prefix in PREFIXES.items():
+            if full_path == prefix or full_path.startswith(prefix + '/'):
+                return upstream, full_path[len(prefix):] or '/'
+        return None, None
+
+    def chat_completion(self, body, latency):
+        try:
+            request = json.loads(body or b'{}')
+            prompt = request['messages'][-1]['content']
+        except (ValueError, KeyError, IndexError, TypeError):
+            self.send_json(400, {'error': {'message': 'Invalid chat completion request', 'code': 400}})
+            return
+        content = json.dumps(canned_completion(prompt))
+        model = request.get('model', 'simulated')
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4}
+        completion_id = f"gen-sim-{uuid.uuid4().hex[:12]}"
+
+        if not request.get('stream'):
+            time.sleep(latency)
+            self.send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+            return
+
+        # Streaming: time to first token is a fifth of the latency, the rest is spread over the chunks
+        chunks = max(1, self.simulator.stream_chunks)
+        size = max(1, math.ceil(len(content) / chunks))
+        pieces = [content[start:start + size] for start in range(0, len(content), size)]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        time.sleep(latency * 0.2)
+        for piece in pieces:
+            chunk = {'id': completion_id, 'model': model, 'choices': [{'index': 0, 'delta': {'content': piece}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(latency * 0.8 / len(pieces))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def cloudinary_upload(self, path, body):
+        # path is /v1_1/<cloud>/<resource_type>/upload
+        parts = path.strip('/').split('/')
+        cloud = parts[1] if len(parts) > 1 else 'demo'
+        resource_type = parts[2] if len(parts) > 2 else 'raw'
+        fields = parse_multipart(self.headers.get('Content-Type', ''), body)
+        data = fields.get('file', b'')
+        folder = fields.get('folder', b'').decode('utf-8', errors='replace')
+        public_id = '/'.join(part for part in [folder, uuid.uuid4().hex[:20]] if part)
+        download_path = f"/{cloud}/{resource_type}/upload/v1/{public_id}.pdf"
+        with self.simulator.uploads_lock:
+            self.simulator.uploads[download_path] = data
+        self.send_json(200, {
+            'public_id': public_id, 'version': 1, 'resource_type': resource_type, 'type': 'upload',
+            'bytes': len(data), 'format': 'pdf',
+            'url': f"{self.simulator.url}{PREFIXES['cloudinary']}{download_path}",
+            'secure_url': f"{self.simulator.url}{PREFIXES['cloudinary']}{download_path}",
+        })
+
+    def forward(self, upstream, method, path, query_string, body, key):
+        """
+        Record mode: pass the request to the real upstream and save its response
+        """
+        base = CLOUDINARY_API_URL if upstream == 'cloudinary' and path.startswith('/v1_1/') else REAL_URLS[upstream]
+        url = base + path + (f"?{query_string}" if query_string else '')
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in ('host', 'content-length', 'connection', 'accept-encoding')}
+        try:
+            response = requests.request(method, url, headers=headers, data=body, timeout=120)
+        except requests.exceptions.RequestException as e:
+            self.send_json(502, {'error': {'message': f"Record mode: upstream failed: {str(e)}", 'code': 502}})
+            return
+        content_type = response.headers.get('Content-Type', 'application/json')
+        if response.status_code < 500:
+            self.simulator.recorder.save(key, response.status_code, content_type, response.content)
+        self.send_body(response.status_code, response.content, content_type)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+
+    def send_body(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
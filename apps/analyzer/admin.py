@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import AnalysisResult
 
-# Register your models here.
\ No newline at end of file
+@admin.register(AnalysisResult)
+class AnalysisResultAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'task', 'resume_hash', 'created_at', 'updated_at')
+    search_fields = ('user__username', 'user__email', 'resume_hash')
+    list_filter = ('task', 'updated_at')
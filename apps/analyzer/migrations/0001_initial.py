@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-18 21:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(choices=[('analyze_resume', 'Resume analysis'), ('match_job', 'Job match'), ('plan_career', 'Career plan')], max_length=50)),
+                ('resume_hash', models.CharField(max_length=64)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('inputs', models.JSONField(default=dict)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['user', 'task', '-updated_at'], name='analyzer_an_user_id_365f12_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'task', 'resume_hash', 'input_hash'), name='unique_analysis_result')],
+            },
+        ),
+    ]
@@ -1,3 +1,34 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+class AnalysisResult(models.Model):
+    TASK_ANALYZE_RESUME = 'analyze_resume'
+    TASK_MATCH_JOB = 'match_job'
+    TASK_PLAN_CAREER = 'plan_career'
+    TASK_CHOICES = [
+        (TASK_ANALYZE_RESUME, 'Resume analysis'),
+        (TASK_MATCH_JOB, 'Job match'),
+        (TASK_PLAN_CAREER, 'Career plan'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analysis_results')
+    task = models.CharField(max_length=50, choices=TASK_CHOICES)
+    # SHA-256 of the resume PDF bytes and of the task inputs (job details, career goals, prompt version)
+    resume_hash = models.CharField(max_length=64)
+    input_hash = models.CharField(max_length=64)
+    inputs = models.JSONField(default=dict)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task', 'resume_hash', 'input_hash'], name='unique_analysis_result'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'task', '-updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} for {self.user.username} ({self.updated_at:%Y-%m-%d})"
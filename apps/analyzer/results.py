@@ -0,0 +1,158 @@
+import hashlib
+import json
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from ai_resume_platform.utils import prompts
+from apps.resume.models import Resume
+from .models import AnalysisResult
+from .utils.ats_scorer import SCORER_VERSION
+from .utils.pdf_extractor import ResumeTextError, get_resume_document, remember_resume_document
+from .utils.sections import section_fingerprints
+from .utils.skills import TAXONOMY_VERSION
+
+# A new prompt (or scorer) version produces new input hashes, so old answers are not served
+TASK_VERSIONS = {
+    AnalysisResult.TASK_ANALYZE_RESUME: f"{prompts.ANALYZE_RESUME.version}:{SCORER_VERSION}:{TAXONOMY_VERSION}",
+    AnalysisResult.TASK_MATCH_JOB: f"{prompts.MATCH_JOB.version}:{TAXONOMY_VERSION}",
+    AnalysisResult.TASK_PLAN_CAREER: str(prompts.PLAN_CAREER.version),
+}
+
+
+def input_hash(task, inputs):
+    """
+    Stable hash of a task's inputs and its prompt version
+    """
+    payload = json.dumps({'task': task, 'version': TASK_VERSIONS.get(task), 'inputs': inputs}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def uploaded_resume_sections(resume_url, pdf_bytes):
+    """
+    Section fingerprints of a freshly uploaded resume; its text is cached for resume_url on the way
+    """
+    try:
+        _, text = remember_resume_document(resume_url, pdf_bytes)
+    except ResumeTextError:
+        return {}
+    return section_fingerprints(text)
+
+
+def carry_over_analysis(user, previous, resume_hash):
+    """
+    The base for re-analyzing a new upload: the previous resume's stored analysis and section
+    fingerprints, or the base it carried itself if it was never analyzed. None when there is none.
+    """
+    if previous is None or not previous.sections or previous.content_hash == resume_hash:
+        return None
+    stored = AnalysisResult.objects.filter(
+        user=user,
+        task=AnalysisResult.TASK_ANALYZE_RESUME,
+        resume_hash=previous.content_hash,
+        input_hash=input_hash(AnalysisResult.TASK_ANALYZE_RESUME, {}),
+    ).first()
+    if stored is not None:
+        return {'sections': previous.sections, 'analysis': stored.result}
+    return previous.base_analysis
+
+
+def invalidate_results(user, keep_resume_hash=None):
+    """
+    Delete the user's stored results, except those for keep_resume_hash (a re-upload of the same file)
+    """
+    results = AnalysisResult.objects.filter(user=user)
+    if keep_resume_hash:
+        results = results.exclude(resume_hash=keep_resume_hash)
+    deleted, _ = results.delete()
+    return deleted
+
+
+def latest_result(user, task):
+    """
+    Most recent stored result of a task; older resumes' results are deleted on upload
+    """
+    return AnalysisResult.objects.filter(user=user, task=task).first()
+
+
+class ResultStore:
+    """
+    Stored AI results for one user's current resume.
+
+    Views call ``lookup`` before AIService and ``save`` after a successful call;
+    results are keyed by the resume's content hash, the task and a hash of the
+    task's inputs, so identical requests are answered from the database.
+    """
+
+    def __init__(self, user, resume_hash):
+        self.user = user
+        self.resume_hash = resume_hash
+
+    @classmethod
+    async def for_resume(cls, user, resume_url):
+        """
+        Store for the resume at resume_url; its hash is cached, so this is cheap after the first call
+        """
+        try:
+            resume_hash, _ = await sync_to_async(get_resume_document, thread_sensitive=False)(resume_url)
+        except ResumeTextError:
+            # AIService reports the same problem to the user; just don't store anything
+            resume_hash = None
+        return cls(user, resume_hash)
+
+    async def lookup(self, task, inputs=None):
+        """
+        The stored result for this task and inputs, or None
+        """
+        if not self.resume_hash:
+            return None
+        stored = await AnalysisResult.objects.filter(
+            user=self.user,
+            task=task,
+            resume_hash=self.resume_hash,
+            input_hash=input_hash(task, inputs or {}),
+        ).afirst()
+        return stored.result if stored else None
+
+    async def analysis_base(self):
+        """
+        The analysis carried over from the previous upload when this resume is the user's latest, or None
+        """
+        resume = await Resume.objects.filter(user=self.user).order_by('-uploaded_at', '-id').afirst()
+        if resume is None or not self.resume_hash or resume.content_hash != self.resume_hash:
+            return None
+        return resume.base_analysis
+
+    async def save(self, task, result, inputs=None):
+        """
+        Store a successful result; errors are never stored
+        """
+        if not self.resume_hash or not isinstance(result, dict) or 'error' in result:
+            return
+        try:
+            await AnalysisResult.objects.aupdate_or_create(
+                user=self.user,
+                task=task,
+                resume_hash=self.resume_hash,
+                input_hash=input_hash(task, inputs or {}),
+                defaults={'inputs': inputs or {}, 'result': result},
+            )
+        except IntegrityError:
+            # A concurrent request stored the same result first
+            pass
+
+    async def record_stream(self, events, task, inputs=None):
+        """
+        Pass stream events through, storing the final result when the stream completes
+        """
+        async for event in events:
+            if event[0] == 'done':
+                await self.save(task, event[1], inputs)
+            yield event
+
+
+async def stored_events(result):
+    """
+    Stream events for a stored result: every section, then 'done'
+    """
+    for key, value in result.items():
+        yield ('section', key, value)
+    yield ('done', result)
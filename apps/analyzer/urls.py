@@ -4,4 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.analyzer, name='analyzer'),
     path('analyze/', views.analyze_resume, name='analyze_resume'),
+    path('analyze/stream/', views.analyze_resume_stream, name='analyze_resume_stream'),
+    path('score/', views.score_resume, name='score_resume'),
 ]
\ No newline at end of file
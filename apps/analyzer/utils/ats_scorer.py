@@ -0,0 +1,247 @@
+import math
+import re
+import threading
+from collections import Counter
+import numpy as np
+
+SCORER_VERSION = 'local-v1'
+
+# Points per component; they add up to 100
+SECTION_POINTS = 25
+ACTION_VERB_POINTS = 20
+METRIC_POINTS = 20
+KEYWORD_POINTS = 25
+LENGTH_POINTS = 10
+
+# Heading patterns matched against short lines, with the points each section is worth
+SECTIONS = {
+    'summary': (3, r'(professional |career )?(summary|profile|objective)|about me'),
+    'experience': (6, r'(work |professional )?(experience|employment( history)?|work history|internships?)'),
+    'education': (4, r'education|academic (background|qualifications)|qualifications'),
+    'skills': (5, r'(technical |core |key )?(skills|competencies|technologies|tech stack)'),
+    'projects': (2, r'(personal |academic |key )?projects'),
+    'certifications': (1, r'certifications?|licenses?( & certifications)?|courses'),
+}
+CONTACT_POINTS = 4
+
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+PHONE_PATTERN = re.compile(r'(\+?\d[\d\s().-]{8,}\d)')
+METRIC_PATTERN = re.compile(r'\d+(\.\d+)?\s*(%|percent|x\b|k\b|m\b|\+)|[$€£₹]\s*\d|\b\d{2,}\b')
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+ACTION_VERBS = frozenset("""
+    accelerated achieved analyzed architected automated boosted built championed collaborated
+    configured consolidated coordinated created cut decreased delivered deployed designed developed
+    directed drove enabled engineered enhanced established executed expanded facilitated founded
+    generated grew guided identified implemented improved increased initiated integrated introduced
+    launched led maintained managed mentored migrated modernized negotiated optimized orchestrated
+    organized overhauled owned pioneered planned presented produced programmed published reduced
+    refactored resolved restructured revamped saved scaled secured shipped simplified spearheaded
+    standardized streamlined strengthened supervised supported taught tested trained transformed
+    troubleshot upgraded won wrote
+    analyze architect automate build collaborate configure create deliver deploy design develop
+    drive implement improve lead maintain manage mentor optimize plan reduce resolve scale ship
+    support test train write
+""".split())
+
+# Keyword profiles per industry: term -> weight (1 = common, 3 = defining)
+INDUSTRY_PROFILES = {
+    'Software Development': {
+        'python': 2, 'java': 2, 'javascript': 2, 'typescript': 2, 'c++': 2, 'c#': 2, 'go': 1, 'rust': 1,
+        'django': 2, 'flask': 1, 'spring': 2, 'react': 2, 'node.js': 2, 'angular': 1, 'vue': 1,
+        'rest': 2, 'api': 2, 'microservices': 2, 'git': 2, 'docker': 2, 'kubernetes': 1, 'ci cd': 2,
+        'unit testing': 2, 'sql': 1, 'postgresql': 1, 'software engineering': 3, 'object oriented': 2,
+        'data structures': 2, 'algorithms': 2, 'agile': 1, 'backend': 2, 'frontend': 2, 'full stack': 2,
+    },
+    'Data Science': {
+        'python': 2, 'r': 1, 'sql': 3, 'pandas': 3, 'numpy': 2, 'statistics': 3, 'statistical': 2,
+        'data analysis': 3, 'data visualization': 2, 'tableau': 2, 'power bi': 2, 'excel': 1,
+        'regression': 2, 'hypothesis testing': 2, 'a b testing': 2, 'scikit learn': 2, 'jupyter': 1,
+        'etl': 2, 'spark': 2, 'hadoop': 1, 'data pipeline': 2, 'big data': 1, 'matplotlib': 1,
+        'forecasting': 2, 'dashboard': 1, 'data mining': 2, 'data cleaning': 2,
+    },
+    'AI / ML': {
+        'machine learning': 3, 'deep learning': 3, 'neural network': 2, 'neural networks': 2,
+        'tensorflow': 3, 'pytorch': 3, 'keras': 2, 'scikit learn': 2, 'nlp': 3,
+        'natural language processing': 3, 'computer vision': 3, 'llm': 2, 'transformers': 2,
+        'reinforcement learning': 2, 'model training': 2, 'feature engineering': 2, 'mlops': 2,
+        'hugging face': 2, 'cnn': 2, 'rnn': 1, 'generative ai': 2, 'classification': 1,
+        'embeddings': 1, 'opencv': 2, 'python': 1,
+    },
+    'IT / Support': {
+        'troubleshooting': 3, 'help desk': 3, 'technical support': 3, 'active directory': 3,
+        'windows': 2, 'linux': 2, 'networking': 2, 'tcp ip': 2, 'dns': 2, 'dhcp': 2, 'vpn': 1,
+        'itil': 2, 'ticketing': 2, 'servicenow': 2, 'jira': 1, 'hardware': 2, 'office 365': 2,
+        'system administration': 3, 'firewall': 1, 'backup': 1, 'aws': 1, 'azure': 1,
+        'incident management': 2, 'end user': 2,
+    },
+    'Management': {
+        'leadership': 3, 'team lead': 2, 'managed': 2, 'stakeholder': 2, 'stakeholders': 2,
+        'project management': 3, 'product management': 2, 'budget': 2, 'roadmap': 2, 'strategy': 2,
+        'strategic': 2, 'agile': 1, 'scrum': 2, 'kpi': 2, 'kpis': 2, 'hiring': 2, 'mentored': 2,
+        'cross functional': 2, 'pmp': 2, 'okrs': 1, 'vendor management': 2, 'resource planning': 2,
+        'risk management': 2, 'p l': 2, 'operations': 1,
+    },
+}
+
+
+def tokenize(text):
+    """
+    Lowercase tokens, keeping tech spellings like c++, c#, node.js intact
+    """
+    return [token.rstrip('.') for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def term_key(term):
+    return ' '.join(tokenize(term))
+
+
+def starts_with_action_verb(line):
+    first = tokenize(line.split()[0]) if line.split() else []
+    return bool(first) and first[0] in ACTION_VERBS
+
+
+class ATSScorer:
+    """
+    Deterministic ATS score for resume text, computed locally in milliseconds.
+
+    The score adds up section presence, action-verb density, quantified results,
+    keyword coverage and length. Industry scores come from weighted keyword
+    profiles: terms are weighted by how specific they are to one industry (an
+    IDF over the profiles), and the resume's saturating term frequencies are
+    projected onto every profile with a single matrix product.
+    """
+
+    def __init__(self, profiles=None):
+        profiles = profiles or INDUSTRY_PROFILES
+        self.industries = list(profiles)
+        self.vocabulary = sorted({term_key(term) for profile in profiles.values() for term in profile})
+        self.term_index = {term: index for index, term in enumerate(self.vocabulary)}
+        self.max_ngram = max(len(term.split()) for term in self.vocabulary)
+
+        weights = np.zeros((len(self.industries), len(self.vocabulary)))
+        for row, industry in enumerate(self.industries):
+            for term, weight in profiles[industry].items():
+                weights[row, self.term_index[term_key(term)]] = weight
+        # Terms shared by many profiles say less about any one of them
+        document_frequency = np.count_nonzero(weights, axis=0)
+        idf = np.log1p(len(self.industries) / np.maximum(document_frequency, 1))
+        self.weights = weights * idf
+        self.weight_totals = self.weights.sum(axis=1)
+
+        self.section_patterns = {
+            name: (points, re.compile(rf'^[-#*\s]*({pattern})\s*:?$', re.IGNORECASE))
+            for name, (points, pattern) in SECTIONS.items()
+        }
+
+    def term_frequencies(self, text):
+        """
+        Count every vocabulary term (including multi-word terms) into a vector
+        """
+        tokens = tokenize(text)
+        counts = Counter()
+        for size in range(1, self.max_ngram + 1):
+            for start in range(len(tokens) - size + 1):
+                gram = ' '.join(tokens[start:start + size])
+                if gram in self.term_index:
+                    counts[gram] += 1
+        frequencies = np.zeros(len(self.vocabulary))
+        for term, count in counts.items():
+            frequencies[self.term_index[term]] = count
+        return frequencies
+
+    def industry_scores(self, text):
+        """
+        Return ({industry: 0-100}, {industry: matched terms}) for the resume text
+        """
+        frequencies = self.term_frequencies(text)
+        # Three mentions count as full coverage of a term
+        signal = np.minimum(1.0, np.log1p(frequencies) / math.log1p(3))
+        coverage = (self.weights @ signal) / self.weight_totals
+        # Square root so partial coverage is not punished linearly
+        scores = np.rint(100 * np.sqrt(coverage)).astype(int)
+
+        matched = {}
+        for row, industry in enumerate(self.industries):
+            hits = np.nonzero((self.weights[row] > 0) & (frequencies > 0))[0]
+            ranked = hits[np.argsort(-self.weights[row, hits], kind='stable')]
+            matched[industry] = [self.vocabulary[index] for index in ranked]
+        return {industry: int(score) for industry, score in zip(self.industries, scores)}, matched
+
+    def score(self, text):
+        """
+        Score resume text; returns ats_score, industry_scores and a per-component breakdown
+        """
+        text = text or ''
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        words = len(text.split())
+
+        # Sections: short lines that look like headings, plus contact details
+        found = []
+        has_contact = bool(EMAIL_PATTERN.search(text) or PHONE_PATTERN.search(text))
+        section_score = CONTACT_POINTS if has_contact else 0
+        for name, (points, pattern) in self.section_patterns.items():
+            if any(len(line) <= 40 and pattern.match(line) for line in lines):
+                found.append(name)
+                section_score += points
+        missing = [name for name in SECTIONS if name not in found]
+        if not has_contact:
+            missing.insert(0, 'contact')
+
+        # Statements: bullet points and sentence-like lines of four words or more
+        statements = [line.lstrip('-*> ').strip() for line in lines if len(line.split()) >= 4]
+        action_lines = sum(1 for line in statements if starts_with_action_verb(line))
+        metric_lines = sum(1 for line in statements if METRIC_PATTERN.search(line))
+        action_ratio = action_lines / len(statements) if statements else 0.0
+        metric_ratio = metric_lines / len(statements) if statements else 0.0
+        # Strong resumes open ~60% of statements with a verb and quantify ~40% of them
+        action_score = ACTION_VERB_POINTS * min(1.0, action_ratio / 0.6)
+        metric_score = METRIC_POINTS * min(1.0, metric_ratio / 0.4)
+
+        industry_scores, matched = self.industry_scores(text)
+        best_industry = max(industry_scores, key=industry_scores.get)
+        keyword_score = KEYWORD_POINTS * industry_scores[best_industry] / 100
+
+        if words < 300:
+            length_score = LENGTH_POINTS * words / 300
+        else:
+            length_score = max(0.0, LENGTH_POINTS - max(0, words - 1000) / 100)
+
+        total = section_score + action_score + metric_score + keyword_score + length_score
+        return {
+            'ats_score': int(round(min(100, total))),
+            'industry_scores': industry_scores,
+            'score_breakdown': {
+                'sections': {'score': section_score, 'max': SECTION_POINTS, 'found': found, 'missing': missing},
+                'action_verbs': {'score': round(action_score, 1), 'max': ACTION_VERB_POINTS, 'ratio': round(action_ratio, 2)},
+                'metrics': {'score': round(metric_score, 1), 'max': METRIC_POINTS, 'ratio': round(metric_ratio, 2)},
+                'keywords': {
+                    'score': round(keyword_score, 1), 'max': KEYWORD_POINTS,
+                    'best_industry': best_industry, 'matched': matched[best_industry][:15],
+                },
+                'length': {'score': round(length_score, 1), 'max': LENGTH_POINTS, 'words': words},
+            },
+            'scoring_engine': SCORER_VERSION,
+        }
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """
+    Process-wide scorer; the profile matrix is built once
+    """
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = ATSScorer()
+        return _scorer
+
+
+def score_resume(resume_text):
+    """
+    Deterministic ATS and industry scores for resume text
+    """
+    return get_scorer().score(resume_text)
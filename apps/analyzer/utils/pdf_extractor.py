@@ -0,0 +1,119 @@
+import hashlib
+import io
+import re
+import unicodedata
+from PyPDF2 import PdfReader
+from ai_resume_platform.utils.cache import get_cache
+from ai_resume_platform.utils.http_client import get_client
+
+BULLET_CHARS = '•●▪■◦‣∙·➢➤►▶✓✔'
+
+
+class ResumeTextError(Exception):
+    """
+    Raised when a resume cannot be downloaded or yields no text
+    """
+
+
+def get_resume_text_cache():
+    """
+    Shared cache of extracted resume text, configured by settings.RESUME_TEXT_CACHE
+    """
+    return get_cache('RESUME_TEXT_CACHE', table='resume_text')
+
+
+def content_hash(pdf_bytes):
+    """
+    SHA-256 of the raw PDF bytes; identical files share extracted text and AI results
+    """
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def fetch_resume_bytes(resume_url):
+    """
+    Download the resume PDF through the pooled Cloudinary client
+    """
+    response = get_client('cloudinary').get(resume_url, endpoint='download')
+    response.raise_for_status()
+    return response.content
+
+
+def extract_text(pdf_bytes):
+    """
+    Extract the raw text of every page with PyPDF2
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    for page in reader.pages:
+        pages.append(page.extract_text() or '')
+    return '\n'.join(pages)
+
+
+def normalize_text(text):
+    """
+    Normalize extracted text so the same resume always produces the same prompt
+    """
+    text = unicodedata.normalize('NFKC', text)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # Drop control characters left behind by missing glyphs
+    text = ''.join(ch for ch in text if ch in '\n\t' or unicodedata.category(ch) != 'Cc')
+    # Re-join words hyphenated across line breaks
+    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+    text = re.sub(f'[{BULLET_CHARS}]', '-', text)
+    text = re.sub(r'[ \t\f\v]+', ' ', text)
+    lines = [line.strip() for line in text.split('\n')]
+    text = '\n'.join(lines)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def get_resume_document(resume_url):
+    """
+    Return ``(content_hash, text)`` for a resume URL.
+
+    The URL is downloaded at most once (Cloudinary delivery URLs are immutable per
+    upload) and the normalized text is cached by content hash, so a re-upload of the
+    same file reuses it as well.
+    """
+    cache = get_resume_text_cache()
+    url_key = 'url:' + hashlib.sha256(resume_url.encode('utf-8')).hexdigest()
+
+    digest = cache.get(url_key)
+    if digest:
+        text = cache.get('text:' + digest)
+        if text is not None:
+            return digest, text
+
+    try:
+        pdf_bytes = fetch_resume_bytes(resume_url)
+    except Exception as e:
+        raise ResumeTextError(f"Could not download the resume: {str(e)}")
+
+    return remember_resume_document(resume_url, pdf_bytes)
+
+
+def remember_resume_document(resume_url, pdf_bytes):
+    """
+    Extract (or reuse) the text of PDF bytes already in hand, e.g. a fresh upload,
+    and cache it for ``resume_url`` so it is never downloaded again. Returns ``(content_hash, text)``.
+    """
+    cache = get_resume_text_cache()
+    digest = content_hash(pdf_bytes)
+    text = cache.get('text:' + digest)
+    if text is None:
+        try:
+            text = normalize_text(extract_text(pdf_bytes))
+        except Exception as e:
+            raise ResumeTextError(f"Could not read the resume PDF: {str(e)}")
+        if not text:
+            raise ResumeTextError("No text could be extracted from the resume PDF. Please upload a text-based (not scanned) PDF.")
+        cache.set('text:' + digest, text)
+    cache.set('url:' + hashlib.sha256(resume_url.encode('utf-8')).hexdigest(), digest)
+    return digest, text
+
+
+def get_resume_text(resume_url):
+    """
+    Return the normalized text of the resume at ``resume_url``
+    """
+    return get_resume_document(resume_url)[1]
@@ -0,0 +1,79 @@
+import hashlib
+import re
+from ai_resume_platform.utils.prompts import estimate_tokens
+from .ats_scorer import SECTIONS
+
+# Text before the first recognised heading: name, title and contact details
+HEADER_SECTION = 'header'
+
+HEADING_PATTERNS = [
+    (name, re.compile(rf'^[-#*\s]*({pattern})\s*:?$', re.IGNORECASE))
+    for name, (_, pattern) in SECTIONS.items()
+]
+
+
+def section_name(line):
+    """
+    The section a line is the heading of, or None
+    """
+    if len(line) > 40:
+        return None
+    for name, pattern in HEADING_PATTERNS:
+        if pattern.match(line):
+            return name
+    return None
+
+
+def segment_resume(text):
+    """
+    Split normalized resume text into ``[(name, text), ...]`` at its section headings.
+    Repeated headings get a numeric suffix (``experience_2``) so names stay unique.
+    """
+    sections = []
+    seen = {}
+    name, lines = HEADER_SECTION, []
+    for line in (text or '').split('\n'):
+        heading = section_name(line.strip())
+        if heading is None:
+            lines.append(line)
+            continue
+        sections.append((name, '\n'.join(lines).strip()))
+        seen[heading] = seen.get(heading, 0) + 1
+        name = heading if seen[heading] == 1 else f"{heading}_{seen[heading]}"
+        lines = []
+    sections.append((name, '\n'.join(lines).strip()))
+    return [(name, body) for name, body in sections if body or name != HEADER_SECTION]
+
+
+def fingerprint(text):
+    """
+    Hash of a section's text, ignoring case and whitespace changes
+    """
+    canonical = ' '.join((text or '').lower().split())
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def section_fingerprints(text):
+    """
+    ``{section name: fingerprint}`` in document order, as stored on Resume rows
+    """
+    return {name: fingerprint(body) for name, body in segment_resume(text)}
+
+
+def diff_sections(previous, current):
+    """
+    Compare two fingerprint dicts; returns (changed or added section names, removed section names)
+    """
+    changed = [name for name, digest in current.items() if previous.get(name) != digest]
+    removed = [name for name in previous if name not in current]
+    return changed, removed
+
+
+def changed_share(text, changed):
+    """
+    Share of the resume's tokens that sit in the changed sections
+    """
+    sections = segment_resume(text)
+    total = sum(estimate_tokens(body) for _, body in sections)
+    moved = sum(estimate_tokens(body) for name, body in sections if name in changed)
+    return moved / total if total else 1.0
@@ -0,0 +1,357 @@
+import re
+import threading
+from collections import Counter, deque
+
+TAXONOMY_VERSION = 'skills-v1'
+
+LANGUAGES = 'Programming Languages'
+FRAMEWORKS = 'Frameworks & Libraries'
+DATABASES = 'Databases'
+CLOUD = 'Cloud & DevOps'
+DATA = 'Data & Machine Learning'
+TOOLS = 'Tools & Practices'
+DESIGN = 'Design'
+BUSINESS = 'Business & Management'
+
+# Canonical skill -> (category, aliases). Aliases are matched on word boundaries, ignoring case,
+# except aliases written with capitals (Go, R, C), which must match exactly.
+SKILLS = {
+    'Python': (LANGUAGES, ['python', 'python3']),
+    'Java': (LANGUAGES, ['java']),
+    'JavaScript': (LANGUAGES, ['javascript', 'js', 'es6', 'ecmascript']),
+    'TypeScript': (LANGUAGES, ['typescript', 'ts']),
+    'C': (LANGUAGES, ['C', 'ansi c']),
+    'C++': (LANGUAGES, ['c++', 'cpp']),
+    'C#': (LANGUAGES, ['c#', 'csharp', 'c sharp']),
+    'Go': (LANGUAGES, ['golang', 'Go']),
+    'Rust': (LANGUAGES, ['Rust']),
+    'Ruby': (LANGUAGES, ['ruby']),
+    'PHP': (LANGUAGES, ['php']),
+    'Kotlin': (LANGUAGES, ['kotlin']),
+    'Swift': (LANGUAGES, ['Swift', 'swiftui']),
+    'Objective-C': (LANGUAGES, ['objective-c', 'objective c']),
+    'Scala': (LANGUAGES, ['scala']),
+    'R': (LANGUAGES, ['R', 'rstudio', 'r programming']),
+    'MATLAB': (LANGUAGES, ['matlab']),
+    'Perl': (LANGUAGES, ['perl']),
+    'Dart': (LANGUAGES, ['dart']),
+    'Elixir': (LANGUAGES, ['elixir']),
+    'Haskell': (LANGUAGES, ['haskell']),
+    'Julia': (LANGUAGES, ['julia lang', 'julialang']),
+    'SQL': (LANGUAGES, ['sql', 't-sql', 'pl/sql', 'plsql']),
+    'Bash': (LANGUAGES, ['bash', 'shell scripting', 'shell script', 'zsh']),
+    'PowerShell': (LANGUAGES, ['powershell']),
+    'HTML': (LANGUAGES, ['html', 'html5']),
+    'CSS': (LANGUAGES, ['css', 'css3', 'sass', 'scss']),
+    'Solidity': (LANGUAGES, ['solidity']),
+
+    'Django': (FRAMEWORKS, ['django', 'django rest framework', 'drf']),
+    'Flask': (FRAMEWORKS, ['flask']),
+    'FastAPI': (FRAMEWORKS, ['fastapi']),
+    'Spring': (FRAMEWORKS, ['spring boot', 'springboot', 'spring framework', 'spring mvc']),
+    'Ruby on Rails': (FRAMEWORKS, ['ruby on rails', 'rails']),
+    'Laravel': (FRAMEWORKS, ['laravel']),
+    '.NET': (FRAMEWORKS, ['.net', 'dotnet', 'asp.net', '.net core']),
+    'Node.js': (FRAMEWORKS, ['node.js', 'nodejs', 'node js']),
+    'Express': (FRAMEWORKS, ['express.js', 'expressjs']),
+    'React': (FRAMEWORKS, ['React', 'react.js', 'reactjs']),
+    'React Native': (FRAMEWORKS, ['react native']),
+    'Angular': (FRAMEWORKS, ['angular', 'angularjs']),
+    'Vue': (FRAMEWORKS, ['vue', 'vue.js', 'vuejs', 'nuxt']),
+    'Next.js': (FRAMEWORKS, ['next.js', 'nextjs']),
+    'Svelte': (FRAMEWORKS, ['svelte']),
+    'jQuery': (FRAMEWORKS, ['jquery']),
+    'Redux': (FRAMEWORKS, ['redux']),
+    'Tailwind CSS': (FRAMEWORKS, ['tailwind', 'tailwindcss', 'tailwind css']),
+    'Bootstrap': (FRAMEWORKS, ['bootstrap']),
+    'Flutter': (FRAMEWORKS, ['flutter']),
+    'GraphQL': (FRAMEWORKS, ['graphql']),
+    'REST APIs': (FRAMEWORKS, ['REST', 'restful', 'rest api', 'rest apis', 'restful api', 'restful apis']),
+    'gRPC': (FRAMEWORKS, ['grpc']),
+    'Celery': (FRAMEWORKS, ['celery']),
+    'Hibernate': (FRAMEWORKS, ['hibernate']),
+
+    'PostgreSQL': (DATABASES, ['postgresql', 'postgres', 'psql']),
+    'MySQL': (DATABASES, ['mysql', 'mariadb']),
+    'SQLite': (DATABASES, ['sqlite']),
+    'Oracle Database': (DATABASES, ['oracle database', 'oracle db']),
+    'SQL Server': (DATABASES, ['sql server', 'mssql', 'ms sql']),
+    'MongoDB': (DATABASES, ['mongodb', 'mongo']),
+    'Redis': (DATABASES, ['redis']),
+    'Elasticsearch': (DATABASES, ['elasticsearch', 'elastic search', 'opensearch']),
+    'Cassandra': (DATABASES, ['cassandra']),
+    'DynamoDB': (DATABASES, ['dynamodb']),
+    'Firebase': (DATABASES, ['firebase', 'firestore']),
+    'Snowflake': (DATABASES, ['snowflake']),
+    'BigQuery': (DATABASES, ['bigquery', 'big query']),
+    'Neo4j': (DATABASES, ['neo4j']),
+
+    'AWS': (CLOUD, ['aws', 'amazon web services', 'ec2', 's3', 'aws lambda']),
+    'Azure': (CLOUD, ['azure', 'microsoft azure']),
+    'Google Cloud': (CLOUD, ['gcp', 'google cloud', 'google cloud platform']),
+    'Docker': (CLOUD, ['docker', 'containerization', 'containerized']),
+    'Kubernetes': (CLOUD, ['kubernetes', 'k8s', 'helm', 'eks', 'gke', 'aks']),
+    'Terraform': (CLOUD, ['terraform']),
+    'Ansible': (CLOUD, ['ansible']),
+    'CI/CD': (CLOUD, ['ci/cd', 'ci cd', 'cicd', 'continuous integration', 'continuous delivery', 'continuous deployment']),
+    'Jenkins': (CLOUD, ['jenkins']),
+    'GitHub Actions': (CLOUD, ['github actions']),
+    'GitLab CI': (CLOUD, ['gitlab ci', 'gitlab-ci']),
+    'Linux': (CLOUD, ['linux', 'ubuntu', 'unix', 'centos', 'debian']),
+    'Nginx': (CLOUD, ['nginx']),
+    'Microservices': (CLOUD, ['microservices', 'microservice', 'micro-services']),
+    'Serverless': (CLOUD, ['serverless']),
+    'Kafka': (CLOUD, ['kafka', 'apache kafka']),
+    'RabbitMQ': (CLOUD, ['rabbitmq']),
+    'Prometheus': (CLOUD, ['prometheus']),
+    'Grafana': (CLOUD, ['grafana']),
+    'Networking': (CLOUD, ['tcp/ip', 'dns', 'networking']),
+    'Cybersecurity': (CLOUD, ['cybersecurity', 'cyber security', 'information security', 'penetration testing']),
+
+    'Machine Learning': (DATA, ['machine learning', 'ml']),
+    'Deep Learning': (DATA, ['deep learning', 'neural networks', 'neural network']),
+    'Natural Language Processing': (DATA, ['natural language processing', 'nlp']),
+    'Computer Vision': (DATA, ['computer vision', 'opencv']),
+    'Large Language Models': (DATA, ['llm', 'llms', 'large language models', 'large language model', 'prompt engineering', 'rag']),
+    'TensorFlow': (DATA, ['tensorflow', 'keras']),
+    'PyTorch': (DATA, ['pytorch', 'torch']),
+    'scikit-learn': (DATA, ['scikit-learn', 'scikit learn', 'sklearn']),
+    'pandas': (DATA, ['pandas']),
+    'NumPy': (DATA, ['numpy']),
+    'Spark': (DATA, ['Spark', 'apache spark', 'pyspark']),
+    'Hadoop': (DATA, ['hadoop', 'hdfs', 'hive']),
+    'Airflow': (DATA, ['airflow', 'apache airflow']),
+    'dbt': (DATA, ['dbt']),
+    'ETL': (DATA, ['etl', 'elt', 'data pipelines', 'data pipeline']),
+    'Data Analysis': (DATA, ['data analysis', 'data analytics', 'analytics']),
+    'Data Visualization': (DATA, ['data visualization', 'data visualisation', 'matplotlib', 'seaborn', 'plotly']),
+    'Statistics': (DATA, ['statistics', 'statistical analysis', 'statistical modeling', 'hypothesis testing', 'regression']),
+    'A/B Testing': (DATA, ['a/b testing', 'ab testing', 'a/b tests', 'experimentation']),
+    'Tableau': (DATA, ['tableau']),
+    'Power BI': (DATA, ['power bi', 'powerbi']),
+    'Excel': (DATA, ['Excel', 'microsoft excel', 'ms excel', 'vlookup', 'pivot tables']),
+    'Jupyter': (DATA, ['jupyter', 'jupyter notebook']),
+    'MLOps': (DATA, ['mlops', 'mlflow', 'kubeflow']),
+
+    'Git': (TOOLS, ['git', 'github', 'gitlab', 'bitbucket', 'version control']),
+    'Jira': (TOOLS, ['jira', 'confluence']),
+    'Agile': (TOOLS, ['agile', 'scrum', 'kanban', 'sprint planning']),
+    'Unit Testing': (TOOLS, ['unit testing', 'unit tests', 'pytest', 'junit', 'jest', 'tdd', 'test-driven development']),
+    'Test Automation': (TOOLS, ['test automation', 'selenium', 'cypress', 'playwright']),
+    'Object-Oriented Programming': (TOOLS, ['object-oriented', 'object oriented', 'oop']),
+    'Data Structures & Algorithms': (TOOLS, ['data structures', 'algorithms']),
+    'System Design': (TOOLS, ['system design', 'distributed systems', 'software architecture']),
+    'Postman': (TOOLS, ['postman']),
+    'Webpack': (TOOLS, ['webpack', 'vite']),
+    'Android': (TOOLS, ['android', 'android sdk']),
+    'iOS': (TOOLS, ['ios', 'xcode']),
+    'SAP': (TOOLS, ['sap']),
+    'Salesforce': (TOOLS, ['salesforce']),
+
+    'Figma': (DESIGN, ['figma']),
+    'Sketch': (DESIGN, ['sketch app']),
+    'Adobe XD': (DESIGN, ['adobe xd']),
+    'Adobe Photoshop': (DESIGN, ['photoshop', 'adobe photoshop']),
+    'Adobe Illustrator': (DESIGN, ['illustrator', 'adobe illustrator']),
+    'UI/UX Design': (DESIGN, ['ui/ux', 'ux/ui', 'ux design', 'ui design', 'user experience', 'user interface design', 'ux']),
+    'Prototyping': (DESIGN, ['prototyping', 'wireframing', 'wireframes', 'mockups']),
+    'User Research': (DESIGN, ['user research', 'usability testing']),
+    'Design Systems': (DESIGN, ['design systems', 'design system']),
+
+    'Project Management': (BUSINESS, ['project management', 'pmp', 'program management']),
+    'Product Management': (BUSINESS, ['product management', 'product strategy', 'product roadmap', 'roadmapping']),
+    'Stakeholder Management': (BUSINESS, ['stakeholder management', 'stakeholder communication']),
+    'Leadership': (BUSINESS, ['leadership', 'team leadership', 'people management']),
+    'Mentoring': (BUSINESS, ['mentoring', 'mentorship', 'coaching']),
+    'Communication': (BUSINESS, ['communication skills', 'written communication', 'verbal communication', 'public speaking']),
+    'Budgeting': (BUSINESS, ['budgeting', 'forecasting', 'financial modeling', 'financial modelling']),
+    'Digital Marketing': (BUSINESS, ['digital marketing', 'seo', 'sem', 'google analytics', 'content marketing']),
+    'Sales': (BUSINESS, ['sales', 'business development', 'lead generation']),
+    'CRM': (BUSINESS, ['crm', 'hubspot']),
+    'Customer Support': (BUSINESS, ['customer support', 'customer service', 'technical support', 'help desk', 'helpdesk']),
+    'ITIL': (BUSINESS, ['itil']),
+}
+
+# Characters that continue a skill token: "C" must not match inside "C++", nor "JS" inside "Node.js"
+_JOINERS = '+#'
+_SINGLE_LETTER_STOPS = '.-&'
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every alias in the taxonomy.
+
+    ``find`` walks the text once, whatever the number of aliases, and keeps the
+    longest match at each position (``React Native`` rather than ``React``).
+    """
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy or SKILLS
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for canonical, (_, aliases) in self.taxonomy.items():
+            for alias in aliases:
+                self._add(alias, canonical)
+        self._link()
+
+    def _add(self, alias, canonical):
+        state = 0
+        for ch in alias.lower():
+            following = self.goto[state].get(ch)
+            if following is None:
+                following = len(self.goto)
+                self.goto[state][ch] = following
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = following
+        # Aliases with capitals must match exactly
+        exact = alias if alias != alias.lower() else None
+        self.output[state].append((len(alias), canonical, exact))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(ch, 0)
+                self.output[following] = self.output[following] + self.output[self.fail[following]]
+
+    def find(self, text):
+        """
+        Return ``[(start, end, canonical), ...]`` for every skill mention, in text order
+        """
+        text = ' '.join((text or '').split())
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased; keep offsets aligned
+            lowered = ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+        candidates = []
+        state = 0
+        for end, ch in enumerate(lowered, start=1):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, canonical, exact in self.output[state]:
+                start = end - length
+                if exact is not None and text[start:end] != exact:
+                    continue
+                if self._bounded(text, start, end, single_letter=length == 1):
+                    candidates.append((start, end, canonical))
+
+        # Longest match wins where mentions overlap
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        last_end = 0
+        for start, end, canonical in candidates:
+            if start >= last_end:
+                matches.append((start, end, canonical))
+                last_end = end
+        return matches
+
+    @staticmethod
+    def _bounded(text, start, end, single_letter=False):
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        if before.isalnum() or before in _JOINERS or before == '.':
+            return False
+        if after.isalnum() or after in _JOINERS:
+            return False
+        # "R&D", "C-suite", "John R. Smith"
+        return not (single_letter and after in _SINGLE_LETTER_STOPS)
+
+    def extract(self, text):
+        """
+        ``{canonical skill: mentions}`` in order of first mention
+        """
+        return dict(Counter(canonical for _, _, canonical in self.find(text)))
+
+    def category(self, skill):
+        entry = self.taxonomy.get(skill)
+        return entry[0] if entry else None
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """
+    Process-wide matcher; the automaton is built once
+    """
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = SkillMatcher()
+        return _matcher
+
+
+def extract_skills(text):
+    """
+    Canonical skills mentioned in text, mapped to their mention counts
+    """
+    return get_skill_matcher().extract(text)
+
+
+def group_by_category(skills):
+    """
+    ``{category: [skills]}``, keeping the order the skills were given in
+    """
+    matcher = get_skill_matcher()
+    grouped = {}
+    for skill in skills:
+        grouped.setdefault(matcher.category(skill) or 'Other', []).append(skill)
+    return grouped
+
+
+def resume_skill_profile(resume_text):
+    """
+    Skills found in a resume, grouped by category, and its three most mentioned programming languages
+    """
+    skills = extract_skills(resume_text)
+    languages = [skill for skill in skills if get_skill_matcher().category(skill) == LANGUAGES]
+    languages.sort(key=lambda skill: -skills[skill])
+    return {
+        'skills': group_by_category(skills),
+        'best_programming_languages': languages[:3],
+    }
+
+
+def job_skills(description, required_skills=None):
+    """
+    Skills a job asks for: taxonomy skills in its description and listed skills.
+    Listed skills the taxonomy does not know are kept as written.
+    """
+    if isinstance(required_skills, str):
+        required_skills = [required_skills]
+    skills = list(extract_skills(description))
+    for listed in required_skills or []:
+        listed = ' '.join(str(listed).split())
+        found = list(extract_skills(listed)) or ([listed] if listed else [])
+        skills.extend(skill for skill in found if skill not in skills)
+    return skills
+
+
+def skill_gap(resume_text, wanted, resume_skills=None):
+    """
+    Split a job's skills into ``matched`` and ``missing`` against a resume
+    """
+    if resume_skills is None:
+        resume_skills = extract_skills(resume_text)
+    lowered = ' '.join((resume_text or '').lower().split())
+    matched, missing = [], []
+    for skill in wanted:
+        if skill in resume_skills:
+            matched.append(skill)
+        elif skill not in SKILLS and re.search(rf'(?<![\w+#]){re.escape(skill.lower())}(?![\w+#])', lowered):
+            # A listed skill outside the taxonomy, found verbatim
+            matched.append(skill)
+        else:
+            missing.append(skill)
+    return {'matched': matched, 'missing': missing}
@@ -6,7 +6,12 @@ from django.contrib import messages
 from django.conf import settings
 from django.http import JsonResponse
 from apps.users.models import Profile
-from ai_resume_platform.utils.ai_service import AIService
+from ai_resume_platform.utils.ai_service import AsyncAIService
+from ai_resume_platform.utils.sse import ai_events_to_sse, sse_response
+from ai_resume_platform.utils.idempotency import idempotent
+from apps.tasks.queue import aenqueue, task_accepted_response
+from .models import AnalysisResult
+from .results import ResultStore, latest_result, stored_events
 
 @login_required
 def analyzer(request):
@@ -21,25 +26,45 @@ def analyzer(request):
     else:
         request.session['resumes_analyzed'] = 1
     
-    return render(request, 'analyzer/analyzer.html', {'profile': profile})
+    # Show the last analysis straight away instead of asking the model again
+    stored = latest_result(request.user, AnalysisResult.TASK_ANALYZE_RESUME)
+    context = {
+        'profile': profile,
+        'stored_analysis': stored.result if stored else None,
+    }
+    return render(request, 'analyzer/analyzer.html', context)
 
 @login_required
-def analyze_resume(request):
+@idempotent
+async def analyze_resume(request):
     if request.method == 'POST':
         try:
-            profile = Profile.objects.get(user=request.user)
+            user = await request.auser()
+            profile = await Profile.objects.aget(user=user)
             
             if not profile.resume_url:
                 return JsonResponse({'error': 'No resume uploaded'}, status=400)
             
             # Initialize AI service
-            ai_service = AIService()
+            ai_service = AsyncAIService(user_id=user.id)
             
             # Pass the Cloudinary URL to the AI service
             resume_url = profile.resume_url
             
+            # Serve the stored analysis of this exact resume when there is one
+            store = await ResultStore.for_resume(user, resume_url)
+            analysis = await store.lookup(AnalysisResult.TASK_ANALYZE_RESUME)
+            if analysis is not None:
+                return JsonResponse({'analysis': analysis})
+            
+            # Queue for the background worker when asked; the client polls the status URL
+            if request.POST.get('background'):
+                task = await aenqueue(user, 'analyze_resume', {'resume_url': resume_url})
+                return task_accepted_response(task)
+            
             # Call AI service to analyze resume - THIS CALLS THE REAL API
-            analysis = ai_service.analyze_resume_from_url(resume_url)
+            # (for a revised upload, only the sections changed since the last analysis)
+            analysis = await ai_service.analyze_resume_from_url(resume_url, base=await store.analysis_base())
             
             # Log the response for debugging
             import logging
@@ -51,6 +76,8 @@ def analyze_resume(request):
                 logger.error(f"API Error: {analysis['error']}")
                 return JsonResponse({'error': analysis['error']}, status=500)
             
+            await store.save(AnalysisResult.TASK_ANALYZE_RESUME, analysis)
+            
             # Return the REAL analysis from OpenRouter API
             logger.error(f"Sending analysis to frontend: {analysis}")
             return JsonResponse({'analysis': analysis})
@@ -61,4 +88,43 @@ def analyze_resume(request):
             logger.error(f"Exception in analyze_resume: {str(e)}")
             return JsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
\ No newline at end of file
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+@login_required
+async def analyze_resume_stream(request):
+    """Stream the analysis as server-sent events, one event per completed section"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    
+    user = await request.auser()
+    profile = await Profile.objects.aget(user=user)
+    
+    if not profile.resume_url:
+        return JsonResponse({'error': 'No resume uploaded'}, status=400)
+    
+    store = await ResultStore.for_resume(user, profile.resume_url)
+    analysis = await store.lookup(AnalysisResult.TASK_ANALYZE_RESUME)
+    if analysis is not None:
+        return sse_response(ai_events_to_sse(stored_events(analysis)))
+    
+    ai_service = AsyncAIService(user_id=user.id)
+    events = ai_service.stream_analysis(profile.resume_url, base=await store.analysis_base())
+    events = store.record_stream(events, AnalysisResult.TASK_ANALYZE_RESUME)
+    return sse_response(ai_events_to_sse(events))
+
+@login_required
+async def score_resume(request):
+    """Local ATS and industry scores in milliseconds, without waiting for the model"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    
+    user = await request.auser()
+    profile = await Profile.objects.aget(user=user)
+    
+    if not profile.resume_url:
+        return JsonResponse({'error': 'No resume uploaded'}, status=400)
+    
+    score = await AsyncAIService(user_id=user.id).score_resume_from_url(profile.resume_url)
+    if 'error' in score:
+        return JsonResponse({'error': score['error']}, status=500)
+    return JsonResponse({'score': score})
@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('', views.career_path, name='career_path'),
     path('plan/', views.plan_career, name='plan_career'),
+    path('plan/stream/', views.plan_career_stream, name='plan_career_stream'),
 ]
\ No newline at end of file
@@ -6,7 +6,12 @@ from django.contrib import messages
 from django.conf import settings
 from django.http import JsonResponse
 from apps.users.models import Profile
-from ai_resume_platform.utils.ai_service import AIService
+from ai_resume_platform.utils.ai_service import AsyncAIService
+from ai_resume_platform.utils.sse import ai_events_to_sse, sse_response
+from ai_resume_platform.utils.idempotency import idempotent
+from apps.tasks.queue import aenqueue, task_accepted_response
+from apps.analyzer.models import AnalysisResult
+from apps.analyzer.results import ResultStore, stored_events
 
 @login_required
 def career_path(request):
@@ -24,7 +29,8 @@ def career_path(request):
     return render(request, 'career_path/career.html', {'profile': profile})
 
 @login_required
-def plan_career(request):
+@idempotent
+async def plan_career(request):
     if request.method == 'POST':
         try:
             # Get form data
@@ -35,13 +41,14 @@ def plan_career(request):
             learning_commitment = request.POST.get('learning_commitment', '')
             target_outcome = request.POST.get('target_outcome', '')
             
-            profile = Profile.objects.get(user=request.user)
+            user = await request.auser()
+            profile = await Profile.objects.aget(user=user)
             
             if not profile.resume_url:
                 return JsonResponse({'error': 'No resume uploaded'}, status=400)
             
             # Initialize AI service
-            ai_service = AIService()
+            ai_service = AsyncAIService(user_id=user.id)
             
             # Create user inputs dictionary
             user_inputs = {
@@ -53,16 +60,58 @@ def plan_career(request):
                 'target_outcome': target_outcome
             }
             
+            # Serve the stored plan for this resume and these goals when there is one
+            store = await ResultStore.for_resume(user, profile.resume_url)
+            career_plan = await store.lookup(AnalysisResult.TASK_PLAN_CAREER, user_inputs)
+            if career_plan is not None:
+                return JsonResponse({'career_plan': career_plan})
+            
+            # Queue for the background worker when asked; the client polls the status URL
+            if request.POST.get('background'):
+                task = await aenqueue(user, 'plan_career', {'resume_url': profile.resume_url, 'user_inputs': user_inputs})
+                return task_accepted_response(task)
+            
             # Call AI service to plan career with resume URL
-            career_plan = ai_service.plan_career_from_url(profile.resume_url, user_inputs)
+            career_plan = await ai_service.plan_career_from_url(profile.resume_url, user_inputs)
             
             # Check if there was an error
             if 'error' in career_plan:
                 return JsonResponse({'error': career_plan['error']}, status=500)
             
+            await store.save(AnalysisResult.TASK_PLAN_CAREER, career_plan, user_inputs)
             return JsonResponse({'career_plan': career_plan})
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
\ No newline at end of file
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+@login_required
+async def plan_career_stream(request):
+    """Stream the career plan as server-sent events; each roadmap phase is sent as soon as it completes"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    
+    user = await request.auser()
+    profile = await Profile.objects.aget(user=user)
+    
+    if not profile.resume_url:
+        return JsonResponse({'error': 'No resume uploaded'}, status=400)
+    
+    user_inputs = {
+        'career_goal': request.POST.get('career_goal', ''),
+        'timeframe': request.POST.get('timeframe', ''),
+        'preferred_industry': request.POST.get('preferred_industry', ''),
+        'current_skill_level': request.POST.get('current_skill_level', ''),
+        'learning_commitment': request.POST.get('learning_commitment', ''),
+        'target_outcome': request.POST.get('target_outcome', '')
+    }
+    
+    store = await ResultStore.for_resume(user, profile.resume_url)
+    career_plan = await store.lookup(AnalysisResult.TASK_PLAN_CAREER, user_inputs)
+    if career_plan is not None:
+        return sse_response(ai_events_to_sse(stored_events(career_plan)))
+    
+    ai_service = AsyncAIService(user_id=user.id)
+    events = store.record_stream(ai_service.stream_career_plan(profile.resume_url, user_inputs), AnalysisResult.TASK_PLAN_CAREER, user_inputs)
+    return sse_response(ai_events_to_sse(events))
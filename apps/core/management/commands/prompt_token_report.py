@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_resume_platform.utils import prompts
+from apps.analyzer.utils.pdf_extractor import extract_text, normalize_text
+
+SAMPLE_JOB = {
+    'title': 'Backend Engineer',
+    'company': 'Example Corp',
+    'level': 'Mid-level',
+    'salary': 'Not specified',
+}
+
+
+class Command(BaseCommand):
+    help = 'Show the token budget of every AI prompt template, optionally rendered against a real resume'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resume', help='Resume PDF or text file to render the templates with')
+        parser.add_argument('--job-description', help='Text file with a job description to render the match prompts with')
+
+    def handle(self, *args, **options):
+        resume_text = self.read_file(options['resume']) if options['resume'] else ''
+        job_description = self.read_file(options['job_description']) if options['job_description'] else ''
+
+        header = f"{'template':<20}{'version':>8}{'overhead':>10}{'max input':>11}{'rendered':>10}{'max_tokens':>12}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for template in prompts.TEMPLATES:
+            # Worst case: every budgeted field filled to its cap
+            max_input = template.overhead_tokens + sum(template.budgets.values())
+            rendered = ''
+            if resume_text:
+                prompt = self.render(template, resume_text, job_description)
+                rendered = prompt.input_tokens
+            self.stdout.write(
+                f"{template.name:<20}{'v' + str(template.version):>8}{template.overhead_tokens:>10}"
+                f"{max_input:>11}{rendered:>10}{template.max_tokens:>12}"
+            )
+        self.stdout.write(f"\nSystem prompt: {prompts.estimate_tokens(prompts.SYSTEM_PROMPT)} tokens per call")
+
+    def read_file(self, path):
+        try:
+            with open(path, 'rb') as handle:
+                data = handle.read()
+        except OSError as e:
+            raise CommandError(str(e))
+        if data[:5] == b'%PDF-':
+            return normalize_text(extract_text(data))
+        return data.decode('utf-8', errors='replace')
+
+    def render(self, template, resume_text, job_description):
+        job = dict(SAMPLE_JOB, description=job_description)
+        if template is prompts.MATCH_JOB:
+            return template.render(
+                resume_text=resume_text,
+                job_title=job['title'],
+                company=job['company'],
+                job_level=job['level'],
+                salary=job['salary'],
+                job_description=job_description,
+            )
+        if template is prompts.MATCH_JOBS_PACKED:
+            jobs_text = prompts.PACKED_JOB.render(number=1, **job).text
+            return template.render(resume_text=resume_text, job_count=1, jobs_text=jobs_text)
+        if template is prompts.OPTIMIZE_RESUME:
+            return template.render(resume_text=resume_text, template_type='Cosmic', job_description=job_description)
+        return template.render(resume_text=resume_text)
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_resume_platform.utils.upstream_simulator import PREFIXES, UpstreamProfile, UpstreamSimulator, parse_latency
+
+DEFAULT_LATENCY = {
+    'openrouter': 'lognormal:2.0:0.5',
+    'jsearch': 'lognormal:0.6:0.4',
+    'cloudinary': 'lognormal:0.3:0.3',
+}
+
+
+class Command(BaseCommand):
+    help = ('Serve a local stand-in for the OpenRouter, JSearch and Cloudinary APIs. '
+            'Set UPSTREAM_SIMULATOR_URL to its address to point the app at it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument(
+            '--latency', action='append', default=[], metavar='UPSTREAM=SPEC',
+            help='Latency distribution per upstream, e.g. openrouter=lognormal:2:0.5 '
+                 '(fixed:S, uniform:LOW:HIGH, normal:MEAN:SD, lognormal:MEDIAN:SIGMA, exponential:MEAN)'
+        )
+        parser.add_argument('--error-rate', action='append', default=[], metavar='UPSTREAM=RATE',
+                            help='Share of requests answered with a 500/502/503, e.g. openrouter=0.05')
+        parser.add_argument('--throttle-rate', action='append', default=[], metavar='UPSTREAM=RATE',
+                            help='Share of requests answered with a 429, e.g. jsearch=0.1')
+        parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+        parser.add_argument('--stream-chunks', type=int, default=20, help='Chunks per streamed chat completion')
+        parser.add_argument('--record', metavar='DIR', help='Forward to the real upstreams and save the responses in DIR')
+        parser.add_argument('--replay', metavar='DIR', help='Serve responses saved with --record from DIR')
+        parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        if options['record'] and options['replay']:
+            raise CommandError('Use either --record or --replay, not both')
+
+        latency = dict(DEFAULT_LATENCY, **self.per_upstream(options['latency'], 'latency'))
+        error_rates = self.per_upstream(options['error_rate'], 'error-rate', float)
+        throttle_rates = self.per_upstream(options['throttle_rate'], 'throttle-rate', float)
+        for spec in latency.values():
+            try:
+                parse_latency(spec)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        profiles = {
+            name: UpstreamProfile(
+                latency=latency[name],
+                error_rate=error_rates.get(name, 0.0),
+                throttle_rate=throttle_rates.get(name, 0.0),
+                retry_after=options['retry_after'],
+            )
+            for name in PREFIXES
+        }
+        try:
+            simulator = UpstreamSimulator(
+                host=options['host'],
+                port=options['port'],
+                profiles=profiles,
+                record_dir=options['record'],
+                replay_dir=options['replay'],
+                stream_chunks=options['stream_chunks'],
+                verbose=options['verbose'],
+            )
+        except OSError as e:
+            raise CommandError(f"Could not start the simulator: {e}")
+
+        mode = 'record' if options['record'] else 'replay' if options['replay'] else 'canned'
+        self.stdout.write(f"Upstream simulator on {simulator.url} ({mode} payloads)")
+        for name, profile in profiles.items():
+            self.stdout.write(
+                f"  {name:<11}{simulator.url}{PREFIXES[name]:<22} latency {profile.latency_spec}, "
+                f"errors {profile.error_rate:.0%}, 429s {profile.throttle_rate:.0%}"
+            )
+        self.stdout.write(f"Point the app at it with UPSTREAM_SIMULATOR_URL={simulator.url}")
+        try:
+            simulator.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            simulator.shutdown()
+            for name, counts in simulator.stats.items():
+                self.stdout.write(f"{name}: {counts['requests']} requests, {counts['errors']} errors, {counts['throttled']} throttled")
+
+    def per_upstream(self, values, option, convert=str):
+        parsed = {}
+        for value in values:
+            name, _, setting = value.partition('=')
+            if name not in PREFIXES or not setting:
+                raise CommandError(f"--{option} expects UPSTREAM=VALUE with UPSTREAM one of {', '.join(PREFIXES)}")
+            try:
+                parsed[name] = convert(setting)
+            except ValueError:
+                raise CommandError(f"Invalid --{option} value: {value}")
+        return parsed
@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('status/rate-limits/', views.rate_limit_status, name='rate_limit_status'),
+    path('status/model-routes/', views.model_route_status, name='model_route_status'),
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
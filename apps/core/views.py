@@ -1,6 +1,12 @@
 from django.shortcuts import render
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
 from apps.users.models import Profile
+from ai_resume_platform.utils.metrics import get_metrics
+from ai_resume_platform.utils.model_router import get_model_router
+from ai_resume_platform.utils.rate_limit import get_rate_limiter
 
 def home(request):
     """Landing page for unauthenticated users"""
@@ -24,4 +30,26 @@ def dashboard(request):
         'career_paths': career_paths,
         'resumes_built': resumes_built
     }
-    return render(request, 'dashboard/home.html', context)
\ No newline at end of file
+    return render(request, 'dashboard/home.html', context)
+
+@staff_member_required
+def rate_limit_status(request):
+    """Current token buckets, queue depth and wait times for every rate-limited upstream"""
+    limiter = get_rate_limiter()
+    upstreams = getattr(settings, 'RATE_LIMITS', {})
+    return JsonResponse({'upstreams': [limiter.status(upstream) for upstream in upstreams]})
+
+@staff_member_required
+def model_route_status(request):
+    """Calls, errors, fallbacks, latency and cost for every AI model route"""
+    return JsonResponse({'routes': get_model_router().stats()})
+
+def metrics(request):
+    """Prometheus metrics for all worker processes; staff only, or a scraper with the METRICS token"""
+    token = (getattr(settings, 'METRICS', {}) or {}).get('TOKEN')
+    authorized = request.user.is_authenticated and request.user.is_staff
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        authorized = True
+    if not authorized:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(get_metrics().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -5,4 +5,5 @@ urlpatterns = [
     path('', views.job_match, name='job_match'),
     path('match/', views.match_job, name='match_job'),
     path('match-direct/', views.match_job_direct, name='match_job_direct'),
+    path('match-batch/', views.match_jobs_batch, name='match_jobs_batch'),
 ]
\ No newline at end of file
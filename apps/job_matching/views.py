@@ -7,7 +7,12 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from apps.users.models import Profile
-from ai_resume_platform.utils.ai_service import AIService
+from ai_resume_platform.utils.ai_service import AsyncAIService, rank_match_results
+from ai_resume_platform.utils.sse import format_sse, sse_response
+from ai_resume_platform.utils.idempotency import idempotent
+from apps.tasks.queue import aenqueue, task_accepted_response
+from apps.analyzer.models import AnalysisResult
+from apps.analyzer.results import ResultStore
 
 @login_required
 def job_match(request):
@@ -29,7 +34,8 @@ def job_match(request):
     return render(request, 'job_matching/job_match.html', context)
 
 @login_required
-def match_job(request):
+@idempotent
+async def match_job(request):
     if request.method == 'POST':
         try:
             # Get job details from POST data
@@ -42,13 +48,14 @@ def match_job(request):
             if not job_title or not job_description:
                 return JsonResponse({'error': 'Job title and description are required'}, status=400)
             
-            profile = Profile.objects.get(user=request.user)
+            user = await request.auser()
+            profile = await Profile.objects.aget(user=user)
             
             if not profile.resume_url:
                 return JsonResponse({'error': 'No resume uploaded'}, status=400)
             
             # Initialize AI service
-            ai_service = AIService()
+            ai_service = AsyncAIService(user_id=user.id)
             
             # Pass the Cloudinary URL and job details to the AI service
             resume_url = profile.resume_url
@@ -62,13 +69,25 @@ def match_job(request):
                 'description': job_description
             }
             
+            # Serve the stored match for this resume and job when there is one
+            store = await ResultStore.for_resume(user, resume_url)
+            match_result = await store.lookup(AnalysisResult.TASK_MATCH_JOB, job_details)
+            if match_result is not None:
+                return JsonResponse({'match': match_result})
+            
+            # Queue for the background worker when asked; the client polls the status URL
+            if request.POST.get('background'):
+                task = await aenqueue(user, 'match_job', {'resume_url': resume_url, 'job_details': job_details})
+                return task_accepted_response(task)
+            
             # Call AI service to match job
-            match_result = ai_service.match_job_from_url(resume_url, job_details)
+            match_result = await ai_service.match_job_from_url(resume_url, job_details)
             
             # Check if there was an error
             if 'error' in match_result:
                 return JsonResponse({'error': match_result['error']}, status=500)
             
+            await store.save(AnalysisResult.TASK_MATCH_JOB, match_result, job_details)
             return JsonResponse({'match': match_result})
             
         except Exception as e:
@@ -77,8 +96,9 @@ def match_job(request):
     return JsonResponse({'error': 'Invalid request method'}, status=400)
 
 @login_required
-def match_job_direct(request):
-    """Match job directly with resume URL without storing data"""
+@idempotent
+async def match_job_direct(request):
+    """Match a job listing (JSearch fields) directly against the user's resume"""
     if request.method == 'POST':
         try:
             # Get job details from POST data
@@ -92,13 +112,14 @@ def match_job_direct(request):
             if not job_title or not job_description:
                 return JsonResponse({'error': 'Job title and description are required'}, status=400)
             
-            profile = Profile.objects.get(user=request.user)
+            user = await request.auser()
+            profile = await Profile.objects.aget(user=user)
             
             if not profile.resume_url:
                 return JsonResponse({'error': 'No resume uploaded'}, status=400)
             
             # Initialize AI service
-            ai_service = AIService()
+            ai_service = AsyncAIService(user_id=user.id)
             
             # Pass the Cloudinary URL and job details to the AI service
             resume_url = profile.resume_url
@@ -112,16 +133,89 @@ def match_job_direct(request):
                 'location': f"{job_city}, {job_state}" if job_city and job_state else (job_city or job_state or '')
             }
             
+            # Serve the stored match for this resume and job when there is one
+            store = await ResultStore.for_resume(user, resume_url)
+            match_result = await store.lookup(AnalysisResult.TASK_MATCH_JOB, job_details)
+            if match_result is not None:
+                return JsonResponse({'match': match_result})
+            
+            # Queue for the background worker when asked; the client polls the status URL
+            if request.POST.get('background'):
+                task = await aenqueue(user, 'match_job', {'resume_url': resume_url, 'job_details': job_details})
+                return task_accepted_response(task)
+            
             # Call AI service to match job
-            match_result = ai_service.match_job_from_url(resume_url, job_details)
+            match_result = await ai_service.match_job_from_url(resume_url, job_details)
             
             # Check if there was an error
             if 'error' in match_result:
                 return JsonResponse({'error': match_result['error']}, status=500)
             
+            await store.save(AnalysisResult.TASK_MATCH_JOB, match_result, job_details)
             return JsonResponse({'match': match_result})
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
\ No newline at end of file
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+def job_details_from_listing(job):
+    """Convert a JSearch-style job listing into the job details AIService expects"""
+    job_city = job.get('job_city') or ''
+    job_state = job.get('job_state') or ''
+    return {
+        'job_id': job.get('job_id') or '',
+        'title': job.get('job_title') or '',
+        'company': job.get('employer_name') or '',
+        'level': job.get('job_employment_type') or '',
+        'description': job.get('job_description') or '',
+        'required_skills': job.get('job_required_skills') or [],
+        'location': f"{job_city}, {job_state}" if job_city and job_state else (job_city or job_state or '')
+    }
+
+async def batch_match_events(ai_service, resume_url, jobs, concurrency):
+    """Server-sent events: one 'result' per job as it finishes, then 'done' with the ranked list"""
+    yield ": stream open\n\n"
+    results = []
+    async for result in ai_service.stream_job_matches(resume_url, jobs, concurrency):
+        results.append(result)
+        yield format_sse('result', result)
+    yield format_sse('done', {'results': rank_match_results(results)})
+
+@login_required
+async def match_jobs_batch(request):
+    """Match the user's resume against many jobs at once, streaming partial results"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    
+    try:
+        listings = json.loads(request.POST.get('jobs', '[]'))
+    except ValueError:
+        return JsonResponse({'error': 'Jobs must be a JSON list'}, status=400)
+    
+    if not isinstance(listings, list) or not listings:
+        return JsonResponse({'error': 'At least one job is required'}, status=400)
+    
+    max_jobs = getattr(settings, 'AI_BATCH_MATCH_MAX_JOBS', 20)
+    if len(listings) > max_jobs:
+        return JsonResponse({'error': f'At most {max_jobs} jobs can be matched at once'}, status=400)
+    
+    jobs = [job_details_from_listing(job) for job in listings if isinstance(job, dict)]
+    if any(not job['title'] or not job['description'] for job in jobs):
+        return JsonResponse({'error': 'Job title and description are required for every job'}, status=400)
+    
+    user = await request.auser()
+    profile = await Profile.objects.aget(user=user)
+    
+    if not profile.resume_url:
+        return JsonResponse({'error': 'No resume uploaded'}, status=400)
+    
+    # Clients may ask for less concurrency than the configured limit, never more
+    concurrency = getattr(settings, 'AI_BATCH_MATCH_CONCURRENCY', 4)
+    try:
+        concurrency = max(1, min(concurrency, int(request.POST.get('concurrency', concurrency))))
+    except ValueError:
+        pass
+    
+    ai_service = AsyncAIService(user_id=user.id)
+    return sse_response(batch_match_events(ai_service, profile.resume_url, jobs, concurrency))
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import Job
 
-# Register your models here.
\ No newline at end of file
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'employer_name', 'city', 'state', 'employment_type', 'last_seen_at')
+    search_fields = ('job_id', 'title', 'employer_name')
+    list_filter = ('employment_type', 'is_remote', 'last_seen_at')
@@ -0,0 +1,35 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.jobs.utils.featured import get_featured_jobs_snapshot
+from apps.jobs.views import fetch_featured_jobs
+
+
+class Command(BaseCommand):
+    help = 'Precompute the featured jobs (with salary estimates) that the jobs page shows'
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'FEATURED_JOBS', {}) or {}
+        parser.add_argument('--interval', type=int, default=config.get('REFRESH_INTERVAL', 60 * 15),
+                            help='Seconds between refreshes')
+        parser.add_argument('--once', action='store_true', help='Refresh once and exit (for cron)')
+
+    def handle(self, *args, **options):
+        featured = get_featured_jobs_snapshot()
+        try:
+            while True:
+                started = time.monotonic()
+                entry = featured.refresh(fetch_featured_jobs)
+                if entry is not None:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Stored {len(entry['jobs'])} featured jobs in {time.monotonic() - started:.1f}s"
+                    ))
+                else:
+                    previous = featured.snapshot()
+                    age = f"{time.time() - previous['fetched_at']:.0f}s old" if previous else 'none'
+                    self.stdout.write(self.style.WARNING(f"Refresh skipped or failed; keeping the last snapshot ({age})"))
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping featured jobs refresher')
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-18 20:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+FTS_SQL = [
+    "CREATE VIRTUAL TABLE jobs_job_fts USING fts5("
+    "title, employer_name, description, skills, content='jobs_job', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER jobs_job_fts_insert AFTER INSERT ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(rowid, title, employer_name, description, skills) "
+    "VALUES (new.id, new.title, new.employer_name, new.description, new.skills); END",
+    "CREATE TRIGGER jobs_job_fts_delete AFTER DELETE ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, employer_name, description, skills) "
+    "VALUES ('delete', old.id, old.title, old.employer_name, old.description, old.skills); END",
+    "CREATE TRIGGER jobs_job_fts_update AFTER UPDATE ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, employer_name, description, skills) "
+    "VALUES ('delete', old.id, old.title, old.employer_name, old.description, old.skills); "
+    "INSERT INTO jobs_job_fts(rowid, title, employer_name, description, skills) "
+    "VALUES (new.id, new.title, new.employer_name, new.description, new.skills); END",
+]
+
+FTS_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS jobs_job_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_insert",
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    # Other databases fall back to plain LIKE filters in apps/jobs/store.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=255, unique=True)),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('title', models.CharField(max_length=255)),
+                ('employer_name', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('employment_type', models.CharField(blank=True, max_length=50)),
+                ('is_remote', models.BooleanField(default=False)),
+                ('description', models.TextField(blank=True)),
+                ('skills', models.JSONField(default=list)),
+                ('data', models.JSONField()),
+                ('first_seen_at', models.DateTimeField(auto_now_add=True)),
+                ('last_seen_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-last_seen_at'],
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -1,3 +1,34 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
\ No newline at end of file
+
+class Job(models.Model):
+    """
+    A posting fetched from JSearch, kept so later searches can be answered locally.
+    On SQLite the title, employer, description and skills are indexed in the
+    ``jobs_job_fts`` FTS5 table, kept in sync by triggers (see migration 0001).
+    """
+
+    # JSearch job_id; reposts of a posting under a new id are matched by fingerprint instead
+    job_id = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    title = models.CharField(max_length=255)
+    employer_name = models.CharField(max_length=255, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=100, blank=True)
+    employment_type = models.CharField(max_length=50, blank=True)
+    is_remote = models.BooleanField(default=False)
+    description = models.TextField(blank=True)
+    # Canonical skill names from the taxonomy (apps/analyzer/utils/skills.py)
+    skills = models.JSONField(default=list)
+    # The posting as JSearch returned it, with its salary_estimate
+    data = models.JSONField()
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-last_seen_at']
+
+    def __str__(self):
+        return f"{self.title} at {self.employer_name or 'unknown employer'}"
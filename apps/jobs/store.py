@@ -0,0 +1,197 @@
+import datetime
+import hashlib
+import re
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.analyzer.utils.skills import job_skills
+from .models import Job
+from .utils.salary import normalize
+from .utils.search_cache import US_STATES, canonical_employment_type
+
+# bm25 weights of the FTS columns: title, employer_name, description, skills
+FTS_WEIGHTS = (10.0, 2.0, 1.0, 4.0)
+# Ranked FTS hits fetched before the location, type and age filters are applied
+FTS_CANDIDATES = 500
+# Attempts at storing a batch while another worker holds the database lock, with doubling delays
+SAVE_ATTEMPTS = 3
+SAVE_RETRY_DELAY = 0.5
+
+_FTS_WORD = re.compile(r"[^\s\"]+")
+
+
+def store_config():
+    config = getattr(settings, 'JOB_STORE', {}) or {}
+    return {
+        'MIN_LOCAL_RESULTS': config.get('MIN_LOCAL_RESULTS', 10),
+        'MAX_RESULTS': config.get('MAX_RESULTS', 20),
+        'MAX_AGE_DAYS': config.get('MAX_AGE_DAYS', 14),
+    }
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def posting_fingerprint(posting):
+    """
+    Hash of what makes two postings the same job, whichever board or id they came under
+    """
+    parts = [
+        normalize(posting.get('job_title')),
+        normalize(posting.get('employer_name')),
+        normalize(posting.get('job_city')),
+        normalize(posting.get('job_description')),
+    ]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def job_fields(posting):
+    """
+    Job column values for a JSearch posting
+    """
+    state = (posting.get('job_state') or '').strip()
+    return {
+        'title': (posting.get('job_title') or '')[:255],
+        'employer_name': (posting.get('employer_name') or '')[:255],
+        'city': (posting.get('job_city') or '')[:100],
+        'state': US_STATES.get(state.lower(), state.lower())[:100],
+        'country': (posting.get('job_country') or '')[:100],
+        'employment_type': canonical_employment_type(posting.get('job_employment_type'))[:50],
+        'is_remote': bool(posting.get('job_is_remote')),
+        'description': posting.get('job_description') or '',
+        'skills': job_skills(posting.get('job_description') or '', posting.get('job_required_skills')),
+        'data': posting,
+        'last_seen_at': timezone.now(),
+    }
+
+
+@contextmanager
+def write_transaction():
+    """
+    transaction.atomic that takes SQLite's write lock as it begins (BEGIN IMMEDIATE). A deferred
+    transaction that reads and then writes cannot wait for the lock when it upgrades and fails
+    with "database is locked" at once; an immediate one waits out the busy timeout instead.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic():
+            yield
+        return
+    connection.ensure_connection()
+    previous = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic():
+            # BEGIN IMMEDIATE has been issued; nothing else on this connection changes mode
+            connection.transaction_mode = previous
+            yield
+    finally:
+        connection.transaction_mode = previous
+
+
+def save_postings(postings):
+    """
+    Upsert fetched postings, matching existing rows by job_id and then by fingerprint.
+    The batch is retried when the database is locked; the last failure is raised.
+    """
+    for attempt in range(SAVE_ATTEMPTS):
+        try:
+            return _save_postings(postings)
+        except OperationalError as e:
+            if attempt == SAVE_ATTEMPTS - 1:
+                raise
+            print(f"Storing jobs failed ({str(e)}), retrying")
+            time.sleep(SAVE_RETRY_DELAY * 2 ** attempt)
+
+
+def _save_postings(postings):
+    saved = 0
+    with write_transaction():
+        for posting in postings:
+            if not posting.get('job_title'):
+                continue
+            fingerprint = posting_fingerprint(posting)
+            job_id = posting.get('job_id') or fingerprint
+            fields = job_fields(posting)
+            job = Job.objects.filter(job_id=job_id).first() or Job.objects.filter(fingerprint=fingerprint).first()
+            if job is None:
+                Job.objects.create(job_id=job_id, fingerprint=fingerprint, **fields)
+            else:
+                # A repost keeps the row (and job_id) it was first stored under
+                Job.objects.filter(pk=job.pk).update(fingerprint=fingerprint, **fields)
+            saved += 1
+    return saved
+
+
+def fts_match(keywords):
+    """
+    FTS5 query requiring every keyword, each quoted so punctuation is never read as syntax
+    """
+    return ' '.join(f'"{word}"' for word in _FTS_WORD.findall(keywords))
+
+
+def query_filter(query):
+    """
+    Location, employment type and age conditions of a canonical query (see search_cache.canonical_query)
+    """
+    max_age = datetime.timedelta(days=store_config()['MAX_AGE_DAYS'])
+    conditions = Q(last_seen_at__gte=timezone.now() - max_age)
+    location = query['location']
+    if location == 'remote':
+        conditions &= Q(is_remote=True)
+    elif location:
+        parts = location.split(', ')
+        if len(parts) == 1:
+            conditions &= Q(city__iexact=parts[0]) | Q(state=parts[0])
+        else:
+            conditions &= Q(city__iexact=parts[0], state=parts[1])
+    if query['job_type']:
+        conditions &= Q(employment_type__in=query['job_type'].split(','))
+    return conditions
+
+
+def search_local(query, limit=None):
+    """
+    Stored postings matching a canonical query, best first; [] when the store cannot be read
+    """
+    limit = limit or store_config()['MAX_RESULTS']
+    try:
+        jobs = Job.objects.filter(query_filter(query))
+        if not query['keywords']:
+            return [job.data for job in jobs[:limit]]
+        if uses_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT rowid FROM jobs_job_fts WHERE jobs_job_fts MATCH %s "
+                    "ORDER BY bm25(jobs_job_fts, %s, %s, %s, %s) LIMIT %s",
+                    [fts_match(query['keywords']), *FTS_WEIGHTS, FTS_CANDIDATES],
+                )
+                ranked = [row[0] for row in cursor.fetchall()]
+            found = {job.pk: job for job in jobs.filter(pk__in=ranked)}
+            return [found[pk].data for pk in ranked if pk in found][:limit]
+        for word in query['keywords'].split():
+            jobs = jobs.filter(
+                Q(title__icontains=word) | Q(employer_name__icontains=word) | Q(description__icontains=word)
+            )
+        return [job.data for job in jobs[:limit]]
+    except Exception as e:
+        print(f"Local job search failed: {str(e)}")
+        return []
+
+
+def merge_postings(primary, extra, limit):
+    """
+    primary followed by the postings of extra that are not already in it, up to limit
+    """
+    seen = set()
+    merged = []
+    for posting in list(primary) + list(extra):
+        keys = {posting.get('job_id'), posting_fingerprint(posting)} - {None, ''}
+        if keys & seen:
+            continue
+        seen |= keys
+        merged.append(posting)
+    return merged[:limit]
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.jobs_home, name='jobs_home'),
+    path('search/', views.search_jobs_stream, name='search_jobs_stream'),
 ]
\ No newline at end of file
@@ -0,0 +1,151 @@
+import math
+from collections import Counter, defaultdict
+from apps.analyzer.utils.ats_scorer import tokenize
+
+STOPWORDS = frozenset("""
+    a about above after all also an and any are as at be been being but by can could did do does
+    for from had has have he her his how i if in into is it its just may me more most my no not of
+    on or our out over own per she should so some such than that the their them then there these
+    they this those through to too under up us very was we were what when where which while who
+    will with within would you your years year work working team ability strong experience
+    including etc using use used well new role job responsibilities requirements preferred
+""".split())
+
+# Title terms say most about the job, then listed skills, then the description body
+FIELD_WEIGHTS = {
+    'job_title': 3.0,
+    'job_required_skills': 2.0,
+    'job_description': 1.0,
+}
+
+
+def analyze(text):
+    """
+    Tokens for indexing and querying: lowercase, stopwords dropped, simple plurals folded
+    """
+    terms = []
+    for token in tokenize(text or ''):
+        if token in STOPWORDS or (len(token) < 2 and token not in ('c', 'r')):
+            continue
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss') and '.' not in token:
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+def job_fields(job):
+    """
+    The searchable text of a JSearch job, per field
+    """
+    skills = job.get('job_required_skills') or []
+    if isinstance(skills, str):
+        skills = [skills]
+    return {
+        'job_title': job.get('job_title') or '',
+        'job_required_skills': ' '.join(str(skill) for skill in skills),
+        'job_description': job.get('job_description') or '',
+    }
+
+
+class BM25Index:
+    """
+    In-memory inverted index with BM25 scoring over weighted job fields.
+
+    Term frequencies from each field are multiplied by its weight before the usual
+    BM25 saturation (k1) and length normalisation (b), a simplified BM25F.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, field_weights=None):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self.postings = defaultdict(list)
+        self.lengths = []
+
+    def add(self, fields):
+        """
+        Index one document given as {field: text}; returns its position
+        """
+        doc_id = len(self.lengths)
+        frequencies = Counter()
+        length = 0.0
+        for field, text in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            terms = analyze(text)
+            length += weight * len(terms)
+            for term in terms:
+                frequencies[term] += weight
+        for term, frequency in frequencies.items():
+            self.postings[term].append((doc_id, frequency))
+        self.lengths.append(length)
+        return doc_id
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def search(self, text):
+        """
+        Score every document against free text (e.g. a whole resume).
+
+        Returns (scores, matched) where scores[doc_id] is the BM25 score and
+        matched[doc_id] lists the query terms the document contains, strongest first.
+        """
+        scores = [0.0] * len(self)
+        contributions = defaultdict(list)
+        if not len(self):
+            return scores, {}
+        average_length = sum(self.lengths) / len(self) or 1.0
+        # A long query like a resume repeats terms; dampen that instead of counting linearly
+        query = Counter(analyze(text))
+        for term, count in query.items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            query_weight = 1 + math.log(count)
+            idf = self.idf(term)
+            for doc_id, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                score = query_weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                scores[doc_id] += score
+                contributions[doc_id].append((score, term))
+        matched = {
+            doc_id: [term for _, term in sorted(terms, reverse=True)]
+            for doc_id, terms in contributions.items()
+        }
+        return scores, matched
+
+
+def rank_jobs(jobs, resume_text, top_k=None):
+    """
+    Sort JSearch jobs by BM25 fit against the resume text, best first.
+
+    Each job gets a ``local_fit`` dict (score, percent of the best fit, rank and
+    the top matching terms); the first ``top_k`` are flagged ``deep_match`` as the
+    ones worth an LLM match. Without resume text the upstream order is kept.
+    """
+    if not jobs or not resume_text or not resume_text.strip():
+        return jobs
+
+    index = BM25Index()
+    for job in jobs:
+        index.add(job_fields(job))
+    scores, matched = index.search(resume_text)
+
+    best = max(scores) or 1.0
+    order = sorted(range(len(jobs)), key=lambda doc_id: (-scores[doc_id], doc_id))
+    ranked = []
+    for rank, doc_id in enumerate(order, start=1):
+        job = jobs[doc_id]
+        job['local_fit'] = {
+            'score': round(scores[doc_id], 3),
+            'percent': int(round(100 * scores[doc_id] / best)),
+            'rank': rank,
+            'matched_terms': matched.get(doc_id, [])[:8],
+        }
+        job['deep_match'] = top_k is None or rank <= top_k
+        ranked.append(job)
+    return ranked
@@ -0,0 +1,120 @@
+import copy
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from ai_resume_platform.utils.cache import get_cache
+from ai_resume_platform.utils.metrics import get_metrics
+
+SNAPSHOT_KEY = 'snapshot'
+REFRESH_LOCK_KEY = 'refresh-lock'
+
+
+def get_featured_store():
+    """
+    Shared store of the featured jobs snapshot, configured by settings.FEATURED_JOBS
+    """
+    return get_cache('FEATURED_JOBS', table='featured_jobs')
+
+
+_featured_jobs = None
+_featured_jobs_lock = threading.Lock()
+
+
+def get_featured_jobs_snapshot():
+    """
+    Process-wide FeaturedJobs over the shared snapshot store
+    """
+    global _featured_jobs
+    with _featured_jobs_lock:
+        if _featured_jobs is None:
+            config = getattr(settings, 'FEATURED_JOBS', {}) or {}
+            _featured_jobs = FeaturedJobs(
+                store=get_featured_store(),
+                stale_after=config.get('STALE_AFTER', 60 * 30),
+                refresh_timeout=config.get('REFRESH_TIMEOUT', 120),
+            )
+        return _featured_jobs
+
+
+class FeaturedJobs:
+    """
+    The featured jobs, precomputed with their salary estimates.
+
+    ``refresh_featured_jobs`` (a management command) replaces the snapshot on a
+    schedule; pages only read it. A failed refresh leaves the last good snapshot
+    in place. If no refresher is running and the snapshot is older than
+    ``stale_after`` (or missing), readers queue one background refresh, guarded by
+    a lock in the shared store so only one worker calls JSearch.
+    """
+
+    def __init__(self, store, stale_after, refresh_timeout=120):
+        self.store = store
+        self.stale_after = stale_after
+        self.refresh_timeout = refresh_timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='featured-jobs-refresh')
+
+    def snapshot(self):
+        """
+        The stored ``{'jobs': [...], 'fetched_at': ...}``, or None before the first good refresh
+        """
+        return self.store.peek(SNAPSHOT_KEY)
+
+    def jobs(self, fetch):
+        """
+        Jobs from the snapshot without waiting on JSearch; None when there is no snapshot yet
+        """
+        entry = self.snapshot()
+        if entry is None or time.time() - entry['fetched_at'] >= self.stale_after:
+            self.schedule_refresh(fetch)
+        get_metrics().inc('jobs_featured_reads_total', result='miss' if entry is None else 'hit')
+        if entry is None:
+            return None
+        # Callers rank and annotate the jobs in place
+        return copy.deepcopy(entry['jobs'])
+
+    def refresh(self, fetch):
+        """
+        Fetch the featured jobs and store them; returns the new snapshot, or None when
+        the fetch failed or another worker is already refreshing
+        """
+        token = uuid.uuid4().hex
+        try:
+            if not self.store.add(REFRESH_LOCK_KEY, token, ttl=self.refresh_timeout):
+                return None
+        except Exception as e:
+            print(f"Featured jobs refresh lock failed: {str(e)}")
+            return None
+        try:
+            jobs = fetch()
+            if not jobs:
+                get_metrics().inc('jobs_featured_refresh_total', outcome='failed')
+                print("Featured jobs refresh failed, keeping the last snapshot")
+                return None
+            entry = {'jobs': jobs, 'fetched_at': time.time()}
+            # No TTL: the last good snapshot stays until a refresh replaces it
+            self.store.set(SNAPSHOT_KEY, entry)
+            get_metrics().inc('jobs_featured_refresh_total', outcome='ok')
+            return entry
+        finally:
+            try:
+                if self.store.peek(REFRESH_LOCK_KEY) == token:
+                    self.store.delete(REFRESH_LOCK_KEY)
+            except Exception as e:
+                print(f"Featured jobs refresh unlock failed: {str(e)}")
+
+    def schedule_refresh(self, fetch):
+        """
+        Queue a background refresh unless one is already running in any worker
+        """
+        if self.store.peek(REFRESH_LOCK_KEY) is not None:
+            return False
+        self._executor.submit(self._refresh_quietly, fetch)
+        return True
+
+    def _refresh_quietly(self, fetch):
+        try:
+            self.refresh(fetch)
+        except Exception as e:
+            print(f"Background featured jobs refresh failed: {str(e)}")
@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from ai_resume_platform.utils.cache import ResponseCache, get_cache
+from ai_resume_platform.utils.metrics import get_metrics
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+# Cached for UNAVAILABLE_TTL when a lookup gave no estimate, so jobs do not stay pending
+UNAVAILABLE = {'unavailable': True}
+
+
+def get_salary_cache():
+    """
+    Shared cache of salary estimates by (title, location), configured by settings.SALARY_ENRICHMENT
+    """
+    return get_cache('SALARY_ENRICHMENT', table='salary_estimates')
+
+
+def normalize(text):
+    return ' '.join(_NON_WORD.sub(' ', (text or '').lower()).split())
+
+
+def salary_lookup(job, default_location=''):
+    """
+    The (job title, location) a salary estimate is looked up for; None when there is no title
+    """
+    title = job.get('job_title', '')
+    if not title:
+        return None
+    # Just the city when there is one, as the estimate API matches cities best
+    location = job.get('job_city') or job.get('job_state') or default_location or 'Chicago'
+    return title, location
+
+
+def salary_key(title, location):
+    """
+    Cache and de-duplication key; titles and cities differing only in case or punctuation share it
+    """
+    return ResponseCache.make_key(title=normalize(title), location=normalize(location))
+
+
+def listed_salary(job):
+    """
+    salary_estimate built from the salary range JSearch listed with the job, or None
+    """
+    if not (job.get('job_min_salary') and job.get('job_max_salary')):
+        return None
+    return {
+        'min_salary': job['job_min_salary'],
+        'max_salary': job['job_max_salary'],
+        'median_salary': (job['job_min_salary'] + job['job_max_salary']) / 2,
+        'salary_period': job.get('job_salary_period', 'YEAR'),
+        'salary_currency': job.get('job_salary_currency', 'USD')
+    }
+
+
+def estimated_salary(data):
+    """
+    salary_estimate in the listing format from an estimated-salary API row
+    """
+    return {
+        'min_salary': data.get('min_salary'),
+        'max_salary': data.get('max_salary'),
+        'median_salary': data.get('median_salary'),
+        'salary_period': data.get('salary_period', 'YEAR'),
+        'salary_currency': data.get('salary_currency', 'USD')
+    }
+
+
+_enricher = None
+_enricher_lock = threading.Lock()
+
+
+def get_salary_enricher():
+    """
+    Process-wide SalaryEnricher, sized by settings.SALARY_ENRICHMENT
+    """
+    global _enricher
+    with _enricher_lock:
+        if _enricher is None:
+            config = getattr(settings, 'SALARY_ENRICHMENT', {}) or {}
+            _enricher = SalaryEnricher(
+                cache=get_salary_cache(),
+                max_workers=config.get('MAX_WORKERS', 8),
+                deadline=config.get('DEADLINE', 4.0),
+                unavailable_ttl=config.get('UNAVAILABLE_TTL', 60 * 5),
+            )
+        return _enricher
+
+
+class SalaryEnricher:
+    """
+    Adds ``salary_estimate`` to job listings.
+
+    Jobs that list a salary range use it. The others are grouped by normalized
+    (title, city) so each distinct pair is looked up once, from the salary cache
+    when possible and otherwise on a bounded thread pool, also shared with
+    concurrent requests asking for the same pair. Whatever has not answered by the
+    deadline is returned with ``salary_estimate`` None and ``salary_pending`` set;
+    the lookup keeps running and stores its answer, which ``fill_pending`` (or the
+    next enrichment) picks up. Lookups wait for the rate limiter only until the
+    deadline, and one that yields no estimate stores a short-lived UNAVAILABLE
+    marker, so a pending job always resolves.
+    """
+
+    def __init__(self, cache, max_workers=8, deadline=4.0, unavailable_ttl=60 * 5):
+        self.cache = cache
+        self.deadline = deadline
+        self.unavailable_ttl = unavailable_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='salary-lookup')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def enrich(self, jobs, lookup, default_location='', source='search'):
+        """
+        Set salary_estimate on every job in place; ``lookup(title, location, max_wait)``
+        calls the estimated-salary API, waiting at most max_wait seconds for the rate
+        limiter, and returns its first row or None
+        """
+        wanted = {}
+        for job in jobs:
+            job.pop('salary_pending', None)
+            job['salary_estimate'] = listed_salary(job)
+            if job['salary_estimate'] is not None:
+                continue
+            pair = salary_lookup(job, default_location)
+            if pair is None:
+                continue
+            key = salary_key(*pair)
+            job['salary_lookup'] = {'title': pair[0], 'location': pair[1]}
+            wanted.setdefault(key, (pair, []))[1].append(job)
+
+        futures = {}
+        fetched = 0
+        for key, (pair, group) in wanted.items():
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._apply(group, self._estimate(cached))
+                continue
+            future, started = self._submit(key, pair, lookup)
+            futures[future] = group
+            fetched += started
+
+        done, pending = wait(futures, timeout=self.deadline) if futures else (set(), set())
+        for future in done:
+            try:
+                self._apply(futures[future], future.result())
+            except Exception as e:
+                print(f"Salary lookup failed: {str(e)}")
+        for future in pending:
+            for job in futures[future]:
+                job['salary_pending'] = True
+
+        metrics = get_metrics()
+        metrics.observe('jobs_salary_lookups_per_search', fetched, source=source)
+        metrics.inc('jobs_salary_enrichment_total', len(wanted) - len(futures), result='cached')
+        metrics.inc('jobs_salary_enrichment_total', len(done), result='fetched')
+        metrics.inc('jobs_salary_enrichment_total', len(pending), result='pending')
+        return jobs
+
+    def fill_pending(self, jobs):
+        """
+        Fill in estimates that arrived after the deadline, from the salary cache
+        """
+        for job in jobs:
+            if not job.get('salary_pending'):
+                continue
+            pair = job.get('salary_lookup') or {}
+            cached = self.cache.peek(salary_key(pair.get('title'), pair.get('location')))
+            if cached is not None:
+                self._apply([job], self._estimate(cached))
+        return jobs
+
+    def _submit(self, key, pair, lookup):
+        """
+        The lookup future for the key, joining one already in flight; returns (future, newly started)
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = self._executor.submit(self._lookup, key, pair, lookup, time.monotonic())
+            return future, True
+
+    def _lookup(self, key, pair, lookup, submitted):
+        try:
+            # Never wait on the rate limiter past the deadline of the search that asked
+            max_wait = max(0.0, submitted + self.deadline - time.monotonic())
+            try:
+                data = lookup(pair[0], pair[1], max_wait)
+            except Exception as e:
+                print(f"Salary lookup failed: {str(e)}")
+                data = None
+            estimate = estimated_salary(data) if data else None
+            if estimate is None:
+                self.cache.set(key, UNAVAILABLE, ttl=self.unavailable_ttl)
+            else:
+                self.cache.set(key, estimate)
+            return estimate
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    @staticmethod
+    def _estimate(cached):
+        return None if cached == UNAVAILABLE else cached
+
+    @staticmethod
+    def _apply(group, estimate):
+        for job in group:
+            job['salary_estimate'] = estimate
+            job.pop('salary_pending', None)
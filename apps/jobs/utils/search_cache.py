@@ -0,0 +1,324 @@
+import copy
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core import signing
+from ai_resume_platform.utils.cache import ResponseCache, get_cache
+from ai_resume_platform.utils.metrics import get_metrics
+from ai_resume_platform.utils.singleflight import SingleFlight
+
+# Bump when canonicalization or the upstream query parameters change
+SEARCH_KEY_VERSION = 2
+
+# Shorthand people type into the keywords box, expanded so both spellings share an entry
+KEYWORD_ABBREVIATIONS = {
+    'sr': 'senior',
+    'snr': 'senior',
+    'jr': 'junior',
+    'jnr': 'junior',
+    'dev': 'developer',
+    'devs': 'developer',
+    'developers': 'developer',
+    'eng': 'engineer',
+    'engr': 'engineer',
+    'engineers': 'engineer',
+    'swe': 'software engineer',
+    'sde': 'software engineer',
+    'mgr': 'manager',
+    'pm': 'product manager',
+    'ml': 'machine learning',
+    'fe': 'frontend',
+    'front-end': 'frontend',
+    'be': 'backend',
+    'back-end': 'backend',
+    'fullstack': 'full stack',
+    'full-stack': 'full stack',
+}
+
+# Words that do not change what JSearch returns
+KEYWORD_FILLER = {'job', 'jobs', 'position', 'positions', 'role', 'roles', 'opening', 'openings', 'vacancy', 'vacancies'}
+
+LOCATION_ALIASES = {
+    'nyc': 'new york, ny',
+    'new york city': 'new york, ny',
+    'new york': 'new york, ny',
+    'manhattan': 'new york, ny',
+    'sf': 'san francisco, ca',
+    'san fran': 'san francisco, ca',
+    'san francisco': 'san francisco, ca',
+    'bay area': 'san francisco, ca',
+    'la': 'los angeles, ca',
+    'los angeles': 'los angeles, ca',
+    'chi': 'chicago, il',
+    'chicago': 'chicago, il',
+    'dc': 'washington, dc',
+    'washington dc': 'washington, dc',
+    'atx': 'austin, tx',
+    'austin': 'austin, tx',
+    'seattle': 'seattle, wa',
+    'boston': 'boston, ma',
+    'remote': 'remote',
+    'anywhere': 'remote',
+    'wfh': 'remote',
+    'work from home': 'remote',
+    'usa': '',
+    'us': '',
+    'united states': '',
+}
+
+US_STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca',
+    'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de', 'florida': 'fl', 'georgia': 'ga',
+    'hawaii': 'hi', 'idaho': 'id', 'illinois': 'il', 'indiana': 'in', 'iowa': 'ia',
+    'kansas': 'ks', 'kentucky': 'ky', 'louisiana': 'la', 'maine': 'me', 'maryland': 'md',
+    'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn', 'mississippi': 'ms', 'missouri': 'mo',
+    'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv', 'new hampshire': 'nh', 'new jersey': 'nj',
+    'new mexico': 'nm', 'new york': 'ny', 'north carolina': 'nc', 'north dakota': 'nd', 'ohio': 'oh',
+    'oklahoma': 'ok', 'oregon': 'or', 'pennsylvania': 'pa', 'rhode island': 'ri', 'south carolina': 'sc',
+    'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut', 'vermont': 'vt',
+    'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv', 'wisconsin': 'wi', 'wyoming': 'wy',
+    'district of columbia': 'dc',
+}
+
+# JSearch job_employment_types values, keyed by what the form or a user might send
+EMPLOYMENT_TYPES = {
+    'fulltime': 'FULLTIME',
+    'parttime': 'PARTTIME',
+    'contract': 'CONTRACTOR',
+    'contractor': 'CONTRACTOR',
+    'intern': 'INTERN',
+    'internship': 'INTERN',
+}
+
+_KEYWORD_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_LOCATION_JUNK = re.compile(r"[^a-z0-9,\s]")
+
+
+def canonical_keywords(keywords):
+    """
+    Lowercase, expand common abbreviations, drop filler words and repeated words, keep the order
+    """
+    words = []
+    for token in _KEYWORD_TOKEN.findall((keywords or '').lower()):
+        token = token.rstrip('.-')
+        if token in KEYWORD_FILLER:
+            continue
+        for word in KEYWORD_ABBREVIATIONS.get(token, token).split():
+            if word not in words:
+                words.append(word)
+    return ' '.join(words)
+
+
+def canonical_location(location):
+    """
+    ``"city, st"`` form of a location: aliases resolved, state names shortened, country dropped
+    """
+    text = _LOCATION_JUNK.sub(' ', (location or '').lower())
+    parts = [' '.join(part.split()) for part in text.split(',')]
+    parts = [part for part in parts if part]
+    if parts and parts[0].startswith('in '):
+        parts[0] = parts[0][3:]
+    while parts and LOCATION_ALIASES.get(parts[-1], None) == '':
+        # Trailing country
+        parts.pop()
+    if not parts:
+        return ''
+    whole = ', '.join(parts)
+    if whole in LOCATION_ALIASES:
+        return LOCATION_ALIASES[whole]
+    if len(parts) == 1:
+        return LOCATION_ALIASES.get(parts[0], US_STATES.get(parts[0], parts[0]))
+    city = LOCATION_ALIASES.get(parts[0], parts[0]).split(',')[0]
+    return ', '.join([city] + [US_STATES.get(part, part) for part in parts[1:]])
+
+
+def canonical_employment_type(job_type):
+    """
+    JSearch employment type(s) for the form value; several are sorted and comma-joined
+    """
+    types = set()
+    for part in (job_type or '').split(','):
+        name = re.sub(r'[^a-z]', '', part.lower())
+        if name:
+            types.add(EMPLOYMENT_TYPES.get(name, name.upper()))
+    return ','.join(sorted(types))
+
+
+def canonical_query(keywords, location, job_type, page=1):
+    """
+    The search as JSearch should see it; searches that differ only in spelling map to the same query
+    """
+    return {
+        'keywords': canonical_keywords(keywords),
+        'location': canonical_location(location),
+        'job_type': canonical_employment_type(job_type),
+        'page': page,
+    }
+
+
+def next_page(query):
+    """
+    The same search one JSearch page further; None past settings.JOB_SEARCH_MAX_PAGES
+    """
+    if query['page'] >= getattr(settings, 'JOB_SEARCH_MAX_PAGES', 10):
+        return None
+    return dict(query, page=query['page'] + 1)
+
+
+def make_cursor(query, source=None):
+    """
+    Opaque, signed cursor for a canonical query page (None stays None: no more pages).
+    source 'local' marks that the previous page came from the local store, so the
+    cursor's page is the JSearch page still to be shown rather than the one after it.
+    """
+    if query is None:
+        return None
+    if source:
+        query = dict(query, source=source)
+    return signing.dumps(query, salt='jobs.search.cursor', compress=True)
+
+
+def read_cursor(cursor):
+    """
+    (canonical query page, source) of a cursor; raises signing.BadSignature when it was tampered with
+    """
+    query = signing.loads(cursor, salt='jobs.search.cursor')
+    if not isinstance(query, dict):
+        raise signing.BadSignature('Malformed search cursor')
+    source = query.pop('source', None)
+    if set(query) != {'keywords', 'location', 'job_type', 'page'} or source not in (None, 'local'):
+        raise signing.BadSignature('Malformed search cursor')
+    return query, source
+
+
+def get_search_cache():
+    """
+    Shared cache of JSearch results by canonical query, configured by settings.JOB_SEARCH_CACHE
+    """
+    return get_cache('JOB_SEARCH_CACHE', table='job_searches')
+
+
+_cached_search = None
+_cached_search_lock = threading.Lock()
+
+
+def get_cached_search():
+    """
+    Process-wide CachedSearch over the shared search cache
+    """
+    global _cached_search
+    with _cached_search_lock:
+        if _cached_search is None:
+            config = getattr(settings, 'JOB_SEARCH_CACHE', {}) or {}
+            _cached_search = CachedSearch(
+                store=get_search_cache(),
+                locks=get_cache('JOB_SEARCH_CACHE', table='job_search_locks'),
+                fresh_ttl=config.get('FRESH_TTL', 60 * 30),
+                refresh_timeout=config.get('REFRESH_TIMEOUT', 60),
+                refresh_workers=config.get('REFRESH_WORKERS', 2),
+            )
+        return _cached_search
+
+
+class CachedSearch:
+    """
+    Stale-while-revalidate cache of search results.
+
+    An entry younger than ``fresh_ttl`` is served as is. An older one (kept up to
+    the store's TTL) is still served, and the first request to see it queues one
+    background refresh; a lock in the shared store keeps other workers from
+    refreshing the same query. A miss fetches in the foreground, with concurrent
+    identical misses (and a prefetch of the same page) sharing one upstream call.
+    Failed fetches are not cached.
+    """
+
+    def __init__(self, store, locks, fresh_ttl, refresh_timeout=60, refresh_workers=2):
+        self.store = store
+        self.locks = locks
+        self.fresh_ttl = fresh_ttl
+        self.refresh_timeout = refresh_timeout
+        self.singleflight = SingleFlight(
+            store=locks,
+            lookup=store.peek,
+            lock_ttl=refresh_timeout,
+            wait_timeout=refresh_timeout,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max(1, refresh_workers), thread_name_prefix='job-search-refresh')
+
+    @staticmethod
+    def make_key(query):
+        return ResponseCache.make_key(version=SEARCH_KEY_VERSION, **query)
+
+    def search(self, query, fetch):
+        """
+        Jobs for the canonical query; ``fetch(background)`` calls JSearch and returns None on
+        failure. Refreshes and prefetches pass background=True: no user is waiting on them.
+        """
+        key = self.make_key(query)
+        entry = self.store.get(key)
+        if entry is not None and time.time() - entry['fetched_at'] < self.fresh_ttl:
+            outcome = 'fresh'
+        elif entry is not None:
+            outcome = 'stale'
+            self.schedule_refresh(key, fetch)
+        else:
+            outcome = 'miss'
+            entry = self.singleflight.do(key, lambda: self._fetch(key, fetch, background=False))
+        get_metrics().inc('jobs_search_cache_total', outcome=outcome)
+        # Callers rank and annotate the jobs in place
+        return copy.deepcopy(entry['jobs'])
+
+    def prefetch(self, query, fetch):
+        """
+        Fetch a query expected next (the following page) in the background unless it is fresh.
+        A foreground search for it meanwhile joins the same upstream call.
+        """
+        key = self.make_key(query)
+        entry = self.store.peek(key)
+        if entry is not None and time.time() - entry['fetched_at'] < self.fresh_ttl:
+            return False
+        self._executor.submit(self._prefetch, key, fetch)
+        return True
+
+    def _prefetch(self, key, fetch):
+        try:
+            self.singleflight.do(key, lambda: self._fetch(key, fetch, background=True))
+        except Exception as e:
+            print(f"Search prefetch failed: {str(e)}")
+
+    def schedule_refresh(self, key, fetch):
+        """
+        Queue a background refresh unless one is already running in any worker
+        """
+        lock_key = f"refresh:{key}"
+        token = uuid.uuid4().hex
+        try:
+            if not self.locks.add(lock_key, token, ttl=self.refresh_timeout):
+                return False
+        except Exception as e:
+            print(f"Search refresh lock failed: {str(e)}")
+            return False
+        self._executor.submit(self._refresh, key, fetch, lock_key, token)
+        return True
+
+    def _refresh(self, key, fetch, lock_key, token):
+        try:
+            self._fetch(key, fetch, background=True)
+        except Exception as e:
+            print(f"Background search refresh failed: {str(e)}")
+        finally:
+            try:
+                if self.locks.peek(lock_key) == token:
+                    self.locks.delete(lock_key)
+            except Exception as e:
+                print(f"Search refresh unlock failed: {str(e)}")
+
+    def _fetch(self, key, fetch, background):
+        jobs = fetch(background)
+        entry = {'jobs': jobs or [], 'fetched_at': time.time()}
+        if jobs is not None:
+            self.store.set(key, entry)
+        return entry
@@ -2,12 +2,58 @@ import time
 import datetime
 import requests
 import json
+from asgiref.sync import sync_to_async
+from django.core import signing
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.conf import settings
 from django.contrib import messages
 from apps.users.models import Profile
+from ai_resume_platform.utils.http_client import get_client
+from ai_resume_platform.utils.rate_limit import RateLimitExceeded, get_rate_limiter
+from ai_resume_platform.utils.metrics import get_metrics
+from ai_resume_platform.utils.sse import format_sse, sse_response
+from apps.analyzer.utils.pdf_extractor import ResumeTextError, get_resume_text
+from apps.analyzer.utils.skills import extract_skills, job_skills, skill_gap
+from .store import merge_postings, save_postings, search_local, store_config
+from .utils.bm25 import rank_jobs
+from .utils.featured import get_featured_jobs_snapshot
+from .utils.salary import get_salary_enricher
+from .utils.search_cache import canonical_query, get_cached_search, make_cursor, next_page, read_cursor
+
+
+# The search behind the featured jobs
+FEATURED_KEYWORDS = 'developer'
+FEATURED_LOCATION = 'chicago'
+
+
+def resume_text_for(profile):
+    """Extracted text of the user's resume (cached), or '' when there is none"""
+    if not profile.resume_url:
+        return ''
+    try:
+        return get_resume_text(profile.resume_url)
+    except ResumeTextError as e:
+        print(f"Could not read resume for job ranking: {str(e)}")
+        return ''
+
+
+def rank_for_profile(jobs, profile):
+    """
+    Order jobs by local BM25 fit against the user's resume; the top K are offered for AI matching.
+    Each ranked job's local_fit also lists the skills it asks for that the resume has and lacks.
+    """
+    top_k = getattr(settings, 'JOB_DEEP_MATCH_TOP_K', 5)
+    resume_text = resume_text_for(profile)
+    jobs = rank_jobs(jobs, resume_text, top_k=top_k)
+    if resume_text:
+        resume_skills = extract_skills(resume_text)
+        for job in jobs:
+            wanted = job_skills(job.get('job_description') or '', job.get('job_required_skills'))
+            gap = skill_gap(resume_text, wanted, resume_skills=resume_skills)
+            job.setdefault('local_fit', {}).update(matched_skills=gap['matched'], missing_skills=gap['missing'])
+    return jobs
 
 
 @login_required
@@ -22,12 +68,14 @@ def jobs_home(request):
         job_type = request.POST.get('job_type', '')
         
         # Call JSearch API
-        jobs = search_jobs(keywords, location, job_type)
+        jobs, next_cursor = search_jobs(keywords, location, job_type, user_id=request.user.id)
+        jobs = rank_for_profile(jobs, profile)
         
-        return JsonResponse({'jobs': jobs})
+        # Further pages come from search_jobs_stream
+        return JsonResponse({'jobs': jobs, 'next_cursor': next_cursor})
     
     # Get featured jobs from JSearch API
-    featured_jobs = get_featured_jobs()
+    featured_jobs = get_featured_jobs(user_id=request.user.id)
     
     # Check if we're using mock data by checking if the first job is from our mock data
     using_mock_data = False
@@ -41,16 +89,20 @@ def jobs_home(request):
         else:
             print("Using real JSearch API job data for display")
     
+    featured_jobs = rank_for_profile(featured_jobs, profile)
+    
     context = {
         'profile': profile,
         'featured_jobs': featured_jobs,
-        'using_mock_data': using_mock_data
+        'using_mock_data': using_mock_data,
+        # "Load more" under the featured jobs continues with the same search, page by page
+        'next_cursor': make_cursor(canonical_query(FEATURED_KEYWORDS, FEATURED_LOCATION, '')),
     }
     return render(request, 'jobs/home.html', context)
 
 
-def get_salary_estimate(job_title, location):
-    """Get salary estimate for a job title and location using JSearch API"""
+def get_salary_estimate(job_title, location, max_wait=None):
+    """Get salary estimate for a job title and location using JSearch API, waiting at most max_wait seconds for the rate limiter"""
     try:
         # Check if API key is configured
         if not settings.JSEARCH_API_KEY:
@@ -60,8 +112,6 @@ def get_salary_estimate(job_title, location):
         if not job_title or not location:
             return None
         
-        url = "https://jsearch.p.rapidapi.com/estimated-salary"
-        
         querystring = {
             "job_title": job_title,
             "location": location,
@@ -74,8 +124,10 @@ def get_salary_estimate(job_title, location):
             "x-rapidapi-host": "jsearch.p.rapidapi.com"
         }
         
-        # Use a shorter timeout to prevent hanging requests
-        response = requests.get(url, headers=headers, params=querystring, timeout=3)
+        # Enrichment is not a request the user made: it draws on the global budget only
+        get_rate_limiter().acquire('jsearch', background=True, max_wait=max_wait)
+        # The pooled client applies the short salary timeout from UPSTREAM_HTTP
+        response = get_client('jsearch').get('/estimated-salary', endpoint='estimated-salary', headers=headers, params=querystring)
         
         # Check if request was successful
         if response.status_code != 200:
@@ -91,6 +143,9 @@ def get_salary_estimate(job_title, location):
         
         return None
         
+    except RateLimitExceeded:
+        print(f"Salary API budget exhausted, skipping estimate for {job_title} in {location}")
+        return None
     except requests.exceptions.Timeout:
         print(f"Salary API timeout for {job_title} in {location} (this is normal, continuing without salary data)")
         return None
@@ -99,34 +154,157 @@ def get_salary_estimate(job_title, location):
         return None
 
 
-def search_jobs(keywords, location, job_type):
-    """Search jobs using JSearch API"""
+def search_jobs(keywords, location, job_type, user_id=None):
+    """
+    Search the local job store first, topped up from JSearch (through the shared search cache);
+    returns the jobs and the cursor of the next page
+    """
+    query = canonical_query(keywords, location, job_type)
+    config = store_config()
+    
+    # Enough stored postings match: no upstream call for this page, JSearch page 1 comes next
+    local_jobs = search_local(query, limit=config['MAX_RESULTS'])
+    if len(local_jobs) >= config['MIN_LOCAL_RESULTS']:
+        get_metrics().inc('jobs_store_searches_total', result='local')
+        prefetch_page(query, user_id=user_id)
+        return get_salary_enricher().fill_pending(local_jobs), make_cursor(query, source='local')
+    
+    get_metrics().inc('jobs_store_searches_total', result='topped_up')
+    jobs = fetch_page(query, user_id=user_id)
+    following = next_page(query) if jobs else None
+    return get_salary_enricher().fill_pending(merge_postings(jobs, local_jobs, config['MAX_RESULTS'])), make_cursor(following)
+
+
+def prefetch_page(query, user_id=None):
+    """Start fetching a JSearch page so it is cached before the user scrolls to it"""
+    if query is not None and settings.JSEARCH_API_KEY:
+        get_cached_search().prefetch(query, lambda background: fetch_search_results(query, user_id=user_id, background=background))
+
+
+def prefetch_next_page(query, user_id=None):
+    """Start fetching the page after this one so it is cached before the user scrolls to it"""
+    prefetch_page(next_page(query), user_id=user_id)
+
+
+def fetch_page(query, user_id=None):
+    """One JSearch page of a canonical query through the shared search cache, the next one prefetched alongside"""
+    # Check if API key is configured
+    if not settings.JSEARCH_API_KEY:
+        print("JSearch API key not configured")
+        return []
+    
+    prefetch_next_page(query, user_id=user_id)
+    jobs = get_cached_search().search(query, lambda background: fetch_search_results(query, user_id=user_id, background=background))
+    # Estimates that missed the deadline when the results were fetched may have arrived since
+    return get_salary_enricher().fill_pending(jobs)
+
+
+@login_required
+async def search_jobs_stream(request):
+    """
+    Stream one page of search results as server-sent events: stored matches first, then
+    the JSearch page; the done event carries the cursor of the next page (None at the end)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    
+    cursor = request.POST.get('cursor')
+    if cursor:
+        try:
+            query, source = read_cursor(cursor)
+        except signing.BadSignature:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    else:
+        source = None
+        query = canonical_query(
+            request.POST.get('keywords', ''),
+            request.POST.get('location', ''),
+            request.POST.get('job_type', ''),
+        )
+    
+    user = await request.auser()
+    profile = await Profile.objects.aget(user=user)
+    return sse_response(search_page_events(query, profile, user.id, source=source))
+
+
+async def search_page_events(query, profile, user_id, source=None):
+    """
+    Encoded 'jobs', 'done' and 'error' events for one page of a search. Page 1 starts with
+    the local store unless it was already served from there (source 'local'); when the store
+    alone fills it, the next cursor points at JSearch page 1 rather than past it.
+    """
+    # Flush the headers straight away so the browser can start rendering
+    yield ": stream open\n\n"
+    try:
+        config = store_config()
+        from_store = query['page'] == 1 and source != 'local'
+        following, following_source = next_page(query), None
+        shown = []
+        if from_store:
+            local_jobs = await sync_to_async(search_local)(query, limit=config['MAX_RESULTS'])
+            if local_jobs:
+                # Salary cache reads (SQLite) stay off the event loop
+                shown = await sync_to_async(get_salary_enricher().fill_pending, thread_sensitive=False)(local_jobs)
+                ranked = await sync_to_async(rank_for_profile, thread_sensitive=False)(shown, profile)
+                yield format_sse('jobs', {'jobs': ranked, 'source': 'local'})
+        
+        if from_store and len(shown) >= config['MIN_LOCAL_RESULTS']:
+            get_metrics().inc('jobs_store_searches_total', result='local')
+            # The JSearch page counter only advances once an upstream page has been served
+            following, following_source = query, 'local'
+            await sync_to_async(prefetch_page, thread_sensitive=False)(query, user_id=user_id)
+        else:
+            if from_store:
+                get_metrics().inc('jobs_store_searches_total', result='topped_up')
+            jobs = await sync_to_async(fetch_page, thread_sensitive=False)(query, user_id=user_id)
+            if not jobs:
+                following = None
+            # Only postings the stored matches did not already show
+            fresh = merge_postings(shown, jobs, len(shown) + len(jobs))[len(shown):]
+            if fresh:
+                ranked = await sync_to_async(rank_for_profile, thread_sensitive=False)(fresh, profile)
+                yield format_sse('jobs', {'jobs': ranked, 'source': 'jsearch'})
+        
+        yield format_sse('done', {'page': query['page'], 'next_cursor': make_cursor(following, source=following_source)})
+    except Exception as e:
+        print(f"Error streaming job search: {str(e)}")
+        yield format_sse('error', {'error': str(e)})
+
+
+def keep_postings(jobs):
+    """Upsert fetched postings into the local job store; a store failure (after save_postings' retries) never fails the fetch"""
+    try:
+        save_postings(jobs)
+    except Exception as e:
+        print(f"Could not store fetched jobs: {str(e)}")
+
+
+def fetch_search_results(query, user_id=None, background=False):
+    """
+    Call the JSearch API for a canonical query; None when the search failed.
+    Only a search the user is waiting on is charged to their share of the budget.
+    """
+    location = query['location']
     try:
-        # Check if API key is configured
-        if not settings.JSEARCH_API_KEY:
-            print("JSearch API key not configured")
-            return []
-        
-        url = "https://jsearch.p.rapidapi.com/search"
-        
         # Improved query parameters
         querystring = {
-            "query": f"{keywords} {location}".strip(),
-            "page": "1",
+            "query": f"{query['keywords']} {location}".strip(),
+            "page": str(query['page']),
             "num_pages": "1",
             "country": "us",
             "date_posted": "all"
         }
         
-        if job_type:
-            querystring["job_employment_types"] = job_type.upper()
+        if query['job_type']:
+            querystring["job_employment_types"] = query['job_type']
         
         headers = {
             "x-rapidapi-key": settings.JSEARCH_API_KEY,
             "x-rapidapi-host": "jsearch.p.rapidapi.com"
         }
         
-        response = requests.get(url, headers=headers, params=querystring)
+        get_rate_limiter().acquire('jsearch', user_id, background=background)
+        response = get_client('jsearch').get('/search', endpoint='search', headers=headers, params=querystring)
         response.raise_for_status()
         
         data = response.json()
@@ -134,84 +312,55 @@ def search_jobs(keywords, location, job_type):
         
         print(f"Search returned {len(jobs)} jobs")
         
-        # Add salary information from job data directly
-        for i, job in enumerate(jobs):
-            print(f"Search Job {i+1}: {job.get('job_title', 'Unknown')} - Min: {job.get('job_min_salary')}, Max: {job.get('job_max_salary')}")
-            
-            # Job data already includes salary information, no need for additional API calls
-            if 'job_min_salary' in job and 'job_max_salary' in job and job['job_min_salary'] and job['job_max_salary']:
-                job['salary_estimate'] = {
-                    'min_salary': job['job_min_salary'],
-                    'max_salary': job['job_max_salary'],
-                    'median_salary': (job['job_min_salary'] + job['job_max_salary']) / 2 if job['job_min_salary'] and job['job_max_salary'] else None,
-                    'salary_period': job.get('job_salary_period', 'YEAR'),
-                    'salary_currency': job.get('job_salary_currency', 'USD')
-                }
-                print(f"Using direct salary data for {job.get('job_title', 'Unknown')}: {job['salary_estimate']['min_salary']} - {job['salary_estimate']['max_salary']}")
-            else:
-                # If no salary data in job, try to get estimate (fallback)
-                job_title = job.get('job_title', '')
-                # Simplify location to just city and state
-                job_city = job.get('job_city', '')
-                job_state = job.get('job_state', '')
-                
-                # Construct location more carefully
-                if job_city and job_state:
-                    # Just use the city for simplicity
-                    job_location = job_city
-                elif job_city:
-                    job_location = job_city
-                elif job_state:
-                    job_location = job_state
-                else:
-                    job_location = location if location else "Chicago"  # Use search location or default
-                
-                print(f"Getting salary estimate for '{job_title}' in '{job_location}'")
-                salary_data = get_salary_estimate(job_title, job_location)
-                if salary_data:
-                    # Convert the salary estimate format to match what we expect
-                    job['salary_estimate'] = {
-                        'min_salary': salary_data.get('min_salary'),
-                        'max_salary': salary_data.get('max_salary'),
-                        'median_salary': salary_data.get('median_salary'),
-                        'salary_period': salary_data.get('salary_period', 'YEAR'),
-                        'salary_currency': salary_data.get('salary_currency', 'USD')
-                    }
-                    print(f"Got salary estimate for {job_title}: {job['salary_estimate']['min_salary']} - {job['salary_estimate']['max_salary']}")
-                else:
-                    job['salary_estimate'] = None
-                    print(f"No salary estimate available for {job_title}")
+        # Salary from the listing, else estimates looked up concurrently (cached, with a deadline)
+        get_salary_enricher().enrich(jobs, get_salary_estimate, default_location=location, source='search')
         
         # Check if any jobs have salary data
         jobs_with_salary = [job for job in jobs if job.get('salary_estimate')]
         print(f"Search returned {len(jobs)} jobs, {len(jobs_with_salary)} with salary data")
         
+        keep_postings(jobs)
         return jobs
         
+    except RateLimitExceeded:
+        print("Job search budget exhausted, try again shortly")
+        return None
     except requests.exceptions.HTTPError as e:
         if response.status_code == 403:
             print("JSearch API subscription required or invalid API key")
         else:
             print(f"HTTP Error: {str(e)}")
-        return []
+        return None
     except Exception as e:
         print(f"Error searching jobs: {str(e)}")
-        return []
+        return None
 
 
-def get_featured_jobs():
-    """Get featured jobs from JSearch API"""
+def get_featured_jobs(user_id=None):
+    """Featured jobs from the precomputed snapshot; never waits on JSearch"""
+    # Check if API key is configured
+    if not settings.JSEARCH_API_KEY:
+        print("JSearch API key not configured")
+        return get_mock_jobs()
+    
+    jobs = get_featured_jobs_snapshot().jobs(fetch_featured_jobs)
+    if jobs:
+        return get_salary_enricher().fill_pending(jobs)
+    
+    # No good refresh yet (one has been queued)
+    print("No featured jobs snapshot yet, using mock data")
+    return get_mock_jobs()
+
+
+def fetch_featured_jobs():
+    """
+    Fetch the featured jobs with salary estimates from JSearch API; None when that failed.
+    Runs from the refresher, never for a user, so it draws on the global budget only.
+    """
     try:
-        # Check if API key is configured
-        if not settings.JSEARCH_API_KEY:
-            print("JSearch API key not configured")
-            return get_mock_jobs()
-        
-        url = "https://jsearch.p.rapidapi.com/search"
-        
         # Updated query parameters for better job results
         querystring = {
-            "query": "developer jobs in chicago",
+            "query": f"{FEATURED_KEYWORDS} jobs in {FEATURED_LOCATION}",
             "page": "1",
             "num_pages": "1",
             "country": "us",
@@ -223,17 +372,18 @@ def get_featured_jobs():
             "x-rapidapi-host": "jsearch.p.rapidapi.com"
         }
         
+        get_rate_limiter().acquire('jsearch', background=True)
         print(f"Making request to JSearch API with key: {settings.JSEARCH_API_KEY[:10]}...")
-        response = requests.get(url, headers=headers, params=querystring)
+        response = get_client('jsearch').get('/search', endpoint='search', headers=headers, params=querystring)
         print(f"JSearch API response status: {response.status_code}")
         
         if response.status_code == 429:
             print("JSearch API rate limit exceeded. Consider upgrading your plan or waiting.")
-            return get_mock_jobs()
+            return None
         
         if response.status_code == 403:
             print("JSearch API access forbidden - subscription may not be active yet")
-            return get_mock_jobs()
+            return None
         
         response.raise_for_status()
         
@@ -242,53 +392,8 @@ def get_featured_jobs():
         
         print(f"Received {len(jobs)} jobs from JSearch API")
         
-        # Add salary information from job data directly
-        for i, job in enumerate(jobs):
-            print(f"Job {i+1}: {job.get('job_title', 'Unknown')} - Min: {job.get('job_min_salary')}, Max: {job.get('job_max_salary')}")
-            
-            # Job data already includes salary information, no need for additional API calls
-            if 'job_min_salary' in job and 'job_max_salary' in job and job['job_min_salary'] and job['job_max_salary']:
-                job['salary_estimate'] = {
-                    'min_salary': job['job_min_salary'],
-                    'max_salary': job['job_max_salary'],
-                    'median_salary': (job['job_min_salary'] + job['job_max_salary']) / 2 if job['job_min_salary'] and job['job_max_salary'] else None,
-                    'salary_period': job.get('job_salary_period', 'YEAR'),
-                    'salary_currency': job.get('job_salary_currency', 'USD')
-                }
-                print(f"Using direct salary data for {job.get('job_title', 'Unknown')}: {job['salary_estimate']['min_salary']} - {job['salary_estimate']['max_salary']}")
-            else:
-                # If no salary data in job, try to get estimate (fallback)
-                job_title = job.get('job_title', '')
-                # Simplify location to just city and state
-                job_city = job.get('job_city', '')
-                job_state = job.get('job_state', '')
-                
-                # Construct location more carefully
-                if job_city and job_state:
-                    # Just use the city for simplicity
-                    job_location = job_city
-                elif job_city:
-                    job_location = job_city
-                elif job_state:
-                    job_location = job_state
-                else:
-                    job_location = "Chicago"  # Default fallback
-                
-                print(f"Getting salary estimate for '{job_title}' in '{job_location}'")
-                salary_data = get_salary_estimate(job_title, job_location)
-                if salary_data:
-                    # Convert the salary estimate format to match what we expect
-                    job['salary_estimate'] = {
-                        'min_salary': salary_data.get('min_salary'),
-                        'max_salary': salary_data.get('max_salary'),
-                        'median_salary': salary_data.get('median_salary'),
-                        'salary_period': salary_data.get('salary_period', 'YEAR'),
-                        'salary_currency': salary_data.get('salary_currency', 'USD')
-                    }
-                    print(f"Got salary estimate for {job_title}: {job['salary_estimate']['min_salary']} - {job['salary_estimate']['max_salary']}")
-                else:
-                    job['salary_estimate'] = None
-                    print(f"No salary estimate available for {job_title}")
+        # Salary from the listing, else estimates looked up concurrently (cached, with a deadline)
+        get_salary_enricher().enrich(jobs, get_salary_estimate, source='featured')
         
         # If we got jobs, return them
         if jobs:
@@ -296,23 +401,26 @@ def get_featured_jobs():
             # Check if any jobs have salary data
             jobs_with_salary = [job for job in jobs if job.get('salary_estimate')]
             print(f"Jobs with salary data: {len(jobs_with_salary)}")
+            keep_postings(jobs)
             return jobs
         else:
-            # Fall back to mock data if no jobs found
-            print("No jobs found in JSearch API response, using mock data")
-            return get_mock_jobs()
+            print("No jobs found in JSearch API response")
+            return None
         
+    except RateLimitExceeded:
+        print("JSearch budget exhausted.")
+        return None
     except requests.exceptions.HTTPError as e:
         if hasattr(response, 'status_code') and response.status_code == 403:
-            print("JSearch API subscription required or invalid API key. Using mock data.")
+            print("JSearch API subscription required or invalid API key.")
         elif hasattr(response, 'status_code') and response.status_code == 429:
-            print("JSearch API rate limit exceeded. Using mock data.")
+            print("JSearch API rate limit exceeded.")
         else:
-            print(f"HTTP Error: {str(e)}. Using mock data.")
-        return get_mock_jobs()
+            print(f"HTTP Error: {str(e)}.")
+        return None
     except Exception as e:
-        print(f"Error fetching featured jobs: {str(e)}. Using mock data.")
-        return get_mock_jobs()
+        print(f"Error fetching featured jobs: {str(e)}.")
+        return None
 
 
 def get_mock_jobs():
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='base_analysis',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='sections',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
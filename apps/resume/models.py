@@ -5,6 +5,11 @@ class Resume(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     cloudinary_url = models.URLField()
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # SHA-256 of the PDF and {section name: fingerprint} of its text (apps/analyzer/utils/sections.py)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    sections = models.JSONField(default=dict, blank=True)
+    # The previous upload's analysis and section fingerprints, so only changed sections are re-analyzed
+    base_analysis = models.JSONField(null=True, blank=True)
     
     def __str__(self):
         return f"{self.user.username}'s Resume - {self.uploaded_at.strftime('%Y-%m-%d')}"
\ No newline at end of file
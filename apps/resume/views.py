@@ -7,23 +7,39 @@ from django.conf import settings
 from django.http import JsonResponse
 from .models import Resume
 from apps.users.models import Profile
+from apps.analyzer.results import carry_over_analysis, invalidate_results, uploaded_resume_sections
+from apps.analyzer.utils.pdf_extractor import content_hash
+from ai_resume_platform.utils.http_client import get_client
+from ai_resume_platform.utils.metrics import get_metrics
 
 @login_required
 def upload_resume(request):
     if request.method == 'POST' and request.FILES.get('resume'):
         try:
+            pdf_bytes = b''.join(request.FILES['resume'].chunks())
+            request.FILES['resume'].seek(0)
+            resume_hash = content_hash(pdf_bytes)
+            
             # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                request.FILES['resume'],
-                folder=f"resumes/{request.user.id}",
-                resource_type="raw",
-                allowed_formats=['pdf']
-            )
+            with get_metrics().timer('upstream_request_duration_seconds', upstream='cloudinary', endpoint='upload'):
+                result = cloudinary.uploader.upload(
+                    request.FILES['resume'],
+                    folder=f"resumes/{request.user.id}",
+                    resource_type="raw",
+                    allowed_formats=['pdf'],
+                    timeout=get_client('cloudinary').timeout_for('upload'),
+                    # Set when UPSTREAM_SIMULATOR_URL points uploads at the local simulator
+                    upload_prefix=getattr(settings, 'CLOUDINARY_UPLOAD_PREFIX', None)
+                )
             
-            # Save to database
+            # Save to database, with what the next analysis needs to re-analyze only changed sections
+            previous = Resume.objects.filter(user=request.user).order_by('-uploaded_at', '-id').first()
             resume = Resume.objects.create(
                 user=request.user,
-                cloudinary_url=result['secure_url']
+                cloudinary_url=result['secure_url'],
+                content_hash=resume_hash,
+                sections=uploaded_resume_sections(result['secure_url'], pdf_bytes),
+                base_analysis=carry_over_analysis(request.user, previous, resume_hash)
             )
             
             # Update user profile
@@ -31,6 +47,9 @@ def upload_resume(request):
             profile.resume_url = result['secure_url']
             profile.save()
             
+            # Stored analyses of a different resume no longer apply
+            invalidate_results(request.user, keep_resume_hash=resume_hash)
+            
             messages.success(request, 'Resume uploaded successfully!')
             return redirect('dashboard')
             
@@ -52,6 +71,9 @@ def delete_resume(request):
             profile.resume_url = None
             profile.save()
             
+            # Stored analyses, matches and career plans go with the resume
+            invalidate_results(request.user)
+            
             messages.success(request, 'Resume deleted successfully! You can now upload a new one.')
         except Exception as e:
             messages.error(request, f'Error deleting resume: {str(e)}')
@@ -8,7 +8,9 @@ from django.http import JsonResponse, HttpResponse
 import io
 import os
 from apps.users.models import Profile
-from ai_resume_platform.utils.ai_service import AIService
+from ai_resume_platform.utils.ai_service import AsyncAIService
+from ai_resume_platform.utils.idempotency import idempotent
+from apps.tasks.queue import aenqueue, task_accepted_response
 from .utils.pdf_generator import PDFGenerator
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -32,7 +34,8 @@ def builder(request):
     return render(request, 'resume_builder/builder.html', {'profile': profile})
 
 @login_required
-def generate_resume(request):
+@idempotent
+async def generate_resume(request):
     if request.method == 'POST':
         try:
             # Get form data
@@ -46,13 +49,14 @@ def generate_resume(request):
             experience_level = request.POST.get('experience_level', '')
             additional_notes = request.POST.get('additional_notes', '')
             
-            profile = Profile.objects.get(user=request.user)
+            user = await request.auser()
+            profile = await Profile.objects.aget(user=user)
             
             if not profile.resume_url:
                 return JsonResponse({'error': 'No resume uploaded'}, status=400)
             
             # Initialize AI service
-            ai_service = AIService()
+            ai_service = AsyncAIService(user_id=user.id)
             
             # Prepare user inputs for AI service
             user_inputs = {
@@ -67,18 +71,24 @@ def generate_resume(request):
                 'additional_notes': additional_notes
             }
             
+            # Queue for the background worker when asked; the client polls the status URL,
+            # which also stores the finished resume in the session for download
+            if request.POST.get('background'):
+                task = await aenqueue(user, 'generate_resume', {'resume_url': profile.resume_url, 'user_inputs': user_inputs})
+                return task_accepted_response(task)
+            
             # Call AI service to generate resume
-            resume_data = ai_service.generate_optimized_resume(profile.resume_url, user_inputs)
+            resume_data = await ai_service.generate_optimized_resume(profile.resume_url, user_inputs)
             
             # Check if there was an error
             if 'error' in resume_data:
                 return JsonResponse({'error': resume_data['error']}, status=500)
             
             # Store resume data in session for PDF generation
-            request.session['generated_resume'] = resume_data
+            await request.session.aset('generated_resume', resume_data)
             
             # Return PDF filename for download and preview data
-            filename = f"{request.user.username}_resume.pdf"
+            filename = f"{user.username}_resume.pdf"
             return JsonResponse({'filename': filename, 'preview_data': resume_data})
             
         except Exception as e:
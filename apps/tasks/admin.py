@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import AITask
+
+@admin.register(AITask)
+class AITaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'task_type', 'status', 'attempts', 'worker', 'created_at', 'finished_at')
+    search_fields = ('user__username', 'user__email', 'task_type')
+    list_filter = ('status', 'task_type', 'created_at')
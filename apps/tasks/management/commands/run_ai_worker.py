@@ -0,0 +1,59 @@
+import os
+import socket
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.tasks.queue import claim_next_task, requeue_stale_tasks, run_task
+
+
+class Command(BaseCommand):
+    help = 'Run a worker that processes queued AI tasks (start more processes to scale out)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks processed in parallel by this process')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--lease', type=int, default=300, help='Seconds before a running task is considered abandoned')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.options = options
+        base_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        requeued, failed = requeue_stale_tasks(options['lease'])
+        if requeued or failed:
+            self.stdout.write(f"Recovered stale tasks: {requeued} requeued, {failed} failed")
+
+        threads = []
+        for index in range(options['concurrency']):
+            thread = threading.Thread(target=self.work, args=(f"{base_id}:{index}",), daemon=True)
+            thread.start()
+            threads.append(thread)
+        self.stdout.write(self.style.SUCCESS(f"AI worker {base_id} running with {len(threads)} threads"))
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=options['lease'])
+                if not self.options['once']:
+                    requeue_stale_tasks(options['lease'])
+        except KeyboardInterrupt:
+            self.stop.set()
+            self.stdout.write('Stopping after in-flight tasks finish...')
+            for thread in threads:
+                thread.join()
+
+    def work(self, worker_id):
+        while not self.stop.is_set():
+            close_old_connections()
+            task = claim_next_task(worker_id)
+            if task is None:
+                if self.options['once']:
+                    break
+                time.sleep(self.options['poll_interval'])
+                continue
+            started = time.monotonic()
+            task = run_task(task, lease_seconds=self.options['lease'])
+            self.stdout.write(f"[{worker_id}] {task.task_type} {task.id} {task.status} in {time.monotonic() - started:.1f}s")
+        close_old_connections()
@@ -0,0 +1,208 @@
+import datetime
+import threading
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.http import JsonResponse
+from django.utils import timezone
+from ai_resume_platform.utils.ai_service import AIService
+from apps.analyzer.models import AnalysisResult
+from apps.analyzer.results import ResultStore
+from .models import AITask
+
+
+def result_store(payload, user_id):
+    """
+    The ResultStore of the task's resume, so worker results are served like inline ones
+    """
+    user = get_user_model().objects.get(pk=user_id)
+    return async_to_sync(ResultStore.for_resume)(user, payload['resume_url'])
+
+
+def run_stored(store, task, inputs, compute):
+    """
+    The stored result when another request produced it meanwhile, else compute() stored for next time
+    """
+    result = async_to_sync(store.lookup)(task, inputs)
+    if result is not None:
+        return result
+    result = compute()
+    async_to_sync(store.save)(task, result, inputs)
+    return result
+
+
+def run_analyze_resume(payload, user_id):
+    store = result_store(payload, user_id)
+    base = async_to_sync(store.analysis_base)()
+    return run_stored(store, AnalysisResult.TASK_ANALYZE_RESUME, None, lambda: AIService(user_id=user_id).analyze_resume_from_url(payload['resume_url'], base=base))
+
+
+def run_match_job(payload, user_id):
+    store = result_store(payload, user_id)
+    return run_stored(store, AnalysisResult.TASK_MATCH_JOB, payload['job_details'], lambda: AIService(user_id=user_id).match_job_from_url(payload['resume_url'], payload['job_details']))
+
+
+def run_plan_career(payload, user_id):
+    store = result_store(payload, user_id)
+    return run_stored(store, AnalysisResult.TASK_PLAN_CAREER, payload['user_inputs'], lambda: AIService(user_id=user_id).plan_career_from_url(payload['resume_url'], payload['user_inputs']))
+
+
+def run_generate_resume(payload, user_id):
+    return AIService(user_id=user_id).generate_optimized_resume(payload['resume_url'], payload['user_inputs'])
+
+
+RETRY_BASE_DELAY = 10
+
+TASK_HANDLERS = {
+    'analyze_resume': run_analyze_resume,
+    'match_job': run_match_job,
+    'plan_career': run_plan_career,
+    'generate_resume': run_generate_resume,
+}
+
+
+async def aenqueue(user, task_type, payload):
+    """
+    Queue an AI task for the worker and return it
+    """
+    if task_type not in TASK_HANDLERS:
+        raise ValueError(f"Unknown task type: {task_type}")
+    return await AITask.objects.acreate(user=user, task_type=task_type, payload=payload)
+
+
+def task_accepted_response(task):
+    """
+    202 response pointing the client at the task status endpoint
+    """
+    return JsonResponse({
+        'task_id': str(task.id),
+        'status': task.status,
+        'status_url': reverse('task_status', args=[task.id]),
+    }, status=202)
+
+
+def claim_next_task(worker_id):
+    """
+    Claim the oldest pending task for this worker, or return None.
+
+    On databases with row locks (PostgreSQL) SKIP LOCKED keeps workers off each
+    other's rows; the conditional UPDATE makes the claim exclusive everywhere else.
+    """
+    while True:
+        with transaction.atomic():
+            task = (AITask.objects.select_for_update(skip_locked=True)
+                    .filter(status=AITask.STATUS_PENDING, run_after__lte=timezone.now())
+                    .order_by('run_after', 'created_at')
+                    .first())
+            if task is None:
+                return None
+            claimed = AITask.objects.filter(pk=task.pk, status=AITask.STATUS_PENDING).update(
+                status=AITask.STATUS_RUNNING,
+                worker=worker_id,
+                claimed_at=timezone.now(),
+                attempts=F('attempts') + 1,
+            )
+        if claimed:
+            task.refresh_from_db()
+            return task
+
+
+def current_claim(task):
+    """
+    The task row while this claim (worker and attempt) still holds it
+    """
+    return AITask.objects.filter(pk=task.pk, status=AITask.STATUS_RUNNING, worker=task.worker, attempts=task.attempts)
+
+
+class Heartbeat:
+    """
+    Renews a claimed task's lease (claimed_at) every ``interval`` seconds while it runs,
+    so requeue_stale_tasks only picks up tasks whose worker has stopped
+    """
+
+    def __init__(self, task, interval):
+        self.task = task
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not current_claim(self.task).update(claimed_at=timezone.now()):
+                    # Requeued or finished elsewhere; run_task will not store this result
+                    break
+        except Exception as e:
+            print(f"Task heartbeat failed for {self.task.id}: {str(e)}")
+        finally:
+            connection.close()
+
+
+def run_task(task, lease_seconds=300):
+    """
+    Execute a claimed task and store its result. Failed attempts go back to the
+    queue until max_attempts is reached. The lease is renewed while the handler
+    runs, and the outcome is only stored while this claim still holds the task.
+    """
+    handler = TASK_HANDLERS.get(task.task_type)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown task type: {task.task_type}")
+        with Heartbeat(task, max(1, lease_seconds / 3)):
+            result = handler(task.payload, task.user_id)
+        error = result.get('error') if isinstance(result, dict) else None
+    except Exception as e:
+        result, error = None, str(e)
+
+    if error is None:
+        task.status = AITask.STATUS_SUCCEEDED
+        task.result = result
+        task.error = ''
+        task.finished_at = timezone.now()
+    elif task.attempts < task.max_attempts:
+        # Back off before the next attempt: 10s, 20s, 40s...
+        task.status = AITask.STATUS_PENDING
+        task.error = error
+        task.run_after = timezone.now() + datetime.timedelta(seconds=RETRY_BASE_DELAY * 2 ** (task.attempts - 1))
+    else:
+        task.status = AITask.STATUS_FAILED
+        task.error = error
+        task.finished_at = timezone.now()
+    stored = current_claim(task).update(
+        status=task.status,
+        result=task.result,
+        error=task.error,
+        run_after=task.run_after,
+        finished_at=task.finished_at,
+    )
+    if not stored:
+        print(f"Task {task.id} was reclaimed while attempt {task.attempts} ran; its outcome is dropped")
+        task.refresh_from_db()
+    return task
+
+
+def requeue_stale_tasks(lease_seconds):
+    """
+    Return tasks whose worker died mid-run to the queue (or fail them when out of attempts).
+    Live workers renew claimed_at while they run (see Heartbeat), so only tasks whose lease
+    was not renewed for lease_seconds are taken.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=lease_seconds)
+    stale = AITask.objects.filter(status=AITask.STATUS_RUNNING, claimed_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(status=AITask.STATUS_PENDING)
+    failed = stale.update(
+        status=AITask.STATUS_FAILED,
+        error='Worker lease expired',
+        finished_at=timezone.now(),
+    )
+    return requeued, failed
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<uuid:task_id>/', views.task_status, name='task_status'),
+]
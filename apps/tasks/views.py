@@ -0,0 +1,26 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from .models import AITask
+
+@login_required
+def task_status(request, task_id):
+    """Status and, once finished, result of a queued AI task"""
+    try:
+        task = AITask.objects.get(pk=task_id, user=request.user)
+    except AITask.DoesNotExist:
+        return JsonResponse({'error': 'Task not found'}, status=404)
+    
+    # Generated resumes are downloaded from the session, as with the inline builder flow
+    if task.task_type == 'generate_resume' and task.status == AITask.STATUS_SUCCEEDED:
+        request.session['generated_resume'] = task.result
+    
+    return JsonResponse({
+        'task_id': str(task.id),
+        'task_type': task.task_type,
+        'status': task.status,
+        'attempts': task.attempts,
+        'result': task.result,
+        'error': task.error or None,
+        'created_at': task.created_at.isoformat(),
+        'finished_at': task.finished_at.isoformat() if task.finished_at else None,
+    })
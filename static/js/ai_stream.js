@@ -0,0 +1,93 @@
+// Read server-sent events from a POST endpoint (EventSource only supports GET)
+function streamAIEvents(url, csrfToken, body, handlers) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/x-www-form-urlencoded'
+        },
+        body: body
+    }).then(response => {
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!response.body || !contentType.startsWith('text/event-stream')) {
+            // Validation errors come back as plain JSON
+            return response.json().then(data => {
+                if (handlers.error) handlers.error({ error: data.error || 'Unknown error' });
+            });
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        function dispatch(rawEvent) {
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    eventName = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            if (data && handlers[eventName]) {
+                handlers[eventName](JSON.parse(data));
+            }
+        }
+
+        function pump() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    if (buffer.trim()) dispatch(buffer);
+                    return;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                let boundary = buffer.indexOf('\n\n');
+                while (boundary !== -1) {
+                    dispatch(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                    boundary = buffer.indexOf('\n\n');
+                }
+                return pump();
+            });
+        }
+
+        return pump();
+    });
+}
+
+// Run a long AI request as a background task: POST with background=1, then poll the task
+// status URL. Resolves with the view's JSON when it answered at once (a stored result or a
+// validation error), otherwise with {result} or {error} once the worker has finished.
+function runAITask(url, csrfToken, body, pollInterval = 2000) {
+    const params = new URLSearchParams(body);
+    params.set('background', '1');
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/x-www-form-urlencoded'
+        },
+        body: params
+    }).then(response => response.json().then(data => {
+        if (response.status !== 202) return data;
+
+        return new Promise((resolve, reject) => {
+            function poll() {
+                fetch(data.status_url)
+                    .then(statusResponse => statusResponse.json())
+                    .then(task => {
+                        if (task.status === 'succeeded') {
+                            resolve({ result: task.result });
+                        } else if (task.status === 'failed' || !task.status) {
+                            resolve({ error: task.error || 'Unknown error' });
+                        } else {
+                            setTimeout(poll, pollInterval);
+                        }
+                    })
+                    .catch(reject);
+            }
+            setTimeout(poll, pollInterval);
+        });
+    }));
+}